@@ -1,16 +1,147 @@
 # mathex/ui/workspace.py
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, 
-    QToolButton, QTableWidget, QTableWidgetItem, 
-    QHeaderView, QAbstractItemView
+    QToolButton, QTableView, QHeaderView, QAbstractItemView
 )
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QColor, QBrush
+from PySide6.QtCore import (
+    Qt, Signal, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+)
+from PySide6.QtGui import QColor
+import bisect
 import types
 
 # IMPORT THE INSPECTOR
 from ides.mathex.ui.variable_inspector import VariableInspector
 
+
+class WorkspaceModel(QAbstractTableModel):
+    """
+    Virtual model over workspace variables, kept sorted by name.
+
+    Rows are formatted once when a variable is added or changed and cached,
+    so a refresh costs O(changed names), not O(workspace). The view only
+    asks for the rows that are actually visible.
+    """
+
+    HEADERS = ("Name", "Value", "Class")
+
+    # "Shades of Dark" for row backgrounds
+    BG_FUNC = QColor("#2a2b2e")   # Lighter, slightly cool dark for functions
+    BG_CHAR = QColor("#232323")   # Subtle difference for strings/text
+    BG_VAR = QColor("#1e1e1e")    # Standard deep dark for variables
+
+    ERROR_COLOR = QColor("#ff5555")
+    FUNC_VAL_COLOR = QColor("#777777")   # Dimmed function values
+
+    def __init__(self, formatter):
+        super().__init__()
+        self._format_value = formatter
+        self._names = []    # sorted variable names (row order)
+        self._rows = {}     # name -> (value_str, class_name, kind, is_error)
+
+    # ---------------- Qt model API ----------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 3
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        name = self._names[index.row()]
+        value_str, class_name, kind, is_error = self._rows[name]
+        col = index.column()
+
+        if role == Qt.DisplayRole:
+            return (name, value_str, class_name)[col]
+
+        if role == Qt.BackgroundRole:
+            if kind == "func": return self.BG_FUNC
+            if kind == "char": return self.BG_CHAR
+            return self.BG_VAR
+
+        if role == Qt.ForegroundRole and col == 1:
+            if is_error: return self.ERROR_COLOR
+            if kind == "func": return self.FUNC_VAL_COLOR
+
+        if role == Qt.ToolTipRole and col == 1 and is_error:
+            return "Unable to display value"
+
+        return None
+
+    # ---------------- Row bookkeeping ----------------
+    def name_at(self, row):
+        return self._names[row]
+
+    def names(self):
+        return list(self._names)
+
+    def _describe(self, val):
+        # 1. Determine Type
+        is_matlab_array = hasattr(val, '_data') and hasattr(val, 'shape')
+        is_func = not is_matlab_array and (callable(val) or isinstance(val, type))
+        is_str = isinstance(val, str)
+        kind = "func" if is_func else "char" if is_str else "var"
+
+        # 2. Value Column
+        try:
+            val_str = self._format_value(val)
+            is_error = val_str == "Error"
+        except Exception:
+            val_str = "Error"
+            is_error = True
+
+        # 3. Class Column (MATLAB Naming)
+        t_name = type(val).__name__
+        if t_name == 'MatlabArray': t_name = 'double'
+        elif is_func: t_name = 'function_handle'
+        elif is_str: t_name = 'char'
+        elif t_name == 'list': t_name = 'cell' # Python list roughly maps to cell array conceptually
+
+        return (val_str, t_name, kind, is_error)
+
+    def reset_rows(self, variables):
+        """Full rebuild (initial load / unknown changes)."""
+        self.beginResetModel()
+        self._names = sorted(variables)
+        self._rows = {name: self._describe(variables[name]) for name in self._names}
+        self.endResetModel()
+
+    def set_row(self, name, value):
+        """Inserts or refreshes a single variable."""
+        row = bisect.bisect_left(self._names, name)
+        if row < len(self._names) and self._names[row] == name:
+            self._rows[name] = self._describe(value)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, 2))
+            return
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._names.insert(row, name)
+        self._rows[name] = self._describe(value)
+        self.endInsertRows()
+
+    def remove_row(self, name):
+        row = bisect.bisect_left(self._names, name)
+        if row < len(self._names) and self._names[row] == name:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._names[row]
+            del self._rows[name]
+            self.endRemoveRows()
+
+    def apply_changes(self, variables, changes):
+        """Applies a session change log (added / changed / removed names)."""
+        for name in changes.removed:
+            self.remove_row(name)
+        for name in list(changes.added) + list(changes.changed):
+            if name in variables:
+                self.set_row(name, variables[name])
+
+
 class WorkspaceWidget(QWidget):
     """
     Professional Workspace with Tabular Borders and Inspector.
@@ -48,7 +179,7 @@ class WorkspaceWidget(QWidget):
             }
             QLineEdit:focus { border: 1px solid #007acc; }
         """)
-        self.search_bar.textChanged.connect(lambda: self.filter_table(self.search_bar.text()))
+        self.search_bar.textChanged.connect(self.filter_table)
         tb_layout.addWidget(self.search_bar)
         
         # Connect buttons to signals
@@ -70,9 +201,15 @@ class WorkspaceWidget(QWidget):
             
         self.layout.addWidget(self.toolbar)
 
-        # --- Table ---
-        self.table = QTableWidget(0, 3)
-        self.table.setHorizontalHeaderLabels(["Name", "Value", "Class"])
+        # --- Table (virtual model + name filter) ---
+        self.model = WorkspaceModel(self._format_value)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterKeyColumn(0)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
         self.table.setShowGrid(True)
         self.table.verticalHeader().setVisible(False)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
@@ -81,13 +218,13 @@ class WorkspaceWidget(QWidget):
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #1e1e1e;
                 color: #cccccc;
                 gridline-color: #333333; 
                 border: none;
             }
-            QTableWidget::item { padding: 4px; border-bottom: 1px solid #2d2d2d; }
+            QTableView::item { padding: 4px; border-bottom: 1px solid #2d2d2d; }
             QHeaderView::section {
                 background-color: #252526;
                 color: #cccccc;
@@ -100,85 +237,33 @@ class WorkspaceWidget(QWidget):
         self.table.setColumnWidth(1, 150)
         
         # CONNECT DOUBLE CLICK TO INSPECTOR
-        self.table.cellDoubleClicked.connect(self.on_table_double_click)
+        self.table.doubleClicked.connect(self.on_table_double_click)
         
         self.layout.addWidget(self.table)
         self.current_globals = {}
 
-    def update_table(self, globals_dict):
-        self.current_globals = globals_dict.copy()
-        self.filter_table(self.search_bar.text())
+    def update_table(self, globals_dict, changes=None):
+        """
+        Refreshes the table.
+
+        With `changes` (a session change log, see KernelSession.drain_changes)
+        only the listed names are re-formatted. Without it, the table is
+        rebuilt from every visible entry of `globals_dict`.
+        """
+        # Reference, not a copy: rows are cached in the model
+        self.current_globals = globals_dict
+
+        if changes is not None:
+            self.model.apply_changes(globals_dict, changes)
+            return
+
+        self.model.reset_rows({
+            k: v for k, v in globals_dict.items()
+            if not k.startswith('_') and not isinstance(v, types.ModuleType)
+        })
 
     def filter_table(self, query):
-        query = query.lower()
-        vars_to_show = {}
-        for k, v in self.current_globals.items():
-            if k.startswith('_'): continue
-            
-            # [MODIFIED] Show functions but hide standard Python modules (like 'os', 'sys')
-            if isinstance(v, types.ModuleType): 
-                continue
-                
-            if query in k.lower():
-                vars_to_show[k] = v
-        
-        self.table.setRowCount(len(vars_to_show))
-        
-        error_color = QColor("#ff5555")
-        
-        # [NEW] Define "Shades of Dark" for row backgrounds
-        bg_func = QColor("#2a2b2e")   # Lighter, slightly cool dark for functions
-        bg_char = QColor("#232323")   # Subtle difference for strings/text
-        bg_var  = QColor("#1e1e1e")   # Standard deep dark for variables
-        
-        # Text color for function values (dimmed)
-        func_val_color = QColor("#777777")
-
-        for row, (name, val) in enumerate(sorted(vars_to_show.items())):
-            # 1. Determine Type & Background Color
-            is_matlab_array = hasattr(val, '_data') and hasattr(val, 'shape')
-            is_func = not is_matlab_array and (callable(val) or isinstance(val, type))
-            is_str = isinstance(val, str)
-            
-            if is_func:   row_bg = bg_func
-            elif is_str:  row_bg = bg_char
-            else:         row_bg = bg_var
-
-            # 2. Name Column
-            item_name = QTableWidgetItem(name)
-            item_name.setBackground(row_bg)
-            self.table.setItem(row, 0, item_name)
-            
-            # 3. Value Column
-            try: 
-                val_str = self._format_value(val)
-                is_error = False
-            except: 
-                val_str = "Error"
-                is_error = True
-            
-            item_val = QTableWidgetItem(val_str)
-            item_val.setBackground(row_bg)
-            
-            if is_error or val_str == "Error":
-                item_val.setForeground(error_color)
-                item_val.setToolTip("Unable to display value")
-            elif is_func:
-                # Dim the function value text (e.g. <function_handle>)
-                item_val.setForeground(func_val_color)
-
-            self.table.setItem(row, 1, item_val)
-            
-            # 4. Class Column (MATLAB Naming)
-            t_name = type(val).__name__
-            if t_name == 'MatlabArray': t_name = 'double'
-            elif is_func: t_name = 'function_handle'
-            elif is_str: t_name = 'char'
-            elif t_name == 'list': t_name = 'cell' # Python list roughly maps to cell array conceptually
-            
-            item_class = QTableWidgetItem(t_name)
-            item_class.setBackground(row_bg)
-            self.table.setItem(row, 2, item_class)
+        self.proxy.setFilterFixedString(query)
 
     def _format_value(self, val):
         # Arrays/Shapes
@@ -202,11 +287,10 @@ class WorkspaceWidget(QWidget):
         return str(val)[:50]
 
     # --- INSPECTOR LOGIC ---
-    def on_table_double_click(self, row, col):
-        # Get variable name from first column
-        item = self.table.item(row, 0)
-        if not item: return
-        name = item.text()
+    def on_table_double_click(self, index):
+        # Get variable name from the (filtered) row
+        if not index.isValid(): return
+        name = self.model.name_at(self.proxy.mapToSource(index).row())
         
         val = self.current_globals.get(name)
         if val is not None:
@@ -220,11 +304,8 @@ class WorkspaceWidget(QWidget):
 
     def _handle_var_update(self, name, new_val):
         """Called when inspector emits a change."""
-        # 1. Update local copy so table refreshes correctly
-        self.current_globals[name] = new_val
-        
-        # 2. Refresh the table (simple way)
-        self.filter_table(self.search_bar.text())
+        # 1. Refresh just this row
+        self.model.set_row(name, new_val)
         
-        # 3. Emit signal so App can update the real Kernel Session
-        self.variable_edited.emit(name, new_val)
\ No newline at end of file
+        # 2. Emit signal so App can update the real Kernel Session
+        self.variable_edited.emit(name, new_val)
@@ -1,6 +1,17 @@
-# from .saver import save_workspace, load_workspace
-from .mfile import read_mfile
-# from .exporter import writematrix, saveas
-from .saver import save_workspace, load_workspace
-from .exporter import writematrix, saveas
-from .datareader import readtable, readmatrix, csvread  # <--- NEW
\ No newline at end of file
+# Readers/writers are imported on first access (PEP 562); datareader pulls
+# in pandas, which the kernel should not pay for at start-up.
+from shared.symbolic_core.lazy import lazy_exports
+
+_EXPORTS = {
+    "read_mfile": (".mfile", "read_mfile"),
+    "save_workspace": (".saver", "save_workspace"),
+    "load_workspace": (".saver", "load_workspace"),
+    "writematrix": (".exporter", "writematrix"),
+    "saveas": (".exporter", "saveas"),
+    "readtable": (".datareader", "readtable"),
+    "readmatrix": (".datareader", "readmatrix"),
+    "csvread": (".datareader", "csvread"),
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -4,7 +4,8 @@ import sys
 import threading
 from ides.mathex.language.transpiler import transpile
 from ides.mathex.kernel.session import KernelSession
-from ides.mathex.kernel.loader import load_and_register
+from ides.mathex.kernel.loader import load_and_register, reload_changed
+from ides.mathex.kernel.path_manager import path_manager
 from ides.mathex.language.functions import registry
 
 # ==========================================================
@@ -104,9 +105,13 @@ def execute(code: str, session: KernelSession, breakpoints: list = None):
 
     tracer = None
 
+    # Files may have been added to the path, or edited, since the previous command
+    path_manager.refresh()
+    reload_changed(session.builtins, session.globals)
+
     try:
         # Transpile Code to Python
-        py, line_map = transpile(code)
+        py, line_map = transpile(code, workspace=session.variable_names())
         
         # ------------------------------------------------
         # DEBUGGER SETUP
@@ -211,7 +216,8 @@ def execute(code: str, session: KernelSession, breakpoints: list = None):
             and isinstance(tree.body[0], ast.Assign)
         ):
             target = tree.body[0].targets[0]
-            if isinstance(target, ast.Name):
+            # Underscore names are internal (e.g. _parfor_result): never echoed
+            if isinstance(target, ast.Name) and not target.id.startswith("_"):
                 name = target.id
                 val = session.globals.get(name)
                 if isinstance(val, bool):
@@ -233,7 +239,7 @@ def execute(code: str, session: KernelSession, breakpoints: list = None):
         # ==========================================================
         try:
             var_name = str(e).split("'")[1]
-            if load_and_register(var_name):
+            if load_and_register(var_name, session.builtins):
                 entry = registry.get(var_name)
                 if entry:
                     session.globals[var_name] = entry.func
@@ -5,7 +5,7 @@ Responsibilities:
 - Manage a call-stack of frames for executing user functions.
 - Provide call_function(name, args, kwargs, session) that:
     * pushes a frame
-    * invokes the FunctionEntry.func with isolation and timeouts (no threads here)
+    * invokes the FunctionEntry.func (no threads here)
     * pops the frame and returns result
 - Provide utilities to create isolated local scopes for debugging.
 """
@@ -72,33 +72,20 @@ def call_function(name: str, args: Tuple[Any, ...], kwargs: Optional[Dict[str, A
     - kwargs: keyword arguments (optional)
     - session: KernelSession instance (gives access to session.globals)
     """
-    if kwargs is None: kwargs = {}
-
     entry = registry.get(name)
     if entry is None:
         raise FunctionRuntimeError(f"Function '{name}' is not registered.")
 
-    # Create a fresh execution globals mapping based on session
-    exec_globals = create_local_scope_from_session(session.globals)
-
-    # Update function's __globals__ if it was compiled with a different dict.
-    # WARNING: changing a function's __globals__ affects closures; do this cautiously.
+    # The function runs in the module scope of its file (see loader.py):
+    # nothing to copy or rebind, the frame just refers to the workspace
     func = entry.func
 
     # Create call frame and push
-    frame = CallFrame(name=name, entry=entry, locals={}, globals=exec_globals)
+    frame = CallFrame(name=name, entry=entry, globals=session.globals)
     call_stack.push(frame)
 
     try:
-        # Execute: if the function is a bound FunctionType, simply call it.
-        # The function's globals were set at compile time (register_from_source used exec with a copy of session.globals).
-        # This call will run using its own __globals__, but we ensure the session values are up-to-date by optionally re-binding names.
-        # Optionally rebind common names:
-        for k, v in session.globals.items():
-            if k in func.__globals__:
-                func.__globals__[k] = v
-
-        result = func(*args, **kwargs)
+        result = func(*args, **kwargs) if kwargs else func(*args)
 
         # update 'ans' in session
         try:
@@ -0,0 +1,346 @@
+"""
+Asynchronous function evaluation on the worker pool (parfeval).
+
+    f = parfeval(@fun, nout, args...)   % returns immediately
+    ...keep working in the console...
+    [a, b] = fetchOutputs(f)            % blocks until fun has finished
+
+The work runs on the same warm process pool as parfor
+(ides.mathex.kernel.parallel). Functions are shipped by reference when the
+worker can resolve them itself (builtins, .m functions from the registry)
+and by value otherwise (anonymous functions, via cloudpickle when installed).
+
+afterEach callbacks run on the kernel thread, never on a pool thread: they
+are queued when their future completes and run at the end of the current
+command, or while wait/fetchOutputs is blocking.
+"""
+
+import io
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError
+from contextlib import redirect_stdout
+
+from ides.mathex.language.builtins import call_nargout
+from shared.symbolic_core.arrays import MatlabArray, mat
+from shared.symbolic_core.lazy import LazyBuiltin
+from ides.mathex.kernel import parallel
+from ides.mathex.kernel.shared_arrays import Lease
+
+_ids = itertools.count(1)
+
+# (afterEach future, index, finished source future) waiting to run on the kernel thread
+_pending_callbacks = deque()
+_callbacks_lock = threading.Lock()
+
+
+# ============================================================
+# Worker Side
+# ============================================================
+
+class _RegistryRef:
+    """A .m function, re-loaded by name on the worker."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def resolve(self):
+        from ides.mathex.kernel.loader import load_and_register
+        from ides.mathex.language.functions import registry
+        entry = registry.get(self.name)
+        session = parallel._worker_session
+        if entry is None and load_and_register(self.name, session.builtins if session else None):
+            entry = registry.get(self.name)
+        if entry is None:
+            raise NameError(f"Undefined function '{self.name}'.")
+        return entry.func
+
+
+def _run_feval(task, nout, cwd, paths):
+    parallel._sync_environment(cwd, paths)
+    function, args = parallel._pickler.loads(task)
+    if isinstance(function, _RegistryRef):
+        function = function.resolve()
+
+    out = io.StringIO()
+    with redirect_stdout(out):
+        result = call_nargout(nout, function, *args)
+    return _split_outputs(result, nout), out.getvalue()
+
+
+def _split_outputs(result, nout):
+    """Function result -> tuple of exactly `nout` outputs."""
+    if nout == 0:
+        return ()
+    if isinstance(result, tuple):
+        if len(result) < nout:
+            raise ValueError("Too many output arguments.")
+        return result[:nout]
+    if nout > 1:
+        raise ValueError("Too many output arguments.")
+    return (result,)
+
+
+# ============================================================
+# Futures
+# ============================================================
+
+class FevalFuture:
+    """
+    Handle to a function evaluated on the pool (or, for afterEach, on the client).
+    Mirrors MATLAB's parallel.FevalFuture properties.
+    """
+
+    def __init__(self, function, nout, future=None):
+        self.ID = next(_ids)
+        self.Function = function
+        self.NumOutputArguments = int(nout)
+        self.Diary = ""
+        self.Error = None
+        self._future = future
+        self._outputs = None
+        self._done = threading.Event()
+        self._cancelled = False
+        self._listeners = []
+        self._lock = threading.Lock()
+
+        if future is not None:
+            future.add_done_callback(self._on_done)
+
+    # ---------------------------------------------------------
+    # State
+    # ---------------------------------------------------------
+    @property
+    def State(self):
+        if self._done.is_set():
+            return "finished"
+        if self._future is not None and self._future.running():
+            return "running"
+        return "queued"
+
+    def done(self):
+        return self._done.is_set()
+
+    def _on_done(self, future):
+        # Runs on a pool management thread: only record the result
+        if not self._cancelled:
+            try:
+                self._outputs, self.Diary = future.result()
+            except CancelledError:
+                self.Error = RuntimeError("Execution of the future was cancelled.")
+            except BaseException as e:
+                self.Error = e
+        self._set_done()
+
+    def _finish(self, outputs=None, error=None):
+        self._outputs = outputs
+        self.Error = error
+        self._set_done()
+
+    def _set_done(self):
+        with self._lock:
+            if self._done.is_set():
+                return
+            self._done.set()
+            listeners, self._listeners = self._listeners, []
+        for listener in listeners:
+            listener(self)
+
+    def _add_listener(self, listener):
+        """Calls listener(self) once finished (immediately if it already is)."""
+        with self._lock:
+            if not self._done.is_set():
+                self._listeners.append(listener)
+                return
+        listener(self)
+
+    def cancel(self):
+        if self._done.is_set():
+            return
+        self._cancelled = True
+        # A task already running on a worker cannot be interrupted; its
+        # result is discarded when it arrives
+        if self._future is not None:
+            self._future.cancel()
+        self._finish(error=RuntimeError("Execution of the future was cancelled."))
+
+    def result(self):
+        """Outputs as a tuple; raises the error of a failed evaluation."""
+        if self.Error is not None:
+            raise self.Error
+        return self._outputs
+
+    # ---------------------------------------------------------
+    # Display
+    # ---------------------------------------------------------
+    def __repr__(self):
+        name = getattr(self.Function, "__name__", None) or str(self.Function)
+        if name == "<lambda>":
+            name = "@(anonymous)"
+        elif not name.startswith("@"):
+            name = f"@{name}"
+        lines = [
+            "FevalFuture with properties:",
+            "",
+            f"                   ID: {self.ID}",
+            f"             Function: {name}",
+            f"   NumOutputArguments: {self.NumOutputArguments}",
+            f"                State: {self.State}",
+        ]
+        if self.Error is not None:
+            lines.append(f"                Error: {self.Error}")
+        return "\n".join(lines)
+
+    __str__ = __repr__
+
+
+def _as_futures(F):
+    if isinstance(F, FevalFuture):
+        return [F]
+    if isinstance(F, MatlabArray):
+        return list(F._data.flat)
+    return list(F)
+
+
+def _shippable(function):
+    """How `function` travels to a worker."""
+    if isinstance(function, (LazyBuiltin, _RegistryRef)):
+        return function
+    from ides.mathex.language.functions import registry
+    entry = registry.get(getattr(function, "__name__", ""))
+    if entry is not None and entry.func is function:
+        return _RegistryRef(entry.name)
+    return function
+
+
+# ============================================================
+# Builtins
+# ============================================================
+
+def parfeval(function, nout, *args):
+    """
+    F = parfeval(@fcn, numout, X1, ..., Xm) - Runs fcn(X1, ..., Xm) on a
+    pool worker and returns a future immediately.
+    """
+    from ides.mathex.kernel.path_manager import path_manager
+
+    if isinstance(function, str):
+        function = _RegistryRef(function)
+    lease = Lease()
+    try:
+        args = tuple(lease.share(a) for a in args)
+        task = parallel._pickler.dumps((_shippable(function), args))
+    except Exception as e:
+        lease.release()
+        raise TypeError(f"parfeval: cannot send the function or its inputs to a worker ({e}).")
+
+    pool = parallel.get_pool()
+    future = pool.submit(_run_feval, task, int(nout), os.getcwd(), list(path_manager.paths))
+    # Shared input buffers stay alive until the worker is done with them
+    future.add_done_callback(lambda _: lease.release())
+    return FevalFuture(function, nout, future)
+
+
+def fetchOutputs(F):
+    """
+    [B1, ..., Bn] = fetchOutputs(F) - Waits for F and returns its outputs.
+    For several futures each output is concatenated vertically.
+    """
+    futures = _as_futures(F)
+    wait(futures)
+
+    failed = next((f for f in futures if f.Error is not None), None)
+    if failed is not None:
+        raise RuntimeError(f"One or more futures resulted in an error: {failed.Error}") from failed.Error
+
+    results = [f.result() for f in futures]
+    nout = futures[0].NumOutputArguments if futures else 0
+    if nout == 0:
+        return None
+
+    if len(results) == 1:
+        outputs = results[0]
+    else:
+        outputs = tuple(mat([[r[k]] for r in results]) for k in range(nout))
+    return outputs[0] if nout == 1 else outputs
+
+
+def wait(F, state="finished", timeout=None):
+    """
+    wait(F) - Blocks until F has finished.
+    tf = wait(F, 'finished', timeout) - Gives up after timeout seconds.
+    Queued afterEach callbacks run while waiting.
+    """
+    futures = _as_futures(F)
+    deadline = None if timeout is None else time.monotonic() + float(timeout)
+    target = str(state)
+
+    def reached(f):
+        if target == "running":
+            return f.State in ("running", "finished")
+        return f.done()
+
+    while True:
+        run_callbacks()
+        if all(reached(f) for f in futures):
+            run_callbacks()
+            return True
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+
+
+def cancel(F):
+    """cancel(F) - Stops queued or running futures."""
+    for f in _as_futures(F):
+        f.cancel()
+
+
+def afterEach(F, function, nout):
+    """
+    B = afterEach(F, @fcn, numout) - Runs fcn on the client with the outputs
+    of each future in F once it has finished. Returns a future for the
+    results of fcn.
+    """
+    futures = _as_futures(F)
+    after = FevalFuture(function, nout)
+    after._sources = futures
+    after._results = [None] * len(futures)
+
+    for k, source in enumerate(futures):
+        def queue_callback(source, k=k):
+            with _callbacks_lock:
+                _pending_callbacks.append((after, k, source))
+        source._add_listener(queue_callback)
+    return after
+
+
+def run_callbacks():
+    """Runs afterEach callbacks whose futures have completed (kernel thread only)."""
+    while True:
+        with _callbacks_lock:
+            if not _pending_callbacks:
+                return
+            after, k, source = _pending_callbacks.popleft()
+        if after.done():
+            continue
+        try:
+            if source.Error is not None:
+                raise source.Error
+            result = call_nargout(after.NumOutputArguments, after.Function, *source.result())
+            after._results[k] = _split_outputs(result, after.NumOutputArguments)
+        except Exception as e:
+            after._finish(error=e)
+            continue
+        if all(r is not None for r in after._results):
+            if len(after._results) == 1:
+                outputs = after._results[0]
+            else:
+                outputs = tuple(
+                    mat([[r[j]] for r in after._results])
+                    for j in range(after.NumOutputArguments)
+                )
+            after._finish(outputs)
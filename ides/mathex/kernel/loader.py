@@ -2,13 +2,40 @@ import os
 import ast
 from ides.mathex.io.mfile import read_mfile
 from ides.mathex.language.transpiler import transpile
+from ides.mathex.language.tokenizer import Tokenizer
+from ides.mathex.language.parser import Parser
+from ides.mathex.language import jit
 from ides.mathex.kernel.path_manager import path_manager
 from ides.mathex.language.functions import registry, FunctionEntry
 
-def load_and_register(name: str):
+def _mtime(filepath):
+    try:
+        return os.stat(filepath).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _global_names(tree):
+    """Names the module's code reads but never binds (candidate callees)."""
+    loads, bound = set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            (loads if isinstance(node.ctx, ast.Load) else bound).add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            bound.add(node.name)    # local and nested functions are private to the file
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+    return loads - bound
+
+
+def load_and_register(name: str, builtins: dict = None):
     """
     Attempts to find, transpile, and register a function named 'name'.
     Strictly handles .m files only.
+
+    A function file runs in its own module scope, initialised from
+    `builtins` (the session's built-in names). The other .m functions it
+    calls are bound in that scope by the registry, now or when they load.
     """
     # 1. Resolve File Path (Strict .m lookup via PathManager)
     filepath = path_manager.resolve(name)
@@ -16,7 +43,8 @@ def load_and_register(name: str):
         return False
 
     try:
-        # 2. Read & Transpile
+        # 2. Read & Transpile (mtime first: an edit during the read is seen next time)
+        mtime = _mtime(filepath)
         code = read_mfile(filepath)
         if code is None: 
             return False
@@ -42,8 +70,8 @@ def load_and_register(name: str):
         # CASE A: FUNCTION (function y = f(x))
         # -------------------------------------------------------
         if is_function:
-            scope = {}
-            # Execute definition into a temporary scope to create the function object
+            scope = dict(builtins) if builtins else {}
+            # Execute definition into the module scope to create the function object
             exec(py_code, scope)
             
             # Retrieve the function object 
@@ -51,8 +79,16 @@ def load_and_register(name: str):
             func_obj = scope.get(func_name_in_code)
             
             if func_obj and callable(func_obj):
+                # Opt-in numba compilation (%#jit / %#codegen pragma or `codegen name`)
+                if jit.wants_jit(name, code):
+                    node = jit.find_function(Parser(Tokenizer(code).iter_tokens()).parse(), func_name_in_code)
+                    if node is not None:
+                        func_obj = jit.JitFunction(node, func_obj)
+
                 # Register under the REQUESTED name 'name' so executor can find it
-                entry = FunctionEntry(name=name, func=func_obj, source=py_code, source_file=filepath)
+                calls = _global_names(tree) - set(builtins or ())
+                entry = FunctionEntry(name=name, func=func_obj, source=py_code, source_file=filepath,
+                                      mtime=mtime, module=scope, calls=calls)
                 registry.register(entry)
                 return True
 
@@ -75,7 +111,7 @@ def load_and_register(name: str):
         script_runner.__mathex_command__ = True
         script_runner.__mathex_script__ = True 
         
-        entry = FunctionEntry(name=name, func=script_runner, source=py_code, source_file=filepath)
+        entry = FunctionEntry(name=name, func=script_runner, source=py_code, source_file=filepath, mtime=mtime)
         registry.register(entry)
         return True
 
@@ -83,4 +119,29 @@ def load_and_register(name: str):
         print(f"Error loading {name}: {e}")
         return False
         
-    return False
\ No newline at end of file
+    return False
+
+
+def reload_changed(builtins: dict = None, namespace: dict = None):
+    """
+    Hot reload: re-loads the registered .m files modified (or deleted)
+    since they were loaded, with one stat per file. Only the changed
+    files are transpiled again; the registry re-binds the new functions
+    in the scopes of their callers. `namespace` (the workspace) gets the
+    new function where it still holds the old one.
+    Returns the names that were reloaded or dropped.
+    """
+    changed = []
+    for entry in registry.entries():
+        if entry.mtime is None or _mtime(entry.filename) == entry.mtime:
+            continue
+        changed.append(entry.name)
+        if not load_and_register(entry.name, builtins):
+            registry.unregister(entry.name)
+        if namespace is not None and namespace.get(entry.name) is entry.func:
+            new = registry.get(entry.name)
+            if new is not None:
+                namespace[entry.name] = new.func
+            else:
+                del namespace[entry.name]
+    return changed
@@ -0,0 +1,389 @@
+"""
+Process-pool runtime for parallel language features (parfor).
+
+Workers are spawned once and kept alive. Each one hosts its own pre-warmed
+KernelSession (builtins, current folder and search path), so a parfor only
+ships its compiled body, the broadcast variables and the iteration values.
+
+Data flow of one parfor:
+  client  -> payload (body source, broadcast values) pickled once;
+             large arrays go to shared memory (see shared_arrays)
+          -> contiguous chunks of loop values, one task per chunk
+  worker  -> runs the chunk: reductions start from their identity,
+             sliced writes A(i) = v are recorded (and applied to a chunk
+             copy of A when the body reads A), printed output is captured
+  client  -> combines reductions in chunk order, replays sliced writes,
+             prints worker output in loop order
+
+Without a usable pool (parfor(..., 0), nested parfor inside a worker, or
+values that cannot be pickled) the same chunk code runs serially here.
+"""
+
+import io
+import os
+import pickle
+import types
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from shared.symbolic_core.arrays import MatlabArray, mat
+from shared.symbolic_core.lazy import LazyBuiltin
+from ides.mathex.kernel.shared_arrays import Lease
+
+try:
+    # Optional: lets anonymous functions (lambdas) cross process boundaries
+    import cloudpickle as _pickler
+except ImportError:
+    _pickler = pickle
+
+CHUNKS_PER_WORKER = 4
+
+_pool = None
+_pool_size = 0
+
+# Worker-side state
+_IN_WORKER = False
+_worker_session = None
+_worker_payloads = {}
+
+
+# ============================================================
+# Pool Management
+# ============================================================
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def get_pool(workers=None):
+    """
+    Returns the shared worker pool, starting (and warming) it if needed.
+    Without `workers` a running pool is reused whatever its size.
+    """
+    global _pool, _pool_size
+    if workers is None and _pool is not None:
+        return _pool
+    workers = int(workers) if workers else default_workers()
+
+    if _pool is not None and _pool_size != workers:
+        shutdown_pool()
+
+    if _pool is None:
+        from ides.mathex.kernel.path_manager import path_manager
+        # spawn: forking a process that runs Qt / kernel threads is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(os.getcwd(), list(path_manager.paths)),
+        )
+        _pool_size = workers
+        # Start every worker now so the first parfor does not pay for it
+        for f in [_pool.submit(_ping) for _ in range(workers)]:
+            f.result()
+    return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_size
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+    _pool = None
+    _pool_size = 0
+
+
+def pool_size():
+    return _pool_size
+
+
+def parpool(workers=None):
+    """
+    parpool(n) - Starts a pool of n workers (default: one per CPU core).
+    parpool(0) shuts the pool down.
+    """
+    if workers is not None and int(workers) == 0:
+        shutdown_pool()
+        return 0
+    get_pool(workers)
+    print(f"Parallel pool running with {_pool_size} workers.")
+    return _pool_size
+
+
+# ============================================================
+# Worker Side
+# ============================================================
+
+def _init_worker(cwd, paths):
+    global _IN_WORKER, _worker_session
+    _IN_WORKER = True
+    from ides.mathex.kernel.session import KernelSession
+    _sync_environment(cwd, paths)
+    _worker_session = KernelSession()
+
+
+def _ping():
+    return os.getpid()
+
+
+def _sync_environment(cwd, paths):
+    from ides.mathex.kernel.path_manager import path_manager
+    if cwd and os.getcwd() != cwd:
+        try:
+            os.chdir(cwd)
+        except OSError:
+            pass
+    for p in paths:
+        path_manager.add_path(p)
+
+
+def _resolve_functions(ns, names):
+    """Loads .m functions used by the body that the worker has not seen yet."""
+    from ides.mathex.kernel.loader import load_and_register
+    from ides.mathex.language.functions import registry
+    for name in names:
+        if name in ns:
+            continue
+        if load_and_register(name, _worker_session.builtins):
+            entry = registry.get(name)
+            if entry is not None:
+                ns[name] = entry.func
+
+
+def _worker_namespace(token, payload):
+    ns = _worker_payloads.get(token)
+    if ns is None:
+        data = _pickler.loads(payload)
+        _sync_environment(data["cwd"], data["paths"])
+        ns = dict(_worker_session.globals)
+        ns.update(data["broadcast"])
+        _resolve_functions(ns, data["names"])
+        exec(data["source"], ns)
+        # Only the most recent parfor is kept
+        _worker_payloads.clear()
+        _worker_payloads[token] = ns
+    return ns
+
+
+def _run_worker_chunk(token, payload, reductions, read_back, values):
+    ns = _worker_namespace(token, payload)
+    return _run_chunk(ns, reductions, read_back, values)
+
+
+def _run_chunk(ns, reductions, read_back, values):
+    """
+    Runs the body over one chunk of loop values.
+    Sliced outputs in `read_back` are also read by the body: their writes
+    go to a private copy too, so A(i) reads back what the iteration wrote.
+    Returns (reduction partials, recorded sliced writes, printed output).
+    """
+    for name, op in reductions:
+        ns[name] = _identity(op, ns.get(name))
+
+    originals = {name: ns.get(name) for name in read_back}
+    for name, value in originals.items():
+        ns[name] = MatlabArray(value) if isinstance(value, MatlabArray) else mat([])
+
+    records = []
+
+    def record(name, value, *idx):
+        records.append((name, value, idx))
+        if name in originals:
+            ns[name].set_val(value, *idx)
+
+    ns["_parfor_out"] = record
+
+    out = io.StringIO()
+    try:
+        with redirect_stdout(out):
+            ns["_parfor_chunk"](values)
+    finally:
+        # A worker's namespace is reused by the next chunk
+        for name, value in originals.items():
+            if value is None:
+                ns.pop(name, None)
+            else:
+                ns[name] = value
+
+    partials = {name: ns[name] for name, _ in reductions}
+    return partials, records, out.getvalue()
+
+
+# ============================================================
+# Reductions
+# ============================================================
+
+def _identity(op, initial):
+    if op in ('+', '-'):
+        return 0
+    if op in ('*', '.*'):
+        return 1
+    if op == '&':
+        return True
+    if op == '|':
+        return False
+    if op in ('[,]', '[;]'):
+        return mat([])
+    # min / max are idempotent: start from the value before the loop
+    return initial
+
+
+def _combine(op, acc, part):
+    if op in ('+', '-'):
+        return acc + part
+    if op == '*':
+        return acc * part
+    if op == '.*':
+        return acc.emul(part) if isinstance(acc, MatlabArray) else part.emul(acc) if isinstance(part, MatlabArray) else acc * part
+    if op == '&':
+        return acc & part
+    if op == '|':
+        return acc | part
+    if op == '[,]':
+        return mat([[acc, part]])
+    if op == '[;]':
+        return mat([[acc], [part]])
+    # min / max: elementwise, like MATLAB's two-argument form
+    a = acc._data if isinstance(acc, MatlabArray) else acc
+    b = part._data if isinstance(part, MatlabArray) else part
+    return MatlabArray((np.minimum if op == 'min' else np.maximum)(a, b))
+
+
+# ============================================================
+# Client Side
+# ============================================================
+
+def _lookup(name, caller_globals, caller_locals):
+    if name in caller_locals:
+        return True, caller_locals[name]
+    if name in caller_globals:
+        return True, caller_globals[name]
+    return False, None
+
+
+def _is_transferable(value):
+    """Data and anonymous functions travel; builtins/.m functions are resolved by the worker."""
+    if isinstance(value, (types.ModuleType, type, types.BuiltinFunctionType, LazyBuiltin)):
+        return False
+    if isinstance(value, types.FunctionType):
+        return value.__name__ == "<lambda>"
+    return True
+
+
+def _split(iterable, n_chunks):
+    """Splits the loop values into contiguous chunks (the columns, like `for`)."""
+    if isinstance(iterable, MatlabArray):
+        data = iterable._data
+        if not hasattr(data, "ndim"):
+            data = data.toarray()
+        count = data.shape[1] if data.ndim > 1 else data.shape[0]
+        if data.ndim < 2:
+            data = data.reshape(1, -1)
+        make = lambda a, b: MatlabArray(data[:, a:b])
+    else:
+        values = list(iterable)
+        count = len(values)
+        make = lambda a, b: values[a:b]
+
+    n_chunks = max(1, min(n_chunks, count))
+    bounds = [count * k // n_chunks for k in range(n_chunks + 1)]
+    return [make(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def parfor_run(caller_globals, caller_locals, iterable, source, loop_var,
+               broadcast, reductions, sliced, max_workers=None):
+    """
+    Executes a transpiled parfor. Returns {name: value} for the reduction
+    and sliced output variables, which the generated code assigns back.
+    """
+    if caller_locals is None:
+        caller_locals = caller_globals
+
+    # --- Initial values of the outputs
+    initial = {}
+    for name, _ in reductions:
+        found, value = _lookup(name, caller_globals, caller_locals)
+        if not found:
+            raise NameError(f"name '{name}' is not defined")
+        initial[name] = value
+
+    outputs = {}
+    for name in sliced:
+        found, value = _lookup(name, caller_globals, caller_locals)
+        outputs[name] = value if found and isinstance(value, MatlabArray) else mat([])
+
+    # Sliced outputs the body also reads (y(i) = ...; z(i) = y(i))
+    read_back = tuple(name for name in sliced if name in broadcast)
+
+    # --- Execute chunks (in parallel when possible)
+    if max_workers is not None:
+        workers = int(max_workers)
+    else:
+        workers = _pool_size if _pool is not None else default_workers()
+    results = None
+    if workers > 1 and not _IN_WORKER:
+        results = _run_parallel(caller_globals, caller_locals, iterable, source,
+                                broadcast, reductions, read_back, workers)
+    if results is None:
+        results = _run_serial(caller_globals, caller_locals, iterable, source,
+                              reductions, read_back, initial)
+
+    # --- Merge, in loop order
+    merged = dict(initial)
+    for partials, records, text in results:
+        if text:
+            print(text, end="")
+        for name, op in reductions:
+            merged[name] = _combine(op, merged[name], partials[name])
+        for name, value, idx in records:
+            outputs[name].set_val(value, *idx)
+
+    merged.update(outputs)
+    return merged
+
+
+def _run_parallel(caller_globals, caller_locals, iterable, source, broadcast, reductions,
+                  read_back, workers):
+    from ides.mathex.kernel.path_manager import path_manager
+
+    values = {}
+    for name in broadcast:
+        found, value = _lookup(name, caller_globals, caller_locals)
+        if found and _is_transferable(value):
+            values[name] = value
+    # min/max reductions start from the client's value on every worker
+    for name, op in reductions:
+        if op in ('min', 'max'):
+            values[name] = _lookup(name, caller_globals, caller_locals)[1]
+
+    # Large arrays travel through shared memory, once for all workers
+    with Lease() as lease:
+        try:
+            payload = _pickler.dumps({
+                "source": source,
+                "broadcast": {name: lease.share(v) for name, v in values.items()},
+                "names": [n for n in broadcast if n not in values],
+                "cwd": os.getcwd(),
+                "paths": list(path_manager.paths),
+            })
+        except Exception:
+            return None  # e.g. an anonymous function without cloudpickle
+
+        # parfor (i = 1:n, M): M caps the workers used from a running pool
+        pool = get_pool(None if _pool is not None else workers)
+        chunks = _split(iterable, min(workers, _pool_size) * CHUNKS_PER_WORKER)
+        token = uuid.uuid4().hex
+        futures = [pool.submit(_run_worker_chunk, token, payload, reductions, read_back, c) for c in chunks]
+        return [f.result() for f in futures]
+
+
+def _run_serial(caller_globals, caller_locals, iterable, source, reductions, read_back, initial):
+    ns = dict(caller_globals)
+    if caller_locals is not caller_globals:
+        ns.update(caller_locals)
+    ns.update(initial)
+    exec(source, ns)
+    return [_run_chunk(ns, reductions, read_back, chunk) for chunk in _split(iterable, 1)]
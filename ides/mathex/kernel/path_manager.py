@@ -1,14 +1,58 @@
 import os
 import sys
+import time
+
+# A directory modified this recently may change again within the same
+# mtime tick, so its index is re-read at the next check.
+_RACY_NS = 100_000_000
+
+
+class _DirIndex:
+    """The .m files of one directory (name -> path), read with one scandir."""
+    __slots__ = ("mtime", "racy", "files", "folded")
+
+    def __init__(self, directory, mtime):
+        self.mtime = mtime
+        self.racy = mtime is not None and time.time_ns() - mtime < _RACY_NS
+        self.files = {}
+        self.folded = {}    # lowercase name -> path (case-insensitive fallback)
+        if mtime is None:
+            return          # missing or unreadable directory: empty
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".m") and entry.is_file():
+                        name = entry.name[:-2]
+                        self.files[name] = entry.path
+                        self.folded.setdefault(name.lower(), entry.path)
+        except OSError:
+            pass
+
+
+def _mtime(directory):
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
 
 class PathManager:
     """
     Manages the search path for .m files.
+
+    Every directory is indexed once (one os.scandir) and re-read only when
+    its mtime changes, i.e. when files are added, removed or renamed in
+    it. The CWD is checked on every lookup (one stat); the addpath
+    directories once per command (see refresh) and after rehash. Results,
+    including names that are not on the path, are cached until an index
+    changes.
     """
     def __init__(self):
         # We store explicit paths added via addpath()
         self.paths = []
-        self._cache = {}
+        self._indices = {}      # directory -> _DirIndex
+        self._cache = {}        # name -> (exact, case-insensitive) match on the paths, or None
+        self._stale = True      # addpath directories need an mtime check
 
     def add_path(self, path):
         p = os.path.abspath(path)
@@ -23,37 +67,75 @@ class PathManager:
             self.clear_cache()
 
     def clear_cache(self):
+        """Forgets every index (the next lookup re-reads the directories)."""
+        self._indices = {}
         self._cache = {}
+        self._stale = True
+
+    def refresh(self):
+        """Marks the addpath directories for an mtime check (start of each command)."""
+        self._stale = True
+
+    def _index(self, directory):
+        mtime = _mtime(directory)
+        index = self._indices.get(directory)
+        if index is None or index.mtime != mtime or index.racy:
+            index = self._indices[directory] = _DirIndex(directory, mtime)
+            return index, True
+        return index, False
+
+    def _validate(self):
+        changed = False
+        for p in self.paths:
+            changed |= self._index(p)[1]
+        if changed:
+            self._cache = {}
+        self._stale = False
 
     def resolve(self, name):
         """
         Finds the .m file for a given function name.
         STRICTLY looks for .m files. No .py support.
-        
+
         Priority:
         1. Current Working Directory (CWD)
         2. Explicit Paths (addpath)
+        An exact match anywhere wins over a case-insensitive one.
         """
-        filename = f"{name}.m"
-        
         # 1. Check CWD (Dynamic!)
-        cwd = os.getcwd()
-        cwd_file = os.path.join(cwd, filename)
-        if os.path.exists(cwd_file):
-            return cwd_file
+        cwd_index, changed = self._index(os.getcwd())
+        if changed:
+            self._cache = {}    # the CWD may be on the path too
+        found = cwd_index.files.get(name)
+        if found is not None:
+            return found
 
-        # 2. Check Cache
-        if name in self._cache:
-            return self._cache[name]
+        # 2. Check Cache (hits and misses)
+        if self._stale:
+            self._validate()
+        entry = self._cache.get(name)
+        if entry is None:
+            # 3. Search the indices of the explicit paths
+            entry = self._cache[name] = self._search(name)
+        exact, folded = entry
+        if exact is not None:
+            return exact
 
-        # 3. Search in explicit paths
+        # 4. Case-insensitive fallback (CWD first)
+        return cwd_index.folded.get(name.lower()) or folded
+
+    def _search(self, name):
+        """(exact match, case-insensitive match) on the explicit paths."""
+        exact = folded = None
+        lower = name.lower()
         for p in self.paths:
-            full_path = os.path.join(p, filename)
-            if os.path.exists(full_path):
-                self._cache[name] = full_path
-                return full_path
-        
-        return None
+            index = self._indices[p]
+            exact = index.files.get(name)
+            if exact is not None:
+                break
+            if folded is None:
+                folded = index.folded.get(lower)
+        return exact, folded
 
 # Global instance
-path_manager = PathManager()
\ No newline at end of file
+path_manager = PathManager()
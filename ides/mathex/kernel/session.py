@@ -1,10 +1,16 @@
 import time
 import os
+import sys
+import types
+import importlib.util
+from dataclasses import dataclass, field
+from typing import List
 import numpy as np
-from ides.mathex.language import builtins
+from ides.mathex.language import builtins, jit
 from ides.mathex.kernel.path_manager import path_manager
 from ides.mathex.kernel.loader import load_and_register
 from ides.mathex.language.functions import registry
+from shared.symbolic_core.lazy import LazyBuiltin
 
 # [FIX] Explicitly import constants to ensure they exist in session
 from shared.symbolic_core.physics import (
@@ -12,10 +18,6 @@ from shared.symbolic_core.physics import (
     convtemp, convlength, convmass, convforce, convpres, convenergy,
     c, G, h, k, g  # Imported directly from physics.py
 )
-try:
-    from PySide6.QtWidgets import QApplication
-except Exception:
-    QApplication = None
 
 # ------------------------------------------------------------
 # Core Math Engine
@@ -23,82 +25,71 @@ except Exception:
 from shared.symbolic_core import functions as _mlfun
 from shared.symbolic_core.arrays import (
     MatlabArray, mat, zeros, ones, eye, linspace, arange,
-    sparse, full, colon, cell, _shape
+    sparse, full, colon, cell, _shape,
+    for_range, scalar_div, scalar_pow, box_scalar, box_scalars,
+    vector_range, vector_scalar, vector_get, vector_target,
+    vector_div, vector_pow, vector_call, vector_reduce,
+    matlab_end, IndexPlan
 )
+from shared.symbolic_core.structs import MatlabStruct
+from ides.mathex import io as _mxio
 
 # ------------------------------------------------------------
-# Linear Algebra
-# ------------------------------------------------------------
-from shared.symbolic_core.linalg import (
-    inv, det, eig, rank, norm, lu,
-    svd, qr, pinv, null, orth,
-    expm, sqrtm, hess, schur, chol,
-    gmres, pcg, cond, eigs
-)
-
-# ------------------------------------------------------------
-# Statistics & Calculus
-# ------------------------------------------------------------
-from shared.symbolic_core.statistics import (
-    mean, std, max_func, min_func, sum_func,
-    corrcoef, cov, histcounts, nlinfit
-)
-
-# ------------------------------------------------------------
-# Optimization
-# ------------------------------------------------------------
-try:
-    from shared.symbolic_core.optim import (
-        fminsearch, fzero, lsqcurvefit,
-        fmincon, linprog
-    )
-except ImportError:
-    fminsearch = fzero = lsqcurvefit = fmincon = linprog = None
-
-# ------------------------------------------------------------
-# Advanced Toolbox
+# Deferred Builtins
 # ------------------------------------------------------------
-from ides.mathex.toolbox import (
-    meshgrid, sphere, cylinder,
-    gradient, cross, dot,
-    ode45, ode23, ode15s, bvp4c,
-    fft, ifft,
-    roots, polyval, trapz, cumtrapz, integral,
-    interp1, interp2, griddata,
-    fftshift, ifftshift, spectrogram,
-    pdepe,
-    # [NEW] Import new signal tools
-    fft2, ifft2, filter
+# Linear algebra, statistics, optimization, the toolbox, symbolic math,
+# I/O, plotting (matplotlib), image processing and control are registered
+# as LazyBuiltin placeholders: their modules (SciPy, SymPy, pandas, numba,
+# scikit-image, matplotlib...) are imported on the first call, not before
+# the first prompt. PySide6 is never imported here; the GUI brings it in.
+
+def _deferred(module, *names, **renamed):
+    """Builtins table entries for `names` (and name=attribute pairs) of `module`."""
+    table = {name: LazyBuiltin(module, name) for name in names}
+    table.update({name: LazyBuiltin(module, attr) for name, attr in renamed.items()})
+    return table
+
+
+# Public API of shared.plotting_engine (kept in sync with its __all__)
+_PLOTTING_NAMES = (
+    # handle graphics
+    "set", "get",
+    # 2D
+    "plot", "line", "scatter",
+    "bar", "barh", "barstacked",
+    "area", "areastacked",
+    "histogram", "hist", "pie",
+    "errorbar", "stem", "stairs", "boxplot",
+    "contour", "contourf", "pcolor",
+    "imagesc", "imshow", "heatmap",
+    "gscatter", "plotmatrix",
+    "subplot", "title", "xlabel", "ylabel", "zlabel",
+    "grid", "xlim", "ylim", "zlim", "axis",
+    "colorbar", "legend",
+    "quiver", "streamline", "colormap", "caxis",
+    # 3D
+    "plot3", "scatter3",
+    "surf", "mesh",
+    "contour3", "contourf3",
+    "view", "axis3", "shading",
+    "quiver3",
+    "lighting", "camlight",
+    # figures
+    "figure", "gcf", "clf", "close", "closeall", "hold",
+    # animation
+    "drawnow", "getframe", "movie",
+    "animatedline", "addpoints", "clearpoints",
+    "comet", "comet3", "drawnowlimit",
 )
 
-# [NEW] Image Processing Toolbox (Robust Import)
-try:
-    import mathex.toolbox.images as images
-except ImportError:
-    images = None
 
-# ------------------------------------------------------------
-# Plotting
-# ------------------------------------------------------------
-import shared.plotting_engine as _plt_mod
-from shared.plotting_engine.state import plot_manager
-from shared.plotting_engine.engine import PlotEngine
+def _plot_manager():
+    from shared.plotting_engine.state import plot_manager
+    return plot_manager
 
-# ------------------------------------------------------------
-# I/O & Structs
-# ------------------------------------------------------------
-from ides.mathex.io import (
-    save_workspace, load_workspace, writematrix, saveas,
-    readtable, readmatrix, csvread
-)
-from shared.symbolic_core.structs import MatlabStruct
 
-# ------------------------------------------------------------
-# Symbolic Math
-# ------------------------------------------------------------
-from shared.symbolic_core.symbolic import (
-    syms, diff, int_func, expand, simplify, factor, solve, subs, limit
-)
+def _has_module(name):
+    return importlib.util.find_spec(name) is not None
 
 # ============================================================
 # Helpers & Commands
@@ -130,6 +121,9 @@ def addpath(p):
 def rmpath(p):
     path_manager.remove_path(p)
 
+def rehash():
+    path_manager.clear_cache()
+
 def cd(p=None):
     if p is None:
         print(os.getcwd())
@@ -156,6 +150,67 @@ def ls(p='.'):
 cd.__mathex_command__ = True
 pwd.__mathex_command__ = True
 ls.__mathex_command__ = True
+rehash.__mathex_command__ = True
+
+# ============================================================
+# Workspace Change Log
+# ============================================================
+
+@dataclass
+class WorkspaceChanges:
+    """Names added, changed and removed since the previous drain."""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+
+class _VariableNames:
+    """`name in names` is True while `name` is a user variable of the session."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def __contains__(self, name):
+        value = self.session.globals.get(name, _VariableNames)
+        return value is not _VariableNames and self.session.is_user_variable(name, value)
+
+
+# Values that cannot change in place: identity alone tells if they changed
+_STABLE_TYPES = (int, float, complex, str, bool, tuple, np.generic, types.FunctionType, type)
+
+
+def _stamp(value):
+    """
+    Change stamp for a workspace value: (value, version).
+    The value itself is kept (not its id) so a freed object's address
+    being reused can never look like 'unchanged'.
+    MatlabArray (cells included) bumps `_version` on in-place writes
+    (A(3) = 5), MatlabStruct on field assignments (s.a = 1).
+    Returns None for other mutable objects, which are always re-reported.
+    """
+    if isinstance(value, _STABLE_TYPES):
+        return (value, 0)
+    if isinstance(value, MatlabStruct):
+        return (value, _struct_version(value))
+    version = getattr(type(value), "_version", None)
+    if version is not None:
+        return (value, value._version)
+    return None
+
+
+def _struct_version(s):
+    """Versions of a struct and of the structs / arrays in its fields (s.b.c = 1, s.x(3) = 5)."""
+    parts = [getattr(s, "_version", 0)]
+    for value in vars(s).values():
+        if isinstance(value, MatlabStruct):
+            parts.append(_struct_version(value))
+        elif isinstance(value, MatlabArray):
+            parts.append(value._version)
+    return tuple(parts)
+
 
 # ============================================================
 # Kernel Session
@@ -170,14 +225,18 @@ class KernelSession:
         self.globals = {}
         # We need to know what keys are "System Builtins" so we don't delete them on 'clear'
         self._builtins_set = set() 
+        self._builtin_values = {}
+        self._var_stamps = {}
         self.reset()
 
     def reset(self):
         self.globals = {}
 
-        if getattr(plot_manager, "widget", None):
+        # Re-attach an existing plot widget (only if plotting was ever used)
+        state = sys.modules.get("shared.plotting_engine.state")
+        if state is not None and getattr(state.plot_manager, "widget", None):
             try:
-                plot_manager.set_widget(plot_manager.widget)
+                state.plot_manager.set_widget(state.plot_manager.widget)
             except Exception:
                 pass
 
@@ -207,6 +266,24 @@ class KernelSession:
             "full": full,
             "colon": colon,
             "cell": cell,
+            # Emitted by the transpiler where inference proved scalars
+            "_for_range": for_range,
+            "_sdiv": scalar_div,
+            "_spow": scalar_pow,
+            "_box": box_scalar,
+            "_box_scalars": box_scalars,
+            # ...and for vectorized for loops
+            "_vrange": vector_range,
+            "_vscalar": vector_scalar,
+            "_vget": vector_get,
+            "_vtarget": vector_target,
+            "_vdiv": vector_div,
+            "_vpow": vector_pow,
+            "_vcall": vector_call,
+            "_vreduce": vector_reduce,
+            # ...and for subscripts
+            "_end": matlab_end,
+            "_IndexPlan": IndexPlan,
         })
 
         # Helpers
@@ -219,6 +296,11 @@ class KernelSession:
             "struct": builtins.struct,
             "MatlabStruct": MatlabStruct,
             "deal": builtins.deal,
+            "sort": builtins.sort,
+            # Emitted by the transpiler for multiple assignments
+            "_nargout": builtins.call_nargout,
+            # ...and around anonymous functions
+            "_anonymous": jit.anonymous,
             "num2str": builtins.num2str,
         })
 
@@ -233,33 +315,31 @@ class KernelSession:
         })
 
         # Linear Algebra
-        self.globals.update({
-            "inv": inv, "det": det, "eig": eig, "rank": rank, "norm": norm,
-            "lu": lu, "svd": svd, "qr": qr, "pinv": pinv, "null": null, "orth": orth,
-            "expm": expm, "sqrtm": sqrtm, "hess": hess, "schur": schur, "chol": chol,
-            "gmres": gmres, "pcg": pcg, "cond": cond, 
-            "eigs": eigs,
-        })
+        self.globals.update(_deferred(
+            "shared.symbolic_core.linalg",
+            "inv", "det", "eig", "rank", "norm",
+            "lu", "svd", "qr", "pinv", "null", "orth",
+            "expm", "sqrtm", "hess", "schur", "chol",
+            "gmres", "pcg", "cond",
+            "eigs",
+        ))
 
         # Statistics
-        self.globals.update({
-            "mean": mean, "std": std, "max": max_func, "min": min_func, "sum": sum_func,
-            "corrcoef": corrcoef, "cov": cov, "histcounts": histcounts, 
-            "nlinfit": nlinfit,
-        })
+        self.globals.update(_deferred(
+            "shared.symbolic_core.statistics",
+            "mean", "std",
+            "corrcoef", "cov", "histcounts",
+            "nlinfit",
+            max="max_func", min="min_func", sum="sum_func",
+        ))
 
         # Symbolic & Calculus
-        self.globals.update({
-            "syms": syms,
-            "diff": diff,
-            "int": int_func,
-            "expand": expand,
-            "simplify": simplify,
-            "factor": factor,
-            "solve": solve,
-            "subs": subs,
-            "limit": limit,
-        })
+        self.globals.update(_deferred(
+            "shared.symbolic_core.symbolic",
+            "syms", "diff", "expand", "simplify", "factor",
+            "solve", "subs", "limit",
+            int="int_func",
+        ))
         
         # Physics Constants & Converters
         hbar_val = getattr(constants_struct, 'hbar', None)
@@ -285,40 +365,33 @@ class KernelSession:
         })
 
         # Optimization
-        if fminsearch:
-            self.globals.update({
-                "fminsearch": fminsearch,
-                "fzero": fzero,
-                "lsqcurvefit": lsqcurvefit,
-                "fmincon": fmincon,
-                "linprog": linprog,
-            })
+        self.globals.update(_deferred(
+            "shared.symbolic_core.optim",
+            "fminsearch", "fzero", "lsqcurvefit", "fmincon", "linprog",
+        ))
 
         # Toolbox
-        self.globals.update({
-            "meshgrid": meshgrid, "sphere": sphere, "cylinder": cylinder,
-            "gradient": gradient, "cross": cross, "dot": dot,
-            "ode45": ode45, "ode23": ode23, "ode15s": ode15s, "bvp4c": bvp4c,
-            "fft": fft, "ifft": ifft, "roots": roots, "polyval": polyval,
-            "trapz": trapz, "cumtrapz": cumtrapz, "integral": integral,
-            "interp1": interp1, "interp2": interp2, "griddata": griddata,
-            "fftshift": fftshift, "ifftshift": ifftshift, "spectrogram": spectrogram,
-            "pdepe": pdepe,
+        self.globals.update(_deferred(
+            "ides.mathex.toolbox",
+            "meshgrid", "sphere", "cylinder",
+            "gradient", "cross", "dot",
+            "ode45", "ode23", "ode15s", "odeset", "bvp4c", "deval", "odeensemble",
+            "fft", "ifft", "roots", "polyval",
+            "trapz", "cumtrapz", "integral",
+            "interp1", "interp2", "griddata",
+            "fftshift", "ifftshift", "spectrogram",
+            "pdepe",
             # [NEW] Register Signal Tools
-            "fft2": fft2,
-            "ifft2": ifft2,
-            "filter": filter,
-        })
+            "fft2", "ifft2", "filter",
+        ))
 
         # [NEW] Register Image Processing Tools
-        if images:
-            self.globals.update({
-                "imread": images.imread,
-                "imshow": images.imshow,
-                "rgb2gray": images.rgb2gray,
-                "imresize": images.imresize,
-                "imfilter": images.imfilter, # Distinct from signal 'filter'
-            })
+        if _has_module("skimage"):
+            self.globals.update(_deferred(
+                "ides.mathex.toolbox.images",
+                "imread", "imshow", "rgb2gray", "imresize",
+                "imfilter", # Distinct from signal 'filter'
+            ))
 
         # [CRITICAL FIX] Manually register core math functions.
         # This guarantees they exist and are protected from 'clear'.
@@ -348,28 +421,18 @@ class KernelSession:
             pass
 
         # Plotting API
-        for name in dir(_plt_mod):
-            if not name.startswith("_"):
-                try:
-                    self.globals[name] = getattr(_plt_mod, name)
-                except Exception:
-                    pass
+        self.globals.update(_deferred("shared.plotting_engine", *_PLOTTING_NAMES))
 
         self.globals.update({
-            "clf": lambda: plot_manager.clf(),
+            "clf": lambda: _plot_manager().clf(),
             "cla": self._cla,
-            "hold": lambda mode=True: plot_manager.hold(mode),
+            "hold": lambda mode=True: _plot_manager().hold(mode),
         })
 
         # I/O
         self.globals.update({
-            "save": lambda f="workspace.mat": save_workspace(self, f),
-            "load": lambda f="workspace.mat": load_workspace(self, f),
-            "writematrix": writematrix,
-            "readmatrix": readmatrix,
-            "readtable": readtable,
-            "csvread": csvread,
-            "saveas": saveas,
+            "save": lambda f="workspace.mat": _mxio.save_workspace(self, f),
+            "load": lambda f="workspace.mat": _mxio.load_workspace(self, f),
             "disp": builtins.disp,
             "clear": self._clear_user,
             "clc": builtins.clc,
@@ -378,23 +441,97 @@ class KernelSession:
             "whos": lambda: builtins.whos(self.globals),
             "exist": lambda n, k=None: builtins.exist(n, k, self.globals),
         })
+        self.globals.update(_deferred(
+            "ides.mathex.io",
+            "writematrix", "readmatrix", "readtable", "csvread", "saveas",
+        ))
         
         # Control Toolbox
-        try:
-            from ides.mathex.toolbox.control import (
-                tf, step, impulse, bode, series, parallel, feedback,
-                rlocus 
-            )
-            self.globals.update({
-                "tf": tf, "step": step, "impulse": impulse,
-                "bode": bode, "series": series, "parallel": parallel,
-                "feedback": feedback, "rlocus": rlocus,
-            })
-        except ImportError:
-            pass
+        self.globals.update(_deferred(
+            "ides.mathex.toolbox.control",
+            "tf", "step", "impulse",
+            "bode", "series", "parallel",
+            "feedback", "rlocus",
+        ))
+
+        # Parallel computing (parfor runtime is called by transpiled code)
+        self.globals.update(_deferred(
+            "ides.mathex.kernel.parallel",
+            "parpool", _parfor_run="parfor_run",
+        ))
+        self.globals.update(_deferred(
+            "ides.mathex.kernel.futures",
+            "parfeval", "fetchOutputs", "wait", "cancel", "afterEach",
+        ))
+        self.globals["codegen"] = self._codegen
         
         # Snapshot built-ins to protect them from 'clear'
         self._builtins_set = set(self.globals.keys())
+        # ...and their values, so a user rebinding (sum = 3) counts as a variable
+        self._builtin_values = dict(self.globals)
+        self._var_stamps = {}
+
+    @property
+    def builtins(self):
+        """The built-in names (and the values they started with); .m function files run on these."""
+        return self._builtin_values
+
+    def set_variable(self, name, value):
+        self.globals[name] = value
+
+    # ------------------------------------------------------------
+    # Workspace change log (consumed by the Workspace panel)
+    # ------------------------------------------------------------
+    def is_user_variable(self, name, value):
+        """True for workspace variables; False for builtins, modules and loaded .m functions."""
+        if name.startswith("_") or isinstance(value, types.ModuleType):
+            return False
+        if name in self._builtins_set and self._builtin_values.get(name) is value:
+            return False
+        entry = registry.get(name)
+        if entry is not None and entry.func is value:
+            return False
+        return True
+
+    def user_variables(self):
+        return {k: v for k, v in self.globals.items() if self.is_user_variable(k, v)}
+
+    def variable_names(self):
+        """Live view of the user variable names; membership is checked on demand."""
+        return _VariableNames(self)
+
+    def drain_changes(self) -> WorkspaceChanges:
+        """
+        Returns the user variables added/changed/removed since the last call.
+        Consumers only need to re-render the names listed here.
+        """
+        old = self._var_stamps
+        stamps = {}
+        changes = WorkspaceChanges()
+
+        # Candidates: names that are not builtins, and builtins the user
+        # rebound (sum = 3); the hundreds of untouched builtins are skipped
+        # by a set difference and an identity check
+        g = self.globals
+        names = g.keys() - self._builtins_set
+        names.update(name for name, value in self._builtin_values.items() if g.get(name, value) is not value)
+
+        for name in sorted(names):
+            value = g[name]
+            if not self.is_user_variable(name, value):
+                continue
+            stamp = _stamp(value)
+            stamps[name] = stamp
+            if name not in old:
+                changes.added.append(name)
+            else:
+                prev = old[name]
+                if stamp is None or prev is None or prev[0] is not value or prev[1] != stamp[1]:
+                    changes.changed.append(name)
+
+        changes.removed = [name for name in old if name not in stamps]
+        self._var_stamps = stamps
+        return changes
 
     def execute(self, code: str):
         from ides.mathex.kernel.executor import execute as _exec
@@ -404,21 +541,40 @@ class KernelSession:
             self._after_execute()
 
     def _after_execute(self):
-        try:
-            PlotEngine.show()
-        except Exception:
-            pass
-        try:
-            if QApplication:
-                QApplication.processEvents()
-        except Exception:
-            pass
+        # afterEach callbacks of finished parfeval futures run on this thread
+        futures = sys.modules.get("ides.mathex.kernel.futures")
+        if futures is not None:
+            futures.run_callbacks()
+
+        # Nothing to flush unless plotting / the Qt GUI have been loaded
+        engine = sys.modules.get("shared.plotting_engine.engine")
+        if engine is not None:
+            try:
+                engine.PlotEngine.show()
+            except Exception:
+                pass
+        qt_widgets = sys.modules.get("PySide6.QtWidgets")
+        if qt_widgets is not None:
+            try:
+                qt_widgets.QApplication.processEvents()
+            except Exception:
+                pass
 
     def _drawnow(self):
         self._after_execute()
 
+    def _codegen(self, name, *options):
+        """codegen fun - Compiles fun.m with numba, once per argument signature."""
+        name = str(name)
+        jit.requested.add(name)
+        if not load_and_register(name, self.builtins):
+            print(f"Error: Undefined function '{name}'.")
+            return
+        self.globals[name] = registry.get(name).func
+        print(f"Code generation enabled for '{name}'.")
+
     def _cla(self):
-        ax = plot_manager.gca()
+        ax = _plot_manager().gca()
         if ax:
             ax.clear()
 
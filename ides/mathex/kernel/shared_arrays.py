@@ -0,0 +1,224 @@
+"""
+Shared-memory transport of MatlabArray data to worker processes.
+
+Pickling a large matrix into every task copies it once per task (and once
+more into each worker). Instead, dense numeric buffers above
+MIN_SHARED_BYTES are copied once into a `multiprocessing.shared_memory`
+segment; tasks carry a small SharedArrayRef and workers map the segment
+as a read-only MatlabArray.
+
+Lifetime (client side), per source buffer:
+- one segment per ndarray, reused by every parfor / parfeval in flight
+  that sends it
+- leases count tasks in flight; the segment is unlinked once no lease is
+  left (or at exit), and survives its source array while still leased
+
+Copy-on-write protection:
+- the client's buffer is marked read-only while it is shared, so any
+  MatlabArray write (A(3) = 5) copies first and the segment never goes stale
+- when the last lease is released the buffer is made writable again (if it
+  was before) together with dropping the segment, so in-place writers such
+  as the Variable Inspector keep working
+- worker views are read-only too; writes inside a worker copy locally
+"""
+
+import atexit
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from shared.symbolic_core.arrays import MatlabArray, _from_data
+
+MIN_SHARED_BYTES = 1 << 20
+
+# Segments a worker keeps mapped after their task finished
+WORKER_CACHE_SIZE = 16
+
+
+class _Segment:
+    __slots__ = ("shm", "leases", "source", "writeable")
+
+    def __init__(self, shm, data):
+        self.shm = shm
+        self.leases = 0
+        self.source = weakref.ref(data)
+        self.writeable = data.flags.writeable
+
+
+# id(source ndarray) -> _Segment (client side)
+_segments = {}
+_lock = threading.Lock()
+
+# segment name -> SharedMemory mapped by this process (worker side)
+_attached = OrderedDict()
+
+
+# ============================================================
+# Handles
+# ============================================================
+
+class SharedArrayRef:
+    """Picklable handle to a shared buffer; unpickles as a read-only MatlabArray."""
+    __slots__ = ("name", "shape", "dtype", "order")
+
+    def __init__(self, name, shape, dtype, order):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+        self.order = order
+
+    def __reduce__(self):
+        return (_attach, (self.name, self.shape, self.dtype, self.order))
+
+
+def is_shareable(value):
+    if not isinstance(value, MatlabArray):
+        return False
+    data = value._data
+    return (
+        isinstance(data, np.ndarray)
+        and data.dtype.kind in "biufc"
+        and data.nbytes >= MIN_SHARED_BYTES
+    )
+
+
+# ============================================================
+# Client Side
+# ============================================================
+
+class Lease:
+    """
+    Shares values for the tasks of one parfor / parfeval call and keeps
+    their segments alive until release() (or the end of a `with` block).
+    """
+
+    def __init__(self):
+        self._keys = []
+
+    def share(self, value):
+        """SharedArrayRef for a large dense MatlabArray; any other value unchanged."""
+        if not is_shareable(value):
+            return value
+        data = value._data
+        key = id(data)
+
+        with _lock:
+            segment = _segments.get(key)
+            if segment is None or segment.source() is not data:
+                if segment is not None:
+                    _unlink(key)  # id() reused by a new array
+                segment = _export(data)
+                _segments[key] = segment
+            segment.leases += 1
+            # CoW protection: until release() writes through MatlabArray copy first
+            data.flags.writeable = False
+        self._keys.append(key)
+
+        order = "F" if data.flags.f_contiguous and not data.flags.c_contiguous else "C"
+        return SharedArrayRef(segment.shm.name, data.shape, data.dtype.str, order)
+
+    def release(self):
+        with _lock:
+            keys, self._keys = self._keys, []
+            for key in keys:
+                segment = _segments.get(key)
+                if segment is None:
+                    continue
+                segment.leases -= 1
+                if segment.leases <= 0:
+                    _restore(segment)
+                    _unlink(key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+def _export(data):
+    shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    order = "F" if data.flags.f_contiguous and not data.flags.c_contiguous else "C"
+    view = np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf, order=order)
+    view[...] = data
+    del view
+    return _Segment(shm, data)
+
+
+def _restore(segment):
+    """Gives the source buffer back its writability once nothing is in flight."""
+    data = segment.source()
+    if data is not None and segment.writeable:
+        try:
+            data.flags.writeable = True
+        except ValueError:
+            pass  # a view whose base has been made read-only meanwhile
+
+
+def _unlink(key):
+    segment = _segments.pop(key)
+    try:
+        segment.shm.close()
+        segment.shm.unlink()
+    except (BufferError, FileNotFoundError):
+        pass
+
+
+def shared_bytes():
+    """Total size of the segments currently exported by this process."""
+    with _lock:
+        return sum(s.shm.size for s in _segments.values())
+
+
+@atexit.register
+def release_all():
+    with _lock:
+        for key in list(_segments):
+            _unlink(key)
+
+
+# ============================================================
+# Worker Side
+# ============================================================
+
+def _open(name):
+    """Maps an existing segment without handing it to the resource tracker."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching registers the segment as if this process owned
+    # it, and the tracker would unlink it when the worker exits
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _attach(name, shape, dtype, order):
+    shm = _attached.get(name)
+    if shm is None:
+        shm = _open(name)
+        _attached[name] = shm
+        _trim_attached()
+    else:
+        _attached.move_to_end(name)
+
+    data = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, order=order)
+    data.flags.writeable = False
+    return _from_data(data)
+
+
+def _trim_attached():
+    for name in list(_attached)[:-WORKER_CACHE_SIZE]:
+        try:
+            _attached[name].close()
+        except BufferError:
+            continue  # still viewed by a live array; retried on the next trim
+        del _attached[name]
@@ -1,9 +1,105 @@
 import io
+import threading
+import time
 
-class StdoutBuffer(io.StringIO):
+
+class StdoutBuffer(io.TextIOBase):
     """
-    Thread-safe buffer for capturing stdout if we move to multi-threading.
-    For Phase 1 (Single Thread), io.StringIO is sufficient, 
-    but this keeps the architecture extensible.
+    Thread-safe streaming replacement for sys.stdout.
+
+    Kernel output is accumulated and handed to `sink` in chunks instead of
+    being held until execution ends. A chunk is emitted when either:
+    - `max_chars` characters are pending (size bound), or
+    - `interval` seconds have passed since the last emit (time bound).
+
+    The time bound is enforced by a small daemon flusher thread, so a script
+    that prints once and then computes for a minute still shows its output.
+    Memory use is bounded by `max_chars`, not by the total amount printed.
     """
-    pass
\ No newline at end of file
+
+    def __init__(self, sink, interval=0.05, max_chars=64 * 1024):
+        super().__init__()
+        self._sink = sink
+        self._interval = interval
+        self._max_chars = max_chars
+
+        self._lock = threading.RLock()
+        self._pending = []
+        self._pending_len = 0
+        self._last_emit = time.monotonic()
+
+        self._stop = threading.Event()
+        self._flusher = None
+
+    # ---------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------
+    def start(self):
+        """Starts the background flusher (idempotent)."""
+        if self._flusher is None and self._interval:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="mathex-stdout", daemon=True
+            )
+            self._flusher.start()
+        return self
+
+    def close(self):
+        """Stops the flusher and emits whatever is still pending."""
+        if self.closed:
+            return
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+        super().close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # ---------------------------------------------------------
+    # TextIO API
+    # ---------------------------------------------------------
+    def writable(self):
+        return True
+
+    def write(self, text):
+        if not text:
+            return 0
+        with self._lock:
+            self._pending.append(text)
+            self._pending_len += len(text)
+            if self._pending_len >= self._max_chars:
+                self._emit()
+        return len(text)
+
+    def flush(self):
+        with self._lock:
+            self._emit()
+
+    # ---------------------------------------------------------
+    # Internals
+    # ---------------------------------------------------------
+    def _emit(self):
+        """
+        Hands pending text to the sink as one chunk.
+        Caller must hold the lock; emitting under it keeps chunks ordered
+        when the writer and the flusher race.
+        """
+        if not self._pending:
+            return
+        chunk = "".join(self._pending)
+        self._pending = []
+        self._pending_len = 0
+        self._last_emit = time.monotonic()
+        self._sink(chunk)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self._interval):
+            with self._lock:
+                if time.monotonic() - self._last_emit >= self._interval:
+                    self._emit()
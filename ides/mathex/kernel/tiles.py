@@ -0,0 +1,202 @@
+"""
+Tiled, on-demand access to workspace arrays (used by the Variable Inspector).
+
+The inspector never copies or formats a whole array. It asks an ArraySource
+for fixed-size tiles around the visible cells, and a TileCache keeps the
+formatted strings of recently viewed tiles with LRU eviction.
+
+- LocalArraySource reads straight from the kernel's data: dense arrays,
+  np.memmap (only the touched pages are read), N-D arrays (one 2-D plane,
+  no up-front slice copy) and SciPy sparse matrices (only the tile is
+  densified, never the whole matrix).
+- CallbackArraySource adapts any fetch/store callables, e.g. RPC stubs
+  talking to a kernel running in another process.
+"""
+
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse
+
+TILE_SIZE = 64
+MAX_TILES = 256
+
+
+def format_cell(val):
+    """MATLAB-style display string for one element."""
+    if isinstance(val, (bool, np.bool_)):
+        return str(int(val))
+    if isinstance(val, (float, np.floating)):
+        return f"{val:.4f}"
+    if isinstance(val, (complex, np.complexfloating)):
+        # MATLAB Style: 1.0000 + 2.0000i
+        op = "+" if val.imag >= 0 else "-"
+        return f"{val.real:.4f} {op} {abs(val.imag):.4f}i"
+    return str(val)
+
+
+# ============================================================
+# Sources
+# ============================================================
+
+class ArraySource:
+    """
+    Read/write window onto a 2-D plane of an array.
+
+    Subclasses provide `shape` (rows, cols), `dtype`, and:
+      fetch(r0, r1, c0, c1) -> 2-D ndarray of the half-open block
+      store(row, col, value)
+    """
+    shape = (0, 0)
+    dtype = None
+
+    def fetch(self, r0, r1, c0, c1):
+        raise NotImplementedError
+
+    def store(self, row, col, value):
+        raise NotImplementedError
+
+
+class LocalArraySource(ArraySource):
+    """Source over an in-process array (MatlabArray, ndarray, memmap or sparse)."""
+
+    def __init__(self, data, plane=None):
+        # Edits of a MatlabArray go through set_val (CoW, version bump)
+        self.array = data if hasattr(data, "set_val") else None
+        if hasattr(data, "_data"):
+            data = data._data
+
+        if scipy.sparse.issparse(data):
+            # COO/DIA/... cannot be sliced; CSR conversion is O(nnz), not dense
+            if data.format not in ("csr", "csc", "lil", "dok"):
+                data = data.tocsr()
+        elif not isinstance(data, np.ndarray):
+            data = np.asarray(data)
+
+        self.data = data
+        self.dtype = data.dtype
+        self.is_sparse = scipy.sparse.issparse(data)
+        self.full_shape = tuple(data.shape)
+
+        ndim = len(self.full_shape)
+        if ndim == 0:
+            self.shape = (1, 1)
+        elif ndim == 1:
+            self.shape = (self.full_shape[0], 1)
+        else:
+            self.shape = self.full_shape[:2]
+
+        # Trailing-dimension indices of the displayed plane (N-D only)
+        extra = max(ndim - 2, 0)
+        self.plane = tuple(plane) if plane is not None else (0,) * extra
+        if len(self.plane) != extra:
+            raise ValueError(f"Plane needs {extra} indices for a {ndim}-D array.")
+
+    def _key(self, rows, cols):
+        ndim = len(self.full_shape)
+        if ndim == 0:
+            return ()
+        if ndim == 1:
+            return (rows,)
+        return (rows, cols) + self.plane
+
+    def fetch(self, r0, r1, c0, c1):
+        if self.is_sparse:
+            return self.data[r0:r1, c0:c1].toarray()
+
+        block = np.asarray(self.data[self._key(slice(r0, r1), slice(c0, c1))])
+        if block.ndim < 2:
+            block = block.reshape(-1, 1)
+        return block
+
+    def store(self, row, col, value):
+        if self.is_sparse:
+            with warnings.catch_warnings():
+                # Single-element writes into CSR are fine for interactive edits
+                warnings.simplefilter("ignore", scipy.sparse.SparseEfficiencyWarning)
+                self.data[row, col] = value
+            return
+        if self.array is not None:
+            key = self._key(row, col)
+            self.array.set_val(value, *(k + 1 for k in key or (0,)))
+            # The write may have copied (shared buffer) or widened the array
+            self.data = self.array._data
+            self.dtype = self.data.dtype
+            return
+        self.data[self._key(row, col)] = value
+
+
+class CallbackArraySource(ArraySource):
+    """Source backed by callables, for kernels that live in another process."""
+
+    def __init__(self, shape, dtype, fetch, store=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._fetch = fetch
+        self._store = store
+
+    def fetch(self, r0, r1, c0, c1):
+        return np.asarray(self._fetch(r0, r1, c0, c1))
+
+    def store(self, row, col, value):
+        if self._store is None:
+            raise TypeError("This array source is read-only.")
+        self._store(row, col, value)
+
+
+# ============================================================
+# Formatted tile cache
+# ============================================================
+
+class TileCache:
+    """
+    LRU cache of formatted tiles.
+
+    A cell lookup fetches and formats the whole TILE_SIZE x TILE_SIZE tile
+    containing it, so scrolling costs one fetch per tile, not per cell.
+    """
+
+    def __init__(self, source, tile_size=TILE_SIZE, max_tiles=MAX_TILES, formatter=format_cell):
+        self.source = source
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self._format = formatter
+        self._tiles = OrderedDict()
+        self.fetches = 0
+
+    def cell(self, row, col):
+        t = self.tile_size
+        key = (row // t, col // t)
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = self._load(*key)
+        else:
+            self._tiles.move_to_end(key)
+        return tile[row % t][col % t]
+
+    def _load(self, tr, tc):
+        t = self.tile_size
+        rows, cols = self.source.shape
+        r0, c0 = tr * t, tc * t
+        block = self.source.fetch(r0, min(r0 + t, rows), c0, min(c0 + t, cols))
+        self.fetches += 1
+
+        fmt = self._format
+        tile = [[fmt(v) for v in line] for line in block.tolist()]
+
+        self._tiles[(tr, tc)] = tile
+        if len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def invalidate(self, row=None, col=None):
+        """Drops the tile holding (row, col), or every tile if no cell is given."""
+        if row is None:
+            self._tiles.clear()
+            return
+        t = self.tile_size
+        self._tiles.pop((row // t, col // t), None)
+
+    def __len__(self):
+        return len(self._tiles)
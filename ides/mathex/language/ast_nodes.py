@@ -1,139 +1,151 @@
 # mathex/language/ast_nodes.py
+# Nodes use __slots__: a large .m library parses into millions of them.
 from dataclasses import dataclass
 from typing import List, Optional, Tuple, Any
 
-@dataclass
+@dataclass(slots=True)
 class Node:
     pass
 
-@dataclass
+@dataclass(slots=True)
 class Program(Node):
     stmts: List[Node]
 
-@dataclass
+@dataclass(slots=True)
 class Assign(Node):
     target: Any
     value: Node
 
-@dataclass
+@dataclass(slots=True)
 class MultiAssign(Node):
     targets: List[str]
     value: Node
 
-@dataclass
+@dataclass(slots=True)
 class BinOp(Node):
     left: Node
     op: str
     right: Node
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOp(Node):
     op: str
     operand: Node
 
-@dataclass
+@dataclass(slots=True)
 class Number(Node):
     value: str
 
-@dataclass
+@dataclass(slots=True)
 class String(Node):
     value: str
 
-@dataclass
+@dataclass(slots=True)
 class Variable(Node):
     name: str
 
-@dataclass
+@dataclass(slots=True)
+class End(Node):
+    """`end` inside a subscript: the last index of that dimension."""
+
+@dataclass(slots=True)
 class Call(Node):
     func: Any
     args: List[Node]
 
-@dataclass
+@dataclass(slots=True)
 class Index(Node):
     target: Node
     args: List[Node]
 
-@dataclass
+@dataclass(slots=True)
 class Member(Node):
     target: Node
     field: str
 
-@dataclass
+@dataclass(slots=True)
 class Matrix(Node):
     rows: List[List[Node]]
 
-@dataclass
+@dataclass(slots=True)
 class CellArray(Node):
     rows: List[List[Node]]
 
-@dataclass
+@dataclass(slots=True)
 class Range(Node):
     start: Node
     step: Optional[Node]
     end: Node
 
-@dataclass
+@dataclass(slots=True)
 class Command(Node):
     name: str
     args: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class IfBlock(Node):
     conditions: List[Tuple[Node, List[Node]]]
     else_body: Optional[List[Node]]
 
-@dataclass
+@dataclass(slots=True)
 class SwitchBlock(Node):
     expression: Node
     cases: List[Tuple[Node, List[Node]]]
     otherwise_body: Optional[List[Node]]
 
-@dataclass
+@dataclass(slots=True)
 class TryBlock(Node):
     try_body: List[Node]
     catch_var: Optional[str]
     catch_body: List[Node]
 
-@dataclass
+@dataclass(slots=True)
 class ForLoop(Node):
     var: str
     iterable: Node
     body: List[Node]
 
-@dataclass
+@dataclass(slots=True)
+class ParforLoop(Node):
+    var: str
+    iterable: Node
+    body: List[Node]
+    max_workers: Optional[Node] = None
+
+@dataclass(slots=True)
 class WhileLoop(Node):
     condition: Node
     body: List[Node]
 
-@dataclass
+@dataclass(slots=True)
 class Break(Node):
     pass
 
-@dataclass
+@dataclass(slots=True)
 class Continue(Node):
     pass
 
-@dataclass
+@dataclass(slots=True)
 class Return(Node):
     value: Optional[Node]
 
-@dataclass
+@dataclass(slots=True)
 class GlobalDecl(Node):
     names: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDef(Node):
     name: str
     args: List[str]
     outputs: List[str]
     body: List[Node]
 
-@dataclass
+@dataclass(slots=True)
 class AnonymousFunc(Node):
     args: List[str]
     body: Node
 
-@dataclass
+@dataclass(slots=True)
 class ClassDef(Node):
     name: str
     properties: List[str]
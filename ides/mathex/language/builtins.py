@@ -3,7 +3,6 @@ import os
 import time
 from shared.symbolic_core.arrays import MatlabArray
 from shared.symbolic_core.structs import MatlabStruct
-from shared.plotting_engine.state import plot_manager
 
 # ==========================================================
 # MATLAB Built-ins
@@ -41,7 +40,7 @@ def num2str(x, format_spec=None):
 
 
 # [FIX] Added deal function for Phase 3 anonymous functions
-def deal(*args):
+def deal(*args, nargout=1):
     """
     [a, b] = deal(x, y)
     [a, b] = deal(x) % copies x to a and b
@@ -49,10 +48,22 @@ def deal(*args):
     if len(args) == 0:
         return None
     if len(args) == 1:
-        return args[0]
+        return args[0] if nargout < 2 else (args[0],) * nargout
     return args
 
 
+def call_nargout(nargout, func, *args):
+    """
+    func(*args) for [out1, ..., outN] = func(...): functions with a
+    `nargout` keyword (transpiled multi-output functions, eig, svd...)
+    are told how many outputs to compute and return.
+    """
+    defaults = getattr(func, "__kwdefaults__", None)
+    if defaults is not None and "nargout" in defaults:
+        return func(*args, nargout=nargout)
+    return func(*args)
+
+
 def disp(x=None):
     if x is None:
         print()
@@ -76,6 +87,9 @@ def drawnow():
     drawnow;
     Update figures and process callbacks.
     """
+    # Plotting (matplotlib) is only imported once something is drawn
+    from shared.plotting_engine.state import plot_manager
+
     # immediate=True: tells backend to flush events
     # wait=True: blocks Kernel thread until UI thread confirms draw is done
     plot_manager.request_draw(immediate=True, wait=True)
@@ -149,6 +163,44 @@ def numel(x):
     return MatlabArray(int(np.prod(x.shape)))
 
 
+def _first_dim(d):
+    """Axis MATLAB works along by default: the first non-singleton dimension."""
+    for axis, n in enumerate(d.shape):
+        if n != 1:
+            return axis
+    return 0
+
+
+def sort(x, dim=None, mode='ascend', *, nargout=1):
+    """
+    B = sort(A)
+    [B, I] = sort(A, dim, 'descend')
+    Sorts along the first non-singleton dimension. The (1-based) index
+    array I is only computed when it is asked for.
+    """
+    if isinstance(dim, str):
+        mode, dim = dim, None
+    d = x._data if isinstance(x, MatlabArray) else np.asarray(x)
+    if d.ndim == 0:
+        d = d.reshape(1, 1)
+    axis = _first_dim(d) if dim is None else int(dim) - 1
+    descend = str(mode).lower().startswith('d')
+
+    if nargout < 2 and not descend:
+        return MatlabArray(np.sort(d, axis=axis))
+
+    # Stable, as in MATLAB: equal elements keep their order (descending too)
+    if descend:
+        # Ascending sort of the reversed data, reversed back: NaN comes
+        # first, ties stay in order, and no negation (unsigned wraps)
+        n = d.shape[axis]
+        i = (n - 1) - np.flip(np.argsort(np.flip(d, axis=axis), axis=axis, kind='stable'), axis=axis)
+    else:
+        i = np.argsort(d, axis=axis, kind='stable')
+    b = MatlabArray(np.take_along_axis(d, i, axis=axis))
+    return b if nargout < 2 else (b, MatlabArray(i + 1))
+
+
 def who(namespace):
     print("Your variables are:")
     names = sorted(
@@ -6,16 +6,22 @@ register user-defined functions (from .m files) and call them later.
 """
 
 from types import FunctionType
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Set
 import textwrap
 
 class FunctionEntry:
-    def __init__(self, name: str, func: FunctionType, source: Optional[str]=None, filename: Optional[str]=None, source_file: Optional[str]=None):
+    def __init__(self, name: str, func: FunctionType, source: Optional[str]=None, filename: Optional[str]=None, source_file: Optional[str]=None,
+                 mtime: Optional[int]=None, module: Optional[dict]=None, calls=()):
         self.name = name
         self.func = func
         self.source = source
         # Compatibility: loader.py sends 'source_file', this class uses 'filename'
         self.filename = filename if filename else source_file
+        # Hot reload: the file's mtime when loaded, the scope its code runs
+        # in, and the global names that code looks up (possible callees)
+        self.mtime = mtime
+        self.module = module
+        self.calls = frozenset(calls)
 
     def __repr__(self):
         return f"<FunctionEntry name={self.name} file={self.filename}>"
@@ -26,13 +32,60 @@ class FunctionRegistry:
     """
     def __init__(self):
         self._map: Dict[str, FunctionEntry] = {}
+        # Dependency graph: name -> names of the entries whose code calls it
+        self._callers: Dict[str, Set[str]] = {}
 
     def register(self, entry: FunctionEntry):
         """
         Directly register a FunctionEntry object.
         (Required by loader.py)
+
+        Entries with a module scope are linked both ways: the registered
+        functions they call are bound in their scope, and the scopes of
+        the entries calling this name get the new function.
         """
+        old = self._map.get(entry.name)
+        if old is not None:
+            self._unlink(old)
         self._map[entry.name] = entry
+        if entry.module is not None:
+            for name in entry.calls:
+                self._callers.setdefault(name, set()).add(entry.name)
+                callee = self._map.get(name)
+                if callee is not None:
+                    entry.module[name] = callee.func
+        self._bind(entry.name, entry.func)
+
+    def _bind(self, name, func):
+        """Binds `name` in the scopes of its callers (func=None removes it)."""
+        for caller in self._callers.get(name, ()):
+            module = self._map[caller].module
+            if func is None:
+                module.pop(name, None)
+            else:
+                module[name] = func
+
+    def _unlink(self, entry):
+        if entry.module is not None:
+            for name in entry.calls:
+                callers = self._callers.get(name)
+                if callers is not None:
+                    callers.discard(entry.name)
+                    if not callers:
+                        del self._callers[name]
+
+    def dependents(self, name: str) -> Set[str]:
+        """Names of the registered functions that call `name`, directly or not."""
+        found, todo = set(), [name]
+        while todo:
+            for caller in self._callers.get(todo.pop(), ()):
+                if caller not in found and caller != name:
+                    found.add(caller)
+                    todo.append(caller)
+        return found
+
+    def entries(self) -> List[FunctionEntry]:
+        return list(self._map.values())
 
     def register_from_source(self, name: str, py_source: str, global_scope: dict, filename: Optional[str]=None) -> FunctionEntry:
         """
@@ -84,13 +137,15 @@ class FunctionRegistry:
 
     def unregister(self, name: str):
         if name in self._map:
-            del self._map[name]
+            self._unlink(self._map.pop(name))
+            self._bind(name, None)
 
     def list_functions(self) -> List[str]:
         return sorted(list(self._map.keys()))
 
     def clear(self):
         self._map = {}
+        self._callers = {}
 
 # Singleton default registry
 registry = FunctionRegistry()
\ No newline at end of file
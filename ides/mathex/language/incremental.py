@@ -0,0 +1,156 @@
+"""
+mathex.language.incremental
+
+Incremental, error-recovering parsing for live editor diagnostics.
+
+The source is split into chunks: runs of whole lines that end where the
+block depth is back to zero (a top-level statement, or a whole
+function/if/for... block, with the blank and comment lines before it).
+Each chunk is tokenized and parsed on its own, in recover mode, so a
+syntax error only affects its statement, and every error in the file is
+reported.
+
+IncrementalParser.update(text) keeps the chunks of the previous text
+that the edit cannot have touched: those entirely before the first
+changed line, and those entirely after the last changed line (shifted by
+the number of inserted/deleted lines). Only the lines in between are
+re-chunked, and a re-chunked piece of text identical to an earlier chunk
+reuses that chunk's parse. Typing in one function of a large file
+therefore parses that function only.
+
+The nodes of the returned Program are shared between updates; use them
+read-only (the transpiler re-parses what it executes).
+"""
+
+from dataclasses import dataclass, replace
+from typing import List, Tuple
+
+from .ast_nodes import Node, Program
+from .parser import BLOCK_OPENERS, Parser
+from .tokenizer import Token, Tokenizer
+
+
+@dataclass(slots=True)
+class Diagnostic:
+    line: int           # 1-based
+    message: str
+
+
+@dataclass(slots=True)
+class Chunk:
+    start: int          # first line (0-based)
+    count: int          # number of lines
+    text: str
+    stmts: List[Node]
+    errors: List[Tuple[int, str]]   # (line offset within the chunk, message)
+
+
+class IncrementalParser:
+    """
+    Parses successive versions of one document (see the module docstring).
+    After each update, `parsed` and `reused` count the chunks that were
+    parsed again and those taken over from the previous version.
+    """
+
+    def __init__(self):
+        self.chunks: List[Chunk] = []
+        self._lines: List[str] = []
+        self.parsed = 0
+        self.reused = 0
+
+    def update(self, text: str):
+        """Returns (Program, [Diagnostic]) for the new text."""
+        lines = text.splitlines(keepends=True)
+        old_lines, old_chunks = self._lines, self.chunks
+
+        # Unchanged leading and trailing lines
+        n = min(len(old_lines), len(lines))
+        head = 0
+        while head < n and old_lines[head] == lines[head]:
+            head += 1
+        tail = 0
+        while tail < n - head and old_lines[-1 - tail] == lines[-1 - tail]:
+            tail += 1
+        shift = len(lines) - len(old_lines)
+
+        chunks = []
+        k = 0
+        # (the last chunk may end at the end of the text rather than at a boundary)
+        while k < len(old_chunks) - 1 and old_chunks[k].start + old_chunks[k].count <= head:
+            chunks.append(old_chunks[k])
+            k += 1
+        # Old chunks that start inside the unchanged tail, by their new first line
+        resume = {c.start + shift: i for i, c in enumerate(old_chunks)
+                  if i >= k and c.start >= len(old_lines) - tail}
+        cache = {c.text: c for c in old_chunks[k:]}
+
+        self.parsed = 0
+        self.reused = len(chunks)
+        start = chunks[-1].start + chunks[-1].count if chunks else 0
+        for chunk in self._scan(text, lines, start, cache):
+            chunks.append(chunk)
+            end = chunk.start + chunk.count
+            if end in resume:
+                rest = old_chunks[resume[end]:]
+                chunks.extend(replace(c, start=c.start + shift) for c in rest)
+                self.reused += len(rest)
+                break
+
+        self._lines, self.chunks = lines, chunks
+        stmts, diagnostics = [], []
+        for c in chunks:
+            stmts.extend(c.stmts)
+            diagnostics.extend(Diagnostic(c.start + 1 + offset, message) for offset, message in c.errors)
+        return Program(stmts), diagnostics
+
+    # ---------------------------------------------------------
+    # Chunking
+    # ---------------------------------------------------------
+    def _scan(self, text, lines, start, cache):
+        """Yields the chunks of `text` from line `start` on."""
+        tokenizer = Tokenizer(text, recover=True)
+        tokenizer.pos = sum(len(line) for line in lines[:start])
+        tokenizer.line = start + 1
+
+        tokens, depth, parens, brackets = [], 0, 0, 0
+        lexed = 0       # tokenizer errors already assigned to a chunk
+        for tok in tokenizer.iter_tokens():
+            if tok.type == 'EOF':
+                break
+            tokens.append(tok)
+            kind = tok.type
+            if kind == '(':
+                parens += 1
+            elif kind == ')':
+                parens = max(parens - 1, 0)
+            elif kind in ('[', '{'):
+                brackets += 1
+            elif kind in (']', '}'):
+                brackets = max(brackets - 1, 0)
+            elif kind == 'KEYWORD' and not (parens or brackets):
+                if tok.value in BLOCK_OPENERS:
+                    depth += 1
+                elif tok.value == 'end':
+                    depth = max(depth - 1, 0)
+            elif kind == 'NEWLINE':
+                parens = 0      # a line cannot continue inside (...) without '...'
+                if depth == 0 and brackets == 0 and len(tokens) > 1 and tokens[-2].type != 'NEWLINE':
+                    end = tok.line
+                    errors = tokenizer.errors[lexed:]
+                    lexed = len(tokenizer.errors)
+                    yield self._chunk(lines, start, end, tokens, errors, cache)
+                    tokens, start = [], end
+        if start < len(lines):
+            yield self._chunk(lines, start, len(lines), tokens, tokenizer.errors[lexed:], cache)
+
+    def _chunk(self, lines, start, end, tokens, lex_errors, cache):
+        text = "".join(lines[start:end])
+        old = cache.get(text)
+        if old is not None:
+            self.reused += 1
+            return replace(old, start=start)
+        self.parsed += 1
+        parser = Parser(tokens + [Token('EOF', '', end)], recover=True)
+        program = parser.parse()
+        errors = sorted((line - 1 - start, message) for line, message in lex_errors + parser.errors)
+        return Chunk(start, end - start, text, program.stmts, errors)
@@ -0,0 +1,599 @@
+"""
+mathex.language.inference
+
+Static type and shape inference over the MATLAB AST of one transpile unit
+(a console command, a script or the functions of a file).
+
+Every expression gets a TypeInfo fact:
+- scalar:          a Python number, or a 1x1 MatlabArray
+- vector / matrix: a MatlabArray (shape and element type when known)
+- unknown:         anything else, or not provable
+
+Sources of facts: numeric and matrix literals, ranges, array constructors
+(zeros(n, m), ones, rand, eye, linspace), `for` counters over a range
+(always scalars in MATLAB), size / numel / length and scalar math builtins,
+indexing with scalar subscripts, and arithmetic on all of these.
+
+The pass is flow-sensitive. Facts follow assignments in program order and
+are merged at the join points of if / switch / try and at loop heads
+(iterated to a fixpoint), so a variable keeps a fact only when every path
+agrees on it. What the pass cannot see is unknown: function arguments,
+variables from earlier commands, globals, anything after eval / load /
+clear, and the bodies of anonymous functions and parfor loops.
+
+ASTCompiler looks the facts up by id(node) to emit plain Python arithmetic
+for scalars, direct element access for arrays and a Python counter for
+range loops (see transpiler.py).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from .ast_nodes import (
+    Program, Assign, MultiAssign, BinOp, UnaryOp, Number, String, Variable, End,
+    Call, Index, Member, Matrix, CellArray, Range, Command, IfBlock,
+    SwitchBlock, TryBlock, ForLoop, ParforLoop, WhileLoop, Break, Continue,
+    Return, GlobalDecl, FunctionDef, ClassDef
+)
+from .parfor import _walk_body
+
+SCALAR = "scalar"
+VECTOR = "vector"
+MATRIX = "matrix"
+UNKNOWN = "unknown"
+
+REAL_DTYPES = ("bool", "int", "float")
+
+# Loop heads are re-analyzed until their facts stop changing; the lattice
+# is shallow, this only guards against a bug turning into a hang
+MAX_LOOP_PASSES = 20
+
+
+@dataclass(frozen=True)
+class TypeInfo:
+    kind: str = UNKNOWN
+    dtype: Optional[str] = None                  # 'bool' | 'int' | 'float' | 'complex'
+    shape: Optional[Tuple[Optional[int], Optional[int]]] = None
+
+    @property
+    def is_scalar(self):
+        return self.kind == SCALAR
+
+    @property
+    def is_array(self):
+        return self.kind in (VECTOR, MATRIX)
+
+    @property
+    def is_real(self):
+        return self.dtype in REAL_DTYPES
+
+
+ANY = TypeInfo()
+
+# ------------------------------------------------------------
+# Known builtins (trusted unless the unit assigns the same name)
+# ------------------------------------------------------------
+CONSTANTS = {"pi", "inf", "nan"}
+ARRAY_CONSTRUCTORS = {"zeros", "ones", "rand", "randn", "eye", "linspace"}
+COUNT_BUILTINS = {"numel", "length"}
+# Scalar in, scalar out; the first group keeps real inputs real
+REAL_MATH = {
+    "abs", "floor", "ceil", "round", "fix", "sign", "mod", "rem",
+    "sin", "cos", "tan", "atan", "atan2", "sinh", "cosh", "tanh", "exp",
+}
+OTHER_MATH = {"sqrt", "log", "log10", "asin", "acos"}
+# Calls that can create, change or delete arbitrary variables
+OPAQUE_CALLS = {"eval", "evalin", "assignin", "load", "clear", "clearvars", "run"}
+
+COMPARISON_OPS = ("<", ">", "<=", ">=", "==", "~=")
+
+
+def join(a, b):
+    """Least fact that holds for both a and b."""
+    if a == b:
+        return a
+    if a.is_scalar and b.is_scalar:
+        return TypeInfo(SCALAR, _join_dtype(a.dtype, b.dtype))
+    if a.is_array and b.is_array:
+        kind = VECTOR if a.kind == b.kind == VECTOR else MATRIX
+        shape = a.shape if a.shape == b.shape else None
+        return TypeInfo(kind, _join_dtype(a.dtype, b.dtype), shape)
+    return ANY
+
+
+def _join_dtype(a, b):
+    if a == b:
+        return a
+    if a in REAL_DTYPES and b in REAL_DTYPES:
+        return "float"
+    return None
+
+
+def _arith_dtype(a, b):
+    if a is None or b is None:
+        return None
+    if "complex" in (a, b):
+        return "complex"
+    if "float" in (a, b):
+        return "float"
+    return "int"
+
+
+def _array(kind, dtype=None, shape=None):
+    if shape is not None and (shape[0] == 1 or shape[1] == 1):
+        kind = VECTOR
+    return TypeInfo(kind, dtype, shape)
+
+
+class _State(dict):
+    """
+    name -> TypeInfo for the variables assigned so far in the unit.
+    Names not in the dict refer to whatever existed before (workspace
+    variables or builtins); `opaque` is set once eval / load / clear may
+    have created or replaced variables, after which builtins are not trusted.
+    """
+
+    def __init__(self, *args, opaque=False):
+        super().__init__(*args)
+        self.opaque = opaque
+
+    def copy(self):
+        return _State(self, opaque=self.opaque)
+
+    def same(self, other):
+        return self.opaque == other.opaque and dict.__eq__(self, other)
+
+
+def _merge(states):
+    merged = states[0].copy()
+    for state in states[1:]:
+        merged.opaque = merged.opaque or state.opaque
+        for name in set(merged) | set(state):
+            if name in merged and name in state:
+                merged[name] = join(merged[name], state[name])
+            else:
+                merged[name] = ANY
+    return merged
+
+
+def _assigned_names(stmts):
+    """Every variable a block may assign (at any depth)."""
+    names = set()
+    for n in _walk_body(stmts):
+        if isinstance(n, Assign):
+            target = n.target
+            while isinstance(target, (Call, Member)):
+                target = target.func if isinstance(target, Call) else target.target
+            if isinstance(target, Variable):
+                names.add(target.name)
+            elif isinstance(target, str):
+                names.add(target)
+        elif isinstance(n, MultiAssign):
+            names.update(n.targets)
+        elif isinstance(n, (ForLoop, ParforLoop)):
+            names.add(n.var)
+        elif isinstance(n, TryBlock) and n.catch_var:
+            names.add(n.catch_var)
+    return names
+
+
+# ============================================================
+# Inference
+# ============================================================
+
+class TypeInference:
+    """Runs the pass over one unit; `facts` maps id(node) -> TypeInfo."""
+
+    def __init__(self):
+        self.facts: Dict[int, TypeInfo] = {}
+        self._globals = set()
+        self._depth = 0           # enclosing function definitions
+        self._loop_exits = []     # per enclosing loop: states at break
+        self._loop_nexts = []     # per enclosing loop: states at continue
+        self._opaque_call = False
+
+    def run(self, tree):
+        if isinstance(tree, Program):
+            self._block(tree.stmts, _State())
+        else:
+            self._block([tree], _State())
+        return self.facts
+
+    # ---------------------------------------------------------
+    # Statements
+    # ---------------------------------------------------------
+    def _block(self, stmts, state):
+        for stmt in stmts:
+            state = self._stmt(stmt, state)
+            if self._opaque_call:
+                self._opaque_call = False
+                state = _State(opaque=True)
+        return state
+
+    def _stmt(self, node, state):
+        if isinstance(node, Assign):
+            return self._assign(node, state)
+
+        if isinstance(node, MultiAssign):
+            value = node.value
+            self._expr(value, state)
+            fact = ANY
+            if (isinstance(value, Call) and self._builtin(value.func, state) == "size"
+                    and len(value.args) == 1):
+                fact = TypeInfo(SCALAR, "int")
+            for name in node.targets:
+                state[name] = ANY if name in self._globals else fact
+            return state
+
+        if isinstance(node, IfBlock):
+            branches = []
+            for cond, body in node.conditions:
+                self._expr(cond, state)
+                branches.append(self._block(body, state.copy()))
+            if node.else_body is not None:
+                branches.append(self._block(node.else_body, state.copy()))
+            else:
+                branches.append(state)
+            return _merge(branches)
+
+        if isinstance(node, SwitchBlock):
+            self._expr(node.expression, state)
+            branches = []
+            for case, body in node.cases:
+                self._expr(case, state)
+                branches.append(self._block(body, state.copy()))
+            if node.otherwise_body:
+                branches.append(self._block(node.otherwise_body, state.copy()))
+            else:
+                branches.append(state)
+            return _merge(branches)
+
+        if isinstance(node, TryBlock):
+            after_try = self._block(node.try_body, state.copy())
+            # The catch block may start from any point of the try block
+            caught = state.copy()
+            for name in _assigned_names(node.try_body):
+                caught[name] = ANY
+            if node.catch_var:
+                caught[node.catch_var] = ANY
+            after_catch = self._block(node.catch_body, caught)
+            return _merge([after_try, after_catch])
+
+        if isinstance(node, ForLoop):
+            self._expr(node.iterable, state)
+            # The counter of a range loop is always a scalar
+            counter = TypeInfo(SCALAR, "float") if isinstance(node.iterable, Range) else ANY
+            self.facts[id(node)] = counter
+            if node.var not in state and counter.is_scalar:
+                # Without an earlier value in this unit the counter is either
+                # undefined after the loop (no iteration) or its last value
+                state = state.copy()
+                state[node.var] = counter
+            return self._loop(node.body, state, lambda s: s.__setitem__(node.var, counter))
+
+        if isinstance(node, WhileLoop):
+            return self._loop(node.body, state, lambda s: self._expr(node.condition, s))
+
+        if isinstance(node, ParforLoop):
+            # The body runs on workers, compiled without facts
+            self._expr(node.iterable, state)
+            if node.max_workers is not None:
+                self._expr(node.max_workers, state)
+            for name in _assigned_names(node.body) | {node.var}:
+                state[name] = ANY
+            return state
+
+        if isinstance(node, Break):
+            if self._loop_exits:
+                self._loop_exits[-1].append(state.copy())
+            return state
+
+        if isinstance(node, Continue):
+            if self._loop_nexts:
+                self._loop_nexts[-1].append(state.copy())
+            return state
+
+        if isinstance(node, Return):
+            if node.value is not None:
+                self._expr(node.value, state)
+            return state
+
+        if isinstance(node, GlobalDecl):
+            for name in node.names:
+                self._globals.add(name)
+                state[name] = ANY
+            return state
+
+        if isinstance(node, FunctionDef):
+            self._function(node)
+            return state
+
+        if isinstance(node, ClassDef):
+            return state
+
+        if isinstance(node, Command):
+            if node.name in OPAQUE_CALLS:
+                self._opaque_call = True
+            return state
+
+        # Expression statement
+        self._expr(node, state)
+        return state
+
+    def _assign(self, node, state):
+        target = node.target
+        value = self._expr(node.value, state)
+
+        if isinstance(target, (str, Variable)):
+            name = target if isinstance(target, str) else target.name
+            state[name] = ANY if name in self._globals else value
+            return state
+
+        if isinstance(target, Call) and isinstance(target.func, Variable):
+            name = target.func.name
+            before = state.get(name, ANY) if name not in self._globals else ANY
+            # Recorded for codegen: the fact of A *before* A(...) = value
+            self.facts[id(target.func)] = before
+            for arg in target.args:
+                self._expr(arg, state)
+
+            if before.is_array:
+                kind = before.kind if len(target.args) == 1 else MATRIX
+                dtype = before.dtype
+                if not (dtype == "float" and value.is_real) and dtype != value.dtype:
+                    dtype = None
+                state[name] = TypeInfo(kind, dtype)
+            elif before.is_scalar:
+                state[name] = TypeInfo(MATRIX)
+            else:
+                state[name] = ANY
+            return state
+
+        # s.field = value, or any other target
+        base = target
+        while isinstance(base, (Call, Member)):
+            base = base.func if isinstance(base, Call) else base.target
+        if isinstance(base, Variable):
+            state[base.name] = ANY
+        return state
+
+    def _loop(self, body, state, enter):
+        """Analyzes a loop body until the facts at its head stop changing."""
+        entry = state
+        head = entry.copy()
+        for _ in range(MAX_LOOP_PASSES):
+            self._loop_exits.append([])
+            self._loop_nexts.append([])
+            inner = head.copy()
+            enter(inner)
+            end = self._block(body, inner)
+            exits = self._loop_exits.pop()
+            nexts = self._loop_nexts.pop()
+
+            new_head = _merge([entry, end] + nexts)
+            if new_head.same(head):
+                return _merge([head] + exits)
+            head = new_head
+
+        # Did not settle: nothing assigned in the loop keeps a fact, and the
+        # body is analyzed once more so the recorded facts agree
+        for name in _assigned_names(body):
+            head[name] = ANY
+        self._loop_exits.append([])
+        self._loop_nexts.append([])
+        inner = head.copy()
+        enter(inner)
+        self._block(body, inner)
+        self._loop_nexts.pop()
+        return _merge([head] + self._loop_exits.pop())
+
+    def _function(self, node):
+        outer = (self._globals, self._loop_exits, self._loop_nexts)
+        self._globals, self._loop_exits, self._loop_nexts = set(), [], []
+        # Variables shared with nested functions may change at any call
+        nested = self._depth > 0
+        for s in ([node] if nested else []) + [s for s in node.body if isinstance(s, FunctionDef)]:
+            self._globals |= _assigned_names(s.body) - set(s.args) - set(s.outputs)
+        self._depth += 1
+        self._block(node.body, _State(opaque=nested))
+        self._depth -= 1
+        self._globals, self._loop_exits, self._loop_nexts = outer
+
+    # ---------------------------------------------------------
+    # Expressions
+    # ---------------------------------------------------------
+    def _expr(self, node, state):
+        fact = self._infer(node, state)
+        self.facts[id(node)] = fact
+        return fact
+
+    def _builtin(self, func, state):
+        """Name of the builtin called through `func`, if it is not shadowed."""
+        if isinstance(func, Variable) and func.name not in state and not state.opaque:
+            return func.name
+        return None
+
+    def _infer(self, node, state):
+        if isinstance(node, Number):
+            text = node.value.lower()
+            if text.endswith(("i", "j")):
+                return TypeInfo(SCALAR, "complex")
+            if any(c in text for c in ".e"):
+                return TypeInfo(SCALAR, "float")
+            return TypeInfo(SCALAR, "int")
+
+        if isinstance(node, Variable):
+            if node.name in state:
+                return state[node.name]
+            if not state.opaque and node.name in CONSTANTS:
+                return TypeInfo(SCALAR, "float")
+            return ANY
+
+        if isinstance(node, Range):
+            parts = [node.start, node.end] + ([node.step] if node.step is not None else [])
+            facts = [self._expr(p, state) for p in parts]
+            dtype = "int" if all(f.dtype == "int" for f in facts) else "float"
+            return TypeInfo(VECTOR, dtype, (1, None))
+
+        if isinstance(node, Matrix):
+            items = [[self._expr(x, state) for x in row] for row in node.rows]
+            cells = [f for row in items for f in row]
+            dtype = None
+            if cells and all(f.dtype is not None for f in cells):
+                dtype = cells[0].dtype
+                for f in cells[1:]:
+                    dtype = _arith_dtype(dtype, f.dtype)
+            shape = None
+            if cells and all(f.is_scalar for f in cells) and len({len(row) for row in items}) == 1:
+                shape = (len(items), len(items[0]))
+            return _array(MATRIX, dtype, shape)
+
+        if isinstance(node, End):
+            # Last index of an array dimension
+            return TypeInfo(SCALAR, "int")
+
+        if isinstance(node, CellArray):
+            for row in node.rows:
+                for x in row:
+                    self._expr(x, state)
+            return ANY
+
+        if isinstance(node, BinOp):
+            return self._binop(node, self._expr(node.left, state), self._expr(node.right, state))
+
+        if isinstance(node, UnaryOp):
+            operand = self._expr(node.operand, state)
+            if node.op == "~":
+                if operand.is_scalar:
+                    return TypeInfo(SCALAR, "bool")
+                if operand.is_array:
+                    return TypeInfo(operand.kind, "bool", operand.shape)
+                return ANY
+            return operand if node.op in ("-", "+") else ANY
+
+        if isinstance(node, Member):
+            target = self._expr(node.target, state)
+            if node.field in ("H", "T"):
+                if target.is_scalar:
+                    return target
+                if target.is_array:
+                    shape = target.shape[::-1] if target.shape else None
+                    return TypeInfo(target.kind, target.dtype, shape)
+            return ANY
+
+        if isinstance(node, Call):
+            return self._call(node, state)
+
+        if isinstance(node, Index):
+            self._expr(node.target, state)
+            for arg in node.args:
+                self._expr(arg, state)
+            return ANY
+
+        # Strings, anonymous functions (late-bound bodies are not analyzed), ...
+        return ANY
+
+    def _binop(self, node, l, r):
+        op = node.op
+        if op in ("&&", "||"):
+            return TypeInfo(SCALAR, _join_dtype(l.dtype, r.dtype)) if l.is_scalar and r.is_scalar else ANY
+
+        if l.is_scalar and r.is_scalar:
+            if op in COMPARISON_OPS or op in ("&", "|"):
+                return TypeInfo(SCALAR, "bool")
+            if op in ("+", "-", "*", ".*"):
+                return TypeInfo(SCALAR, _arith_dtype(l.dtype, r.dtype))
+            if op in ("/", "./", "\\"):
+                dtype = _arith_dtype(l.dtype, r.dtype)
+                return TypeInfo(SCALAR, "float" if dtype in ("int", "float") else dtype)
+            if op in ("^", ".^"):
+                # Negative bases with fractional exponents turn complex
+                integral = isinstance(node.right, Number) and r.dtype == "int"
+                return TypeInfo(SCALAR, "float" if l.is_real and integral else None)
+            return ANY
+
+        if not (l.is_array or r.is_array) or not (l.kind != UNKNOWN and r.kind != UNKNOWN):
+            return ANY
+
+        # At least one MatlabArray operand, the other known: the result is a MatlabArray
+        array = l if l.is_array else r
+        dtype = _arith_dtype(l.dtype, r.dtype)
+        if op in COMPARISON_OPS:
+            dtype = "bool"
+        elif op in ("/", "./", "\\", "^", ".^"):
+            dtype = None if dtype is None or op in ("^", ".^") else ("complex" if dtype == "complex" else "float")
+        if l.is_array and r.is_array:
+            if op in ("*", "/", "\\", "^"):
+                return TypeInfo(MATRIX, dtype)
+            same = l.shape if l.shape == r.shape else None
+            return TypeInfo(l.kind if l.kind == r.kind else MATRIX, dtype, same)
+        if op == "\\":
+            return TypeInfo(MATRIX, dtype) if l.is_array else ANY
+        return TypeInfo(array.kind, dtype, array.shape)
+
+    def _call(self, node, state):
+        func = node.func
+        args = [self._expr(a, state) for a in node.args]
+
+        if isinstance(func, Variable) and func.name in state:
+            # Indexing a variable of this unit
+            var = state[func.name]
+            self.facts[id(func)] = var
+            scalar_subs = all(a.is_scalar for a in args)
+            if var.is_array:
+                if scalar_subs and len(args) in (1, 2):
+                    return TypeInfo(SCALAR, var.dtype) if var.dtype is not None else ANY
+                return TypeInfo(MATRIX, var.dtype)
+            if var.is_scalar and scalar_subs:
+                return var
+            return ANY
+
+        if not isinstance(func, Variable):
+            if not isinstance(func, str):
+                self._expr(func, state)
+            return ANY
+
+        if func.name in OPAQUE_CALLS:
+            self._opaque_call = True
+        name = self._builtin(func, state)
+        if name is None:
+            return ANY
+
+        if name in ARRAY_CONSTRUCTORS:
+            dtype = None if any(isinstance(a, String) for a in node.args) else "float"
+            dims = [_literal_int(a) for a in node.args]
+            if name == "linspace":
+                return TypeInfo(VECTOR, "float", (1, dims[2] if len(dims) > 2 else 100))
+            if not dims:
+                return TypeInfo(MATRIX, dtype, (1, 1))
+            if len(dims) == 1 and args[0].is_scalar:
+                return _array(MATRIX, dtype, (dims[0], dims[0]) if dims[0] is not None else None)
+            if len(dims) == 2 and name != "eye":
+                return _array(MATRIX, dtype, tuple(dims))
+            return TypeInfo(MATRIX, dtype)
+
+        if name in COUNT_BUILTINS and len(args) == 1:
+            return TypeInfo(SCALAR, "int")
+        if name == "size":
+            if len(args) == 2:
+                return TypeInfo(SCALAR, "int")
+            if len(args) == 1:
+                return TypeInfo(VECTOR, "int", (1, 2))
+            return ANY
+
+        if (name in REAL_MATH or name in OTHER_MATH) and args and all(a.is_scalar for a in args):
+            real = name in REAL_MATH and all(a.is_real for a in args)
+            return TypeInfo(SCALAR, "float" if real else None)
+
+        return ANY
+
+
+def _literal_int(node):
+    if isinstance(node, Number) and node.value.isdigit():
+        return int(node.value)
+    return None
+
+
+def infer_types(tree):
+    """id(node) -> TypeInfo for the expressions (and range loops) of a parsed unit."""
+    return TypeInference().run(tree)
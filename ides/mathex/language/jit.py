@@ -0,0 +1,722 @@
+"""
+mathex.language.jit
+
+Opt-in numba compilation of numeric .m functions.
+
+    function s = sumsq(n)
+    %#jit                      (or MATLAB's %#codegen)
+    ...
+
+or, for a function without the pragma:  >> codegen sumsq
+
+The MATLAB AST of the function is lowered to plain Python over raw NumPy
+arrays (0-based indexing, float scalars, 2-D arrays) and compiled with
+numba.njit. Lowering depends on whether each argument is a scalar or an
+array (`a*b` is a product or a matrix product, `x(i)` is only valid on
+arrays), so one specialization is compiled per argument signature and
+cached on the JitFunction.
+
+Anonymous functions are lowered the same way on request (lower_anonymous,
+used by ode45's numba engine): the transpiler tags each lambda it emits
+with its MATLAB AST, and the workspace variables it captures become
+trailing arguments of the lowered function.
+
+Anything outside the supported subset keeps running through the
+interpreted MatlabArray code:
+- a signature whose body cannot be lowered or typed is marked once and
+  always uses the interpreted function
+- a call that fails inside compiled code (index out of bounds, array
+  growth, non-vector reductions) is re-run interpreted; compiled bodies
+  have no side effects (array arguments are copied before being written)
+"""
+
+import hashlib
+import importlib
+import re
+from dataclasses import fields
+
+import numpy as np
+
+from .ast_nodes import (
+    Assign, MultiAssign, BinOp, UnaryOp, Number, String, Variable, End, Call,
+    Member, Matrix, Range, IfBlock, ForLoop, WhileLoop, Break, Continue,
+    Return, FunctionDef, AnonymousFunc, Node
+)
+
+SCALAR = "scalar"
+ARRAY = "array"
+
+# %#jit or %#codegen on a line of its own (MATLAB's code generation pragma)
+PRAGMA = re.compile(r"^\s*%#(jit|codegen)\b", re.MULTILINE)
+
+# Functions requested with `codegen name` (compiled when (re)loaded)
+requested = set()
+
+
+class JitUnsupported(Exception):
+    """The function (for a given signature) is outside the compilable subset."""
+
+
+# ============================================================
+# Runtime helpers (compiled together with the user function)
+# ============================================================
+
+_RUNTIME_SOURCE = '''
+def _idx(i, n):
+    k = int(i)
+    if k != i or k < 1 or k > n:
+        raise IndexError("Index exceeds array bounds.")
+    return k - 1
+
+def _lin_get(A, i):
+    k = _idx(i, A.size)
+    return A[k % A.shape[0], k // A.shape[0]]
+
+def _lin_set(A, i, v):
+    k = _idx(i, A.size)
+    A[k % A.shape[0], k // A.shape[0]] = v
+
+def _vector(A):
+    if A.shape[0] != 1 and A.shape[1] != 1:
+        raise ValueError("Expected a vector.")
+    return A
+
+def _length(A):
+    if A.size == 0:
+        return 0.0
+    return float(max(A.shape[0], A.shape[1]))
+
+def _mod(a, b):
+    if b == 0:
+        return a
+    return a - np.floor(a / b) * b
+
+def _rem(a, b):
+    if b == 0:
+        return np.nan
+    return a - np.trunc(a / b) * b
+
+def _round(x):
+    return np.sign(x) * np.floor(np.abs(x) + 0.5)
+
+def _real(x, lo, hi):
+    a = np.asarray(x)
+    if np.any(a < lo) or np.any(a > hi):
+        raise ValueError("Complex result: outside the real domain.")
+    return x
+
+def _pow(a, b):
+    if np.any((np.asarray(a) < 0) & (np.asarray(b) != np.floor(np.asarray(b)))):
+        raise ValueError("Complex result: negative base, fractional exponent.")
+    return a ** b
+
+def _colon_count(start, step, stop):
+    if step == 0:
+        return 0
+    n = int(np.floor((stop - start) / step + 1e-10)) + 1
+    return n if n > 0 else 0
+'''
+
+_runtime = None
+
+
+def _numba():
+    try:
+        return importlib.import_module("numba")
+    except ImportError:
+        raise JitUnsupported("numba is not installed (pip install mathex[perf])")
+
+
+def _runtime_namespace():
+    """Namespace with the jitted helpers; user functions are exec'd into a copy."""
+    global _runtime
+    if _runtime is None:
+        numba = _numba()
+        ns = {"np": np}
+        exec(_RUNTIME_SOURCE, ns)
+        for name in [n for n in ns if n.startswith("_") and callable(ns[n])]:
+            ns[name] = numba.njit(cache=False)(ns[name])
+        _runtime = ns
+    return dict(_runtime)
+
+
+# ============================================================
+# Lowering: MATLAB AST -> NumPy/Python source for numba
+# ============================================================
+
+# Elementwise functions valid on scalars and arrays alike
+ELEMENTWISE = {
+    "sin": "np.sin", "cos": "np.cos", "tan": "np.tan",
+    "asin": "np.arcsin", "acos": "np.arccos", "atan": "np.arctan",
+    "sinh": "np.sinh", "cosh": "np.cosh", "tanh": "np.tanh",
+    "exp": "np.exp", "log": "np.log", "log2": "np.log2", "log10": "np.log10",
+    "sqrt": "np.sqrt", "abs": "np.abs", "sign": "np.sign",
+    "floor": "np.floor", "ceil": "np.ceil", "fix": "np.trunc", "round": "_round",
+    "real": "np.real", "imag": "np.imag", "conj": "np.conj",
+}
+
+# Real domain of the functions above that turn complex outside it; compiled
+# code is real-only, so such inputs raise and the call runs interpreted
+REAL_DOMAINS = {
+    "sqrt": ("0.0", "np.inf"), "log": ("0.0", "np.inf"), "log2": ("0.0", "np.inf"),
+    "log10": ("0.0", "np.inf"), "asin": ("-1.0", "1.0"), "acos": ("-1.0", "1.0"),
+}
+
+CONSTANTS = {
+    "pi": "np.pi", "Inf": "np.inf", "inf": "np.inf", "NaN": "np.nan", "nan": "np.nan",
+    "eps": repr(float(np.finfo(float).eps)), "true": "True", "false": "False",
+}
+
+COMPARISONS = {"==": "==", "~=": "!=", "<": "<", ">": ">", "<=": "<=", ">=": ">="}
+
+
+class FunctionLowering:
+    """Lowers one FunctionDef for one tuple of argument kinds (SCALAR / ARRAY)."""
+
+    def __init__(self, node: FunctionDef, arg_kinds):
+        if "varargin" in node.args or "varargout" in node.outputs:
+            raise JitUnsupported("varargin/varargout")
+        if len(arg_kinds) > len(node.args):
+            raise JitUnsupported("Too many input arguments.")
+        self.node = node
+        self.params = node.args[:len(arg_kinds)]
+        self.types = dict(zip(self.params, arg_kinds))
+        self.nargin = len(arg_kinds)
+        self.written_params = set()
+        self._ends = []
+        self._tmp = 0
+
+    @property
+    def name(self):
+        return f"_jit_{self.node.name}"
+
+    def lower(self):
+        body = self.block(self.node.body, 1)
+        for out in self.node.outputs:
+            if out not in self.types:
+                raise JitUnsupported(f"Output '{out}' is never assigned.")
+
+        lines = [f"def {self.name}({', '.join(self.params)}):"]
+        # Value semantics: arrays written by the body must not alias the caller's
+        for p in self.params:
+            if p in self.written_params:
+                lines.append(f"    {p} = {p}.copy()")
+        lines.extend(body)
+        lines.append(f"    return {self._outputs()}")
+        return "\n".join(lines)
+
+    def _outputs(self):
+        outs = self.node.outputs
+        if not outs:
+            return "None"
+        if len(outs) == 1:
+            return outs[0]
+        return "(" + ", ".join(outs) + ")"
+
+    def _temp(self, prefix):
+        self._tmp += 1
+        return f"_{prefix}{self._tmp}"
+
+    # ---------------- Statements ----------------
+    def block(self, stmts, depth):
+        lines = []
+        for stmt in stmts:
+            lines.extend(self.statement(stmt, depth))
+        return lines or ["    " * depth + "pass"]
+
+    def statement(self, node, depth):
+        pad = "    " * depth
+
+        if isinstance(node, Assign):
+            if isinstance(node.target, str):
+                code, kind = self.expr(node.value)
+                if kind == ARRAY and isinstance(node.value, Variable):
+                    code = f"{code}.copy()"
+                self._bind(node.target, kind)
+                return [f"{pad}{node.target} = {code}"]
+            if isinstance(node.target, Call) and isinstance(node.target.func, Variable):
+                return [pad + self._indexed_store(node.target, node.value)]
+            raise JitUnsupported("Only variable and A(i)/A(i,j) assignments can be compiled.")
+
+        if isinstance(node, MultiAssign):
+            call = node.value
+            if (isinstance(call, Call) and isinstance(call.func, Variable)
+                    and call.func.name == "size" and len(call.args) == 1 and len(node.targets) == 2):
+                code, kind = self.expr(call.args[0])
+                self._require(kind, ARRAY, "size")
+                r, c = node.targets
+                self._bind(r, SCALAR)
+                self._bind(c, SCALAR)
+                return [f"{pad}{r} = float({code}.shape[0])", f"{pad}{c} = float({code}.shape[1])"]
+            raise JitUnsupported("Multiple assignment is only supported for [r, c] = size(A).")
+
+        if isinstance(node, ForLoop):
+            if not isinstance(node.iterable, Range):
+                raise JitUnsupported("for loops must iterate over a range (a:b or a:s:b).")
+            rng = node.iterable
+            start = self._scalar(rng.start, "loop start")
+            stop = self._scalar(rng.end, "loop end")
+            step = self._scalar(rng.step, "loop step") if rng.step is not None else "1.0"
+            s, st, n, k = (self._temp(p) for p in ("s", "st", "n", "k"))
+            self._bind(node.var, SCALAR)
+            return [
+                f"{pad}{s} = {start}",
+                f"{pad}{st} = {step}",
+                f"{pad}{n} = _colon_count({s}, {st}, {stop})",
+                f"{pad}for {k} in range({n}):",
+                f"{pad}    {node.var} = {s} + {k} * {st}",
+            ] + self.block(node.body, depth + 1)
+
+        if isinstance(node, WhileLoop):
+            cond = self._scalar(node.condition, "while condition")
+            return [f"{pad}while {cond}:"] + self.block(node.body, depth + 1)
+
+        if isinstance(node, IfBlock):
+            lines = []
+            for i, (cond, body) in enumerate(node.conditions):
+                tag = "if" if i == 0 else "elif"
+                lines.append(f"{pad}{tag} {self._scalar(cond, 'if condition')}:")
+                lines.extend(self.block(body, depth + 1))
+            if node.else_body is not None:
+                lines.append(f"{pad}else:")
+                lines.extend(self.block(node.else_body, depth + 1))
+            return lines
+
+        if isinstance(node, Break):
+            return [f"{pad}break"]
+        if isinstance(node, Continue):
+            return [f"{pad}continue"]
+        if isinstance(node, Return) and node.value is None:
+            return [f"{pad}return {self._outputs()}"]
+
+        raise JitUnsupported(f"{type(node).__name__} statements cannot be compiled.")
+
+    def _bind(self, name, kind):
+        if name in self.params and self.types.get(name) != kind:
+            raise JitUnsupported(f"Argument '{name}' changes between scalar and array.")
+        prev = self.types.get(name)
+        if prev is not None and prev != kind:
+            raise JitUnsupported(f"Variable '{name}' changes between scalar and array.")
+        self.types[name] = kind
+
+    def _indexed_store(self, target, value):
+        name = target.func.name
+        if self.types.get(name) != ARRAY:
+            raise JitUnsupported(f"'{name}' must be an existing array to be assigned by index.")
+        val = self._scalar(value, "indexed assignment value")
+        if name in self.params:
+            self.written_params.add(name)
+        if len(target.args) == 1:
+            i = self._index(name, target.args[0], f"float({name}.size)")
+            return f"_lin_set({name}, {i}, {val})"
+        if len(target.args) == 2:
+            i = self._index(name, target.args[0], f"float({name}.shape[0])")
+            j = self._index(name, target.args[1], f"float({name}.shape[1])")
+            return f"{name}[_idx({i}, {name}.shape[0]), _idx({j}, {name}.shape[1])] = {val}"
+        raise JitUnsupported("Only 1-D and 2-D indexing can be compiled.")
+
+    def _index(self, name, arg, end):
+        self._ends.append(end)
+        try:
+            return self._scalar(arg, f"index into '{name}'")
+        finally:
+            self._ends.pop()
+
+    # ---------------- Expressions ----------------
+    def _scalar(self, node, what):
+        code, kind = self.expr(node)
+        self._require(kind, SCALAR, what)
+        return code
+
+    @staticmethod
+    def _require(kind, expected, what):
+        if kind != expected:
+            raise JitUnsupported(f"{what} must be {'a scalar' if expected == SCALAR else 'an array'}.")
+
+    def expr(self, node):
+        """Returns (code, kind)."""
+        if isinstance(node, Number):
+            value = node.value
+            return (value if value.endswith("j") else repr(float(value))), SCALAR
+
+        if isinstance(node, End):
+            if self._ends:
+                return self._ends[-1], SCALAR
+            raise JitUnsupported("'end' outside a subscript cannot be compiled.")
+
+        if isinstance(node, String):
+            raise JitUnsupported("Strings and ':' cannot be compiled.")
+
+        if isinstance(node, Variable):
+            name = node.name
+            if name in self.types:
+                return name, self.types[name]
+            if name == "nargin":
+                return repr(float(self.nargin)), SCALAR
+            if name in CONSTANTS:
+                return CONSTANTS[name], SCALAR
+            raise JitUnsupported(f"'{name}' is not a local variable.")
+
+        if isinstance(node, UnaryOp):
+            code, kind = self.expr(node.operand)
+            if node.op == "-":
+                return f"(-{code})", kind
+            if node.op == "~":
+                return (f"(not {code})" if kind == SCALAR else f"np.logical_not({code})"), kind
+            raise JitUnsupported(f"Unary '{node.op}'")
+
+        if isinstance(node, BinOp):
+            return self._binop(node)
+
+        if isinstance(node, Member) and node.field in ("T", "H"):
+            code, kind = self.expr(node.target)
+            if node.field == "H":
+                code = f"np.conj({code})"
+            return (f"{code}.T" if kind == ARRAY else code), kind
+
+        if isinstance(node, Call) and isinstance(node.func, Variable):
+            return self._call(node.func.name, node.args)
+
+        if isinstance(node, Matrix):
+            return self._matrix(node)
+
+        raise JitUnsupported(f"{type(node).__name__} expressions cannot be compiled.")
+
+    def _binop(self, node):
+        op = node.op
+        l, lk = self.expr(node.left)
+        r, rk = self.expr(node.right)
+        kind = ARRAY if ARRAY in (lk, rk) else SCALAR
+
+        if op in ("&&", "||"):
+            self._require(kind, SCALAR, f"Operands of '{op}'")
+            return f"({l} {'and' if op == '&&' else 'or'} {r})", SCALAR
+        if op in ("&", "|"):
+            if kind == SCALAR:
+                return f"(bool({l}) {'and' if op == '&' else 'or'} bool({r}))", SCALAR
+            fn = "np.logical_and" if op == "&" else "np.logical_or"
+            return f"{fn}({l}, {r})", ARRAY
+        if op in COMPARISONS:
+            return f"({l} {COMPARISONS[op]} {r})", kind
+        if op in ("+", "-"):
+            return f"({l} {op} {r})", kind
+        if op == ".*":
+            return f"({l} * {r})", kind
+        if op == "./":
+            return f"({l} / {r})", kind
+        if op == ".^":
+            return self._pow(l, r, node.right), kind
+        if op == "*":
+            if lk == ARRAY and rk == ARRAY:
+                return f"np.dot({l}, {r})", ARRAY
+            return f"({l} * {r})", kind
+        if op == "/" and rk == SCALAR:
+            return f"({l} / {r})", kind
+        if op == "^" and kind == SCALAR:
+            return self._pow(l, r, node.right), SCALAR
+        raise JitUnsupported(f"Operator '{op}' on {lk}/{rk} operands")
+
+    def _pow(self, l, r, exponent):
+        # A literal integer exponent never gives a complex result
+        if isinstance(exponent, Number) and exponent.value.isdigit():
+            return f"({l} ** {r})"
+        return f"_pow({l}, {r})"
+
+    def _call(self, name, args):
+        # Indexing into a local array
+        if self.types.get(name) == ARRAY:
+            if len(args) == 1:
+                i = self._index(name, args[0], f"float({name}.size)")
+                return f"_lin_get({name}, {i})", SCALAR
+            if len(args) == 2:
+                i = self._index(name, args[0], f"float({name}.shape[0])")
+                j = self._index(name, args[1], f"float({name}.shape[1])")
+                return f"{name}[_idx({i}, {name}.shape[0]), _idx({j}, {name}.shape[1])]", SCALAR
+            raise JitUnsupported("Only 1-D and 2-D indexing can be compiled.")
+        if name in self.types:
+            raise JitUnsupported(f"Scalar '{name}' cannot be indexed.")
+
+        lowered = [self.expr(a) for a in args]
+        codes = [c for c, _ in lowered]
+        kinds = [k for _, k in lowered]
+        n = len(args)
+
+        if name in ELEMENTWISE and n == 1:
+            if name in REAL_DOMAINS:
+                lo, hi = REAL_DOMAINS[name]
+                return f"{ELEMENTWISE[name]}(_real({codes[0]}, {lo}, {hi}))", kinds[0]
+            return f"{ELEMENTWISE[name]}({codes[0]})", kinds[0]
+
+        if name in ("mod", "rem") and n == 2 and kinds == [SCALAR, SCALAR]:
+            return f"_{name}({codes[0]}, {codes[1]})", SCALAR
+        if name == "atan2" and n == 2:
+            return f"np.arctan2({codes[0]}, {codes[1]})", ARRAY if ARRAY in kinds else SCALAR
+        if name == "hypot" and n == 2:
+            return f"np.hypot({codes[0]}, {codes[1]})", ARRAY if ARRAY in kinds else SCALAR
+
+        if name in ("min", "max"):
+            if n == 2:
+                if kinds == [SCALAR, SCALAR]:
+                    return f"{name}({codes[0]}, {codes[1]})", SCALAR
+                fn = "np.minimum" if name == "min" else "np.maximum"
+                return f"{fn}({codes[0]}, {codes[1]})", ARRAY
+            if n == 1 and kinds[0] == ARRAY:
+                return f"np.{name}(_vector({codes[0]}))", SCALAR
+
+        if name in ("sum", "prod", "mean") and n == 1:
+            if kinds[0] == SCALAR:
+                return codes[0], SCALAR
+            if name == "mean":
+                return f"np.mean(_vector({codes[0]}))", SCALAR
+            return f"np.{name}(_vector({codes[0]}))", SCALAR
+
+        if name in ("zeros", "ones") and 1 <= n <= 2 and all(k == SCALAR for k in kinds):
+            rows = f"int({codes[0]})"
+            cols = f"int({codes[1]})" if n == 2 else rows
+            return f"np.{name}(({rows}, {cols}))", ARRAY
+
+        if name in ("numel", "length", "isempty") and n == 1:
+            if kinds[0] == SCALAR:
+                return {"numel": "1.0", "length": "1.0", "isempty": "False"}[name], SCALAR
+            if name == "numel":
+                return f"float({codes[0]}.size)", SCALAR
+            if name == "length":
+                return f"_length({codes[0]})", SCALAR
+            return f"({codes[0]}.size == 0)", SCALAR
+
+        if name == "size" and n == 2 and kinds == [ARRAY, SCALAR]:
+            return f"float({codes[0]}.shape[int({codes[1]}) - 1])", SCALAR
+
+        raise JitUnsupported(f"Call to '{name}' cannot be compiled.")
+
+    def _matrix(self, node):
+        if not node.rows:
+            return "np.zeros((0, 0))", ARRAY
+        rows = []
+        for row in node.rows:
+            rows.append("[" + ", ".join(f"float({self._scalar(x, 'matrix element')})" for x in row) + "]")
+        if len({len(r) for r in node.rows}) != 1:
+            raise JitUnsupported("Matrix rows have different lengths.")
+        return f"np.array([{', '.join(rows)}])", ARRAY
+
+
+def lower_function(node: FunctionDef, arg_kinds):
+    """Python source of the numba-compilable specialization (raises JitUnsupported)."""
+    return FunctionLowering(node, tuple(arg_kinds)).lower()
+
+
+# ============================================================
+# Dispatch
+# ============================================================
+
+def _arg_signature(value):
+    """(kind, dtype) of one argument, or None if it cannot be passed to compiled code."""
+    data = getattr(value, "_data", value)
+    if isinstance(data, (bool, int, float, np.bool_, np.integer, np.floating)):
+        return (SCALAR, "f8")
+    if isinstance(data, (complex, np.complexfloating)):
+        return (SCALAR, "c16")
+    if isinstance(data, np.ndarray) and data.ndim == 2 and data.dtype.kind in "biufc":
+        if data.size == 1:
+            return (SCALAR, "c16" if data.dtype.kind == "c" else "f8")
+        return (ARRAY, data.dtype.str)
+    return None
+
+
+def _unwrap(value, sig):
+    data = getattr(value, "_data", value)
+    if sig[0] == SCALAR:
+        if isinstance(data, np.ndarray):
+            data = data.reshape(-1)[0]
+        return complex(data) if sig[1] == "c16" else float(data)
+    return data
+
+
+def _wrap(value):
+    """A compiled result as the interpreted function returns it: a MatlabArray."""
+    from shared.symbolic_core.arrays import _from_data, box_scalar
+    if isinstance(value, np.ndarray):
+        return _from_data(value)
+    if isinstance(value, np.generic):
+        value = value.item()
+    return box_scalar(value)
+
+
+class JitFunction:
+    """
+    Callable registered in place of an interpreted user function.
+    Compiles (and caches) one numba specialization per argument signature.
+    """
+
+    def __init__(self, node: FunctionDef, fallback):
+        self.node = node
+        self.fallback = fallback
+        self.__name__ = node.name
+        self.__doc__ = getattr(fallback, "__doc__", None)
+        # signature -> compiled function, or None when it runs interpreted
+        self.specializations = {}
+        self.reasons = {}
+
+    # Told how many outputs to return, like the transpiled functions (see _nargout)
+    __kwdefaults__ = {"nargout": 1}
+    # Compiled code runs on raw 2-D arrays, so callers may skip the MatlabArray
+    # (the interpreted fallback wraps them)
+    accepts_ndarray = True
+
+    def __call__(self, *args, nargout=1):
+        sigs = tuple(_arg_signature(a) for a in args)
+        if None in sigs:
+            return self._interpreted(args, nargout)
+
+        compiled = self.specializations.get(sigs, False)
+        if compiled is False:
+            compiled = self._compile(sigs)
+        if compiled is None:
+            return self._interpreted(args, nargout)
+
+        values = [_unwrap(a, s) for a, s in zip(args, sigs)]
+        try:
+            result = compiled(*values)
+        except Exception as e:
+            if _is_compile_error(e):
+                self._reject(sigs, f"numba could not compile it: {str(e).splitlines()[0]}")
+            # Runtime failures (bounds, growth, ...) take the interpreted path
+            return self._interpreted(args, nargout)
+
+        if isinstance(result, tuple):
+            if nargout < 2:
+                return _wrap(result[0])
+            return tuple(_wrap(r) for r in result[:nargout])
+        return _wrap(result)
+
+    def _interpreted(self, args, nargout):
+        args = [_wrap(a) for a in args]
+        if len(self.node.outputs) > 1:
+            return self.fallback(*args, nargout=nargout)
+        return self.fallback(*args)
+
+    def _compile(self, sigs):
+        kinds = tuple(kind for kind, _ in sigs)
+        try:
+            source = lower_function(self.node, kinds)
+            numba = _numba()
+        except JitUnsupported as e:
+            self._reject(sigs, str(e))
+            return None
+
+        ns = _runtime_namespace()
+        exec(source, ns)
+        compiled = numba.njit(cache=False)(ns[f"_jit_{self.node.name}"])
+        self.specializations[sigs] = compiled
+        return compiled
+
+    def _reject(self, sigs, reason):
+        self.specializations[sigs] = None
+        self.reasons[sigs] = reason
+        kinds = ", ".join(kind for kind, _ in sigs) or "no arguments"
+        print(f"Note: '{self.node.name}' ({kinds}) runs interpreted: {reason}")
+
+    def __repr__(self):
+        return f"<jit function {self.node.name} ({len(self.specializations)} specializations)>"
+
+
+def _is_compile_error(exc):
+    numba = importlib.import_module("numba")
+    return isinstance(exc, numba.core.errors.NumbaError)
+
+
+# ============================================================
+# Anonymous functions
+# ============================================================
+
+# MATLAB AST of the anonymous functions transpiled in this process, keyed
+# by a hash of the lambda they were transpiled to
+_anonymous_nodes = {}
+
+
+def register_anonymous(node: AnonymousFunc, source):
+    """Key under which the transpiler records an @(...) expression."""
+    key = hashlib.sha1(source.encode()).hexdigest()[:16]
+    _anonymous_nodes.setdefault(key, node)
+    return key
+
+
+def anonymous(fn, key):
+    """Emitted around each transpiled @(...) lambda: tags it with its MATLAB AST."""
+    node = _anonymous_nodes.get(key)
+    if node is not None:
+        fn.matlab_node = node
+    return fn
+
+
+def _read_names(node, names):
+    if isinstance(node, Variable):
+        if node.name not in names:
+            names.append(node.name)
+        return
+    if isinstance(node, AnonymousFunc):
+        raise JitUnsupported("Nested anonymous functions cannot be compiled.")
+    if isinstance(node, (list, tuple)):
+        for child in node:
+            _read_names(child, names)
+    elif isinstance(node, Node):
+        for f in fields(node):
+            _read_names(getattr(node, f.name), names)
+
+
+def _captured_value(fun, name):
+    """Value of a variable an anonymous function reads from its workspace (or None)."""
+    code = getattr(fun, "__code__", None)
+    if code is not None and name in code.co_freevars:
+        try:
+            return fun.__closure__[code.co_freevars.index(name)].cell_contents
+        except ValueError:
+            return None
+    return getattr(fun, "__globals__", {}).get(name)
+
+
+def lower_anonymous(fun, arg_kinds):
+    """
+    Lowers a transpiled anonymous function @(a, b, ...) expr for the kinds of
+    its arguments, as `_jit_anonymous(a, b, ..., *captured)`.
+
+    Returns (source, captured values, kind of the result). Captured values
+    are the real scalars (floats) and arrays (2-D float64) it reads from the
+    workspace, as they are now; raises JitUnsupported.
+    """
+    node = getattr(fun, "matlab_node", None)
+    if node is None:
+        raise JitUnsupported("Only anonymous functions defined in MATLAB code can be compiled.")
+    names, captured, values, kinds = [], [], [], list(arg_kinds)
+    _read_names(node.body, names)
+    for name in names:
+        if name in node.args:
+            continue
+        value = _captured_value(fun, name)
+        sig = _arg_signature(value)
+        if sig is None:
+            continue    # a function or constant, or left for the lowering to reject
+        if np.dtype(sig[1]).kind == "c":
+            raise JitUnsupported(f"Captured variable '{name}' is complex.")
+        captured.append(name)
+        kinds.append(sig[0])
+        data = _unwrap(value, sig)
+        values.append(data if sig[0] == SCALAR else np.ascontiguousarray(data, dtype=np.float64))
+
+    func = FunctionDef("anonymous", list(node.args) + captured, ["_result"],
+                       [Assign("_result", node.body)])
+    lowering = FunctionLowering(func, tuple(kinds))
+    return lowering.lower(), tuple(values), lowering.types["_result"]
+
+
+def find_function(tree, name):
+    """The FunctionDef called `name` in a parsed file (or its first function)."""
+    funcs = [s for s in getattr(tree, "stmts", []) if isinstance(s, FunctionDef)]
+    for f in funcs:
+        if f.name == name:
+            return f
+    return funcs[0] if funcs else None
+
+
+def wants_jit(name, code):
+    return name in requested or PRAGMA.search(code) is not None
@@ -0,0 +1,516 @@
+"""
+mathex.language.optimize
+
+AST optimization passes run by transpile() before code generation.
+
+- Constant folding: arithmetic on numeric literals and pi, and math
+  builtins of constants, become one literal (pi/180, 2^10, sqrt(2)).
+- Loop-invariant hoisting: pure expressions in a for / while loop that
+  read nothing the loop assigns (length(x), size(A, 1), constant matrix
+  literals, ranges and scalar arithmetic on invariant values) are
+  computed once before the loop into _hoisted_<n> temporaries.
+
+Hoisted code runs before the loop, so only expressions that cannot fail
+are moved: shape queries, literals, and operators whose operands
+inference proved to be scalars. Body statements move only out of a for
+loop whose range is a constant with at least one element, and only when
+they run on every iteration (not inside if / switch / try, nor after a
+break / continue / return); of a while loop only the condition moves.
+Nothing is moved out of a loop that may create or delete variables (eval,
+load, clear...) or reads a global, nor in a function with nested
+functions (which may assign its variables), and a value is never hoisted
+into a direct argument of a user function (which could modify it in
+place). Variables of the workspace (`workspace` names) shadow builtins
+like the unit's own assignments do.
+"""
+
+import math
+from dataclasses import fields
+
+from .ast_nodes import (
+    Program, Assign, MultiAssign, BinOp, UnaryOp, Number, String, Variable,
+    Call, Member, Matrix, Range, Command, IfBlock, SwitchBlock, TryBlock,
+    ForLoop, WhileLoop, Break, Continue, Return, GlobalDecl, FunctionDef, ClassDef,
+    AnonymousFunc, Node
+)
+from .inference import ANY, OPAQUE_CALLS, infer_types
+from .parfor import _children
+
+HOIST_PREFIX = "_hoisted_"
+
+# Builtins without side effects that do not raise for any MATLAB value
+PURE_BUILTINS = {"numel", "length", "size", "ndims", "isempty"}
+
+# Builtins that may raise but never modify their arguments in place: their
+# arguments can be hoisted, the calls stay in the loop
+VALUE_BUILTINS = PURE_BUILTINS | {
+    "abs", "sqrt", "exp", "log", "log10", "sin", "cos", "tan",
+    "asin", "acos", "atan", "atan2", "sinh", "cosh", "tanh",
+    "floor", "ceil", "fix", "round", "sign", "mod", "rem",
+    "sum", "prod", "mean", "norm",
+}
+
+
+def _fold_sqrt(x):
+    return math.sqrt(x) if x >= 0 else None
+
+
+def _fold_log(x):
+    return math.log(x) if x > 0 else None
+
+
+# Builtins folded on a real constant argument (None: leave the call alone)
+FOLDABLE = {
+    "sqrt": _fold_sqrt,
+    "exp": math.exp,
+    "log": _fold_log,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "abs": abs,
+    "floor": math.floor,
+    "ceil": math.ceil,
+}
+
+ARITH_OPS = ("+", "-", "*", ".*", "/", "./", "^", ".^")
+
+
+# ============================================================
+# Scopes
+# ============================================================
+
+def _scope_walk(stmts):
+    """Nodes of a scope; function definitions and anonymous function bodies are not entered."""
+    stack = list(reversed(stmts))
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, (FunctionDef, ClassDef, AnonymousFunc)):
+            continue
+        stack.extend(reversed(list(_children(node))))
+
+
+def _assigned(stmts):
+    names = set()
+    for n in _scope_walk(stmts):
+        if isinstance(n, Assign):
+            target = n.target
+            while isinstance(target, (Call, Member)):
+                target = target.func if isinstance(target, Call) else target.target
+            if isinstance(target, Variable):
+                names.add(target.name)
+            elif isinstance(target, str):
+                names.add(target)
+        elif isinstance(n, MultiAssign):
+            names.update(n.targets)
+        elif isinstance(n, ForLoop):
+            names.add(n.var)
+        elif isinstance(n, TryBlock) and n.catch_var:
+            names.add(n.catch_var)
+    return names
+
+
+def _is_opaque(stmts):
+    """True if the statements may create or delete arbitrary variables."""
+    for n in _scope_walk(stmts):
+        if isinstance(n, FunctionDef):
+            return True     # a nested function: its calls may assign our variables
+        if isinstance(n, Command) and n.name in OPAQUE_CALLS:
+            return True
+        if isinstance(n, Call) and isinstance(n.func, Variable) and n.func.name in OPAQUE_CALLS:
+            return True
+        if isinstance(n, Variable) and n.name in OPAQUE_CALLS:
+            return True
+    return False
+
+
+class _Scope:
+    """Variables of a script or function body."""
+
+    def __init__(self, stmts, params=(), workspace=()):
+        self.variables = _assigned(stmts) | set(params)
+        self.workspace = workspace
+        self.globals = {name for n in _scope_walk(stmts) if isinstance(n, GlobalDecl) for name in n.names}
+        self.opaque = _is_opaque(stmts)
+        # Parameters are bound (to None when not passed) unless the function
+        # checks nargin / exist for optional arguments
+        reads = {n.name for n in _scope_walk(stmts) if isinstance(n, Variable)}
+        self.defined = set() if reads & {"nargin", "exist"} else set(params)
+
+    def builtin(self, name):
+        """True if `name` refers to the builtin (never shadowed in this scope)."""
+        return not self.opaque and name not in self.variables and name not in self.workspace
+
+
+def _scopes(tree, workspace=()):
+    """(statement list, _Scope) for the script part and every function of a unit."""
+    stmts = tree.stmts if isinstance(tree, Program) else [tree]
+    script = [s for s in stmts if not isinstance(s, (FunctionDef, ClassDef))]
+    yield stmts, _Scope(script, workspace=workspace)
+    for s in stmts:
+        if isinstance(s, FunctionDef):
+            yield s.body, _Scope(s.body, s.args)
+
+
+# ============================================================
+# Constant Folding
+# ============================================================
+
+def _map_fields(node, fn):
+    """Replaces the child nodes of `node` (in place) by fn(child)."""
+    for f in fields(node):
+        value = getattr(node, f.name)
+        if isinstance(value, (Node, list, tuple)):
+            setattr(node, f.name, _map_value(value, fn))
+
+
+def _map_value(value, fn):
+    if isinstance(value, Node):
+        return fn(value)
+    if isinstance(value, list):
+        return [_map_value(v, fn) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_map_value(v, fn) for v in value)
+    return value
+
+
+class _Folder:
+    def __init__(self, scope):
+        self.scope = scope
+
+    def fold(self, node):
+        if isinstance(node, (FunctionDef, ClassDef, AnonymousFunc)):
+            return node
+        _map_fields(node, self.fold)
+
+        if isinstance(node, BinOp) and node.op in ARITH_OPS:
+            a, b = self._const(node.left), self._const(node.right)
+            if a is not None and b is not None:
+                return _literal(_arith(node.op, a, b)) or node
+
+        if (isinstance(node, Call) and isinstance(node.func, Variable)
+                and node.func.name in FOLDABLE and self.scope.builtin(node.func.name)
+                and len(node.args) == 1):
+            x = self._const(node.args[0])
+            if x is not None:
+                try:
+                    return _literal(FOLDABLE[node.func.name](x)) or node
+                except (OverflowError, ValueError):
+                    pass
+        return node
+
+    def _const(self, node):
+        """Value of a real numeric constant expression, else None."""
+        if isinstance(node, Number):
+            text = node.value
+            if text.isdigit():
+                return int(text)
+            try:
+                value = float(text)
+            except ValueError:
+                return None  # complex (3i) and other literal forms
+            return value if math.isfinite(value) else None
+        if isinstance(node, UnaryOp) and node.op in ("-", "+"):
+            value = self._const(node.operand)
+            if value is None:
+                return None
+            return -value if node.op == "-" else value
+        if isinstance(node, Variable) and node.name == "pi" and self.scope.builtin("pi"):
+            return math.pi
+        return None
+
+
+def _arith(op, a, b):
+    """a op b with MATLAB semantics, or None when the result is not a finite real."""
+    try:
+        if op == "+":
+            r = a + b
+        elif op == "-":
+            r = a - b
+        elif op in ("*", ".*"):
+            r = a * b
+        elif op in ("/", "./"):
+            if b == 0:
+                return None
+            r = a / b
+        else:
+            if (a < 0 and b != int(b)) or (a == 0 and b < 0):
+                return None
+            r = a ** b if abs(b) <= 64 else float(a) ** b
+        if isinstance(r, int) and abs(r) > 2 ** 53:
+            r = float(r)
+    except OverflowError:
+        return None
+    if isinstance(r, int):
+        return r
+    return r if math.isfinite(r) else None
+
+
+def _literal(value):
+    if value is None or not math.isfinite(value):
+        return None
+    text = str(abs(value)) if isinstance(value, int) else repr(abs(float(value)))
+    if value < 0:
+        return UnaryOp("-", Number(text))
+    return Number(text)
+
+
+# ============================================================
+# Loop-Invariant Hoisting
+# ============================================================
+
+class _Hoister:
+    def __init__(self, scope, facts, counter):
+        self.scope = scope
+        self.facts = facts
+        self.counter = counter      # shared across scopes: one name space per unit
+        self.defined = set()
+        self.folder = _Folder(scope)
+
+    def block(self, stmts, defined, consts):
+        """
+        Hoists out of every loop in `stmts`; returns the new statement list.
+        `defined` holds the names certainly bound before the block and is
+        updated as unconditional assignments are passed; `consts` maps the
+        names holding a known numeric constant to its value.
+        """
+        out = []
+        for stmt in stmts:
+            self._nested(stmt, defined, consts)
+            if isinstance(stmt, (ForLoop, WhileLoop)):
+                out.extend(self._loop(stmt, defined, consts))
+            out.append(stmt)
+            for name in _assigned([stmt]):
+                consts.pop(name, None)
+            if isinstance(stmt, Assign) and isinstance(stmt.target, str):
+                defined.add(stmt.target)
+                value = self._value(stmt.value, consts)
+                if value is not None:
+                    consts[stmt.target] = value
+            elif isinstance(stmt, MultiAssign):
+                defined.update(t for t in stmt.targets if t != "~")
+        return out
+
+    def _nested(self, stmt, defined, consts):
+        if isinstance(stmt, IfBlock):
+            stmt.conditions = [(cond, self.block(body, set(defined), dict(consts)))
+                               for cond, body in stmt.conditions]
+            if stmt.else_body is not None:
+                stmt.else_body = self.block(stmt.else_body, set(defined), dict(consts))
+        elif isinstance(stmt, SwitchBlock):
+            stmt.cases = [(case, self.block(body, set(defined), dict(consts))) for case, body in stmt.cases]
+            if stmt.otherwise_body:
+                stmt.otherwise_body = self.block(stmt.otherwise_body, set(defined), dict(consts))
+        elif isinstance(stmt, TryBlock):
+            stmt.try_body = self.block(stmt.try_body, set(defined), dict(consts))
+            stmt.catch_body = self.block(stmt.catch_body, set(defined), dict(consts))
+        elif isinstance(stmt, (ForLoop, WhileLoop)):
+            inner = set(defined)
+            if isinstance(stmt, ForLoop):
+                inner.add(stmt.var)
+            changing = _assigned([stmt])
+            stmt.body = self.block(stmt.body, inner, {k: v for k, v in consts.items() if k not in changing})
+
+    def _loop(self, loop, defined, consts):
+        """Moves invariant work out of `loop`; returns the statements to run before it."""
+        if _is_opaque(loop.body):
+            return []
+        self.defined = defined
+        varying = _assigned(loop.body) | self.scope.globals
+        if isinstance(loop, ForLoop):
+            varying.add(loop.var)
+        hoisted = []
+
+        def hoist(node):
+            name = f"{HOIST_PREFIX}{next(self.counter)}"
+            hoisted.append(Assign(name, node))
+            temp = Variable(name)
+            self.facts[id(temp)] = self.facts.get(id(node), ANY)
+            return temp
+
+        if isinstance(loop, WhileLoop):
+            # The condition is evaluated at least once, the body maybe never
+            loop.condition = self._expr(loop.condition, varying, hoist)
+            return hoisted
+        if not self._runs(loop.iterable, consts):
+            return hoisted
+
+        # Only statements reached on every iteration: a statement after a
+        # break / continue / return may not run, nor the body of a branch
+        body = []
+        steady = True
+        for stmt in loop.body:
+            if not steady:
+                body.append(stmt)
+                continue
+            if (isinstance(stmt, Assign) and isinstance(stmt.target, str)
+                    and stmt.target.startswith(HOIST_PREFIX)
+                    and self._pure(stmt.value, varying)):
+                # Temporaries hoisted out of inner loops move further out
+                hoisted.append(stmt)
+                varying.discard(stmt.target)
+                continue
+            self._stmt(stmt, varying, hoist)
+            body.append(stmt)
+            steady = not any(isinstance(n, (Break, Continue, Return)) for n in _scope_walk([stmt]))
+        loop.body = body
+        return hoisted
+
+    def _runs(self, iterable, consts):
+        """True if a for loop over `iterable` certainly has at least one iteration."""
+        if isinstance(iterable, Range):
+            start, end = self._value(iterable.start, consts), self._value(iterable.end, consts)
+            step = 1 if iterable.step is None else self._value(iterable.step, consts)
+            if None in (start, end, step) or step == 0:
+                return False
+            return (end - start) / step >= 0
+        if isinstance(iterable, Matrix):
+            return any(iterable.rows)
+        return False
+
+    def _value(self, node, consts):
+        """Value of a real constant expression over `consts`, else None."""
+        if isinstance(node, Variable) and node.name in consts:
+            return consts[node.name]
+        if isinstance(node, BinOp) and node.op in ARITH_OPS:
+            a, b = self._value(node.left, consts), self._value(node.right, consts)
+            return None if a is None or b is None else _arith(node.op, a, b)
+        if isinstance(node, UnaryOp) and node.op in ("-", "+"):
+            value = self._value(node.operand, consts)
+            return None if value is None else (-value if node.op == "-" else value)
+        return self.folder._const(node)
+
+    def _stmt(self, stmt, varying, hoist):
+        """Replaces the hoistable expressions of one statement of a loop body."""
+        if isinstance(stmt, Assign):
+            stmt.value = self._expr(stmt.value, varying, hoist)
+            if isinstance(stmt.target, Call):
+                stmt.target.args = [self._expr(a, varying, hoist) for a in stmt.target.args]
+        elif isinstance(stmt, MultiAssign):
+            # The call itself returns several outputs; only its arguments move
+            if isinstance(stmt.value, Call):
+                self._args(stmt.value, varying, hoist)
+        elif isinstance(stmt, ForLoop):
+            # Inner bodies were handled by the inner pass; the bounds of an
+            # inner range are evaluated once per outer iteration
+            rng = stmt.iterable
+            if isinstance(rng, Range):
+                rng.start = self._expr(rng.start, varying, hoist)
+                rng.end = self._expr(rng.end, varying, hoist)
+                if rng.step is not None:
+                    rng.step = self._expr(rng.step, varying, hoist)
+            else:
+                stmt.iterable = self._expr(rng, varying, hoist)
+        elif isinstance(stmt, (Call, BinOp, UnaryOp, Member, Matrix)):
+            # Expression statement: its value is displayed or discarded
+            self._sub(stmt, varying, hoist)
+
+    def _expr(self, node, varying, hoist):
+        """Hoists `node` if it is worth it, else its hoistable parts."""
+        if self._worth_hoisting(node) and self._pure(node, varying):
+            return hoist(node)
+        self._sub(node, varying, hoist)
+        return node
+
+    def _sub(self, node, varying, hoist):
+        if isinstance(node, BinOp):
+            node.left = self._expr(node.left, varying, hoist)
+            node.right = self._expr(node.right, varying, hoist)
+        elif isinstance(node, UnaryOp):
+            node.operand = self._expr(node.operand, varying, hoist)
+        elif isinstance(node, Member):
+            node.target = self._expr(node.target, varying, hoist)
+        elif isinstance(node, Matrix):
+            node.rows = [[self._expr(x, varying, hoist) for x in row] for row in node.rows]
+        elif isinstance(node, Range):
+            node.start = self._expr(node.start, varying, hoist)
+            node.end = self._expr(node.end, varying, hoist)
+            if node.step is not None:
+                node.step = self._expr(node.step, varying, hoist)
+        elif isinstance(node, Call):
+            self._args(node, varying, hoist)
+
+    def _args(self, call, varying, hoist):
+        func = call.func
+        if isinstance(func, Variable) and (
+            (func.name in VALUE_BUILTINS and self.scope.builtin(func.name))
+            or func.name in self.scope.variables
+        ):
+            call.args = [self._expr(a, varying, hoist) for a in call.args]
+        else:
+            # A user function may modify its arguments in place: each
+            # iteration must pass a fresh value, only inner parts move
+            for arg in call.args:
+                self._sub(arg, varying, hoist)
+
+    # ---------------------------------------------------------
+    # Invariance
+    # ---------------------------------------------------------
+    def _worth_hoisting(self, node):
+        if isinstance(node, UnaryOp) and isinstance(node.operand, Number):
+            return False
+        return isinstance(node, (Call, Matrix, Range, BinOp, UnaryOp, Member))
+
+    def _scalar(self, node):
+        return isinstance(node, Number) or self.facts.get(id(node), ANY).is_scalar
+
+    def _pure(self, node, varying):
+        """Loop-invariant, side-effect free and unable to raise."""
+        if isinstance(node, (Number, String)):
+            return True
+        if isinstance(node, Variable):
+            if node.name in varying:
+                return False
+            return node.name in self.defined or (node.name == "pi" and self.scope.builtin("pi"))
+        if isinstance(node, Call):
+            func = node.func
+            return (
+                isinstance(func, Variable) and func.name in PURE_BUILTINS
+                and self.scope.builtin(func.name)
+                and all(self._pure(a, varying) for a in node.args)
+            )
+        if isinstance(node, Matrix):
+            items = [x for row in node.rows for x in row]
+            return (
+                len({len(row) for row in node.rows}) <= 1
+                and all(self._scalar(x) and self._pure(x, varying) for x in items)
+            )
+        if isinstance(node, Range):
+            parts = [node.start, node.end] + ([node.step] if node.step is not None else [])
+            return all(self._scalar(p) and self._pure(p, varying) for p in parts)
+        if isinstance(node, BinOp):
+            return all(self._scalar(x) and self._pure(x, varying) for x in (node.left, node.right))
+        if isinstance(node, UnaryOp):
+            return self._scalar(node.operand) and self._pure(node.operand, varying)
+        if isinstance(node, Member):
+            fact = self.facts.get(id(node.target), ANY)
+            return (
+                node.field in ("H", "T") and (fact.is_scalar or fact.is_array)
+                and self._pure(node.target, varying)
+            )
+        return False
+
+
+# ============================================================
+# Driver
+# ============================================================
+
+def optimize(tree, fold=True, hoist=True, workspace=()):
+    """
+    Runs the enabled passes over a parsed unit (in place) and returns it.
+    `workspace` holds the variable names bound before the unit runs (any
+    container supporting `in`); they are never taken for builtins.
+    """
+    if fold:
+        for stmts, scope in _scopes(tree, workspace):
+            folder = _Folder(scope)
+            stmts[:] = [folder.fold(s) for s in stmts]
+
+    if hoist:
+        facts = infer_types(tree)
+        counter = iter(range(1 << 30))
+        for stmts, scope in _scopes(tree, workspace):
+            if scope.opaque:
+                continue
+            stmts[:] = _Hoister(scope, facts, counter).block(stmts, set(scope.defined), {})
+    return tree
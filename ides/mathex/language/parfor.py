@@ -0,0 +1,240 @@
+"""
+mathex.language.parfor
+
+Transpile-time variable classification for `parfor` bodies (MATLAB rules):
+
+- loop:       the parfor variable
+- sliced:     outputs written as A(..., i, ...) = expr (indexed by the loop variable)
+- reduction:  s = s + expr, s = s * expr, s = min(s, expr), s = [s, expr], ...
+- temporary:  any other variable assigned in the body (private to each iteration)
+- broadcast:  everything else that is read (sent once to every worker)
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Dict, List
+
+from .ast_nodes import (
+    Node, Assign, MultiAssign, BinOp, Variable, Call, Member, Matrix,
+    ForLoop, ParforLoop, TryBlock, Break, Return, FunctionDef, AnonymousFunc
+)
+
+# Operators that can combine partial results computed on different workers
+REDUCTION_OPS = ('+', '-', '*', '.*', '&', '|')
+# Operators where the reduction variable may also be the right operand
+COMMUTATIVE_OPS = ('+', '.*', '&', '|')
+REDUCTION_CALLS = ('min', 'max')
+
+
+@dataclass
+class ParforPlan:
+    loop_var: str
+    broadcast: List[str] = field(default_factory=list)
+    sliced: List[str] = field(default_factory=list)
+    reductions: Dict[str, str] = field(default_factory=dict)  # name -> operator
+    temporaries: List[str] = field(default_factory=list)
+
+
+def _children(node):
+    for f in fields(node):
+        value = getattr(node, f.name)
+        yield from _flatten(value)
+
+
+def _flatten(value):
+    if isinstance(value, Node):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten(item)
+
+
+def _walk(node):
+    """Pre-order traversal; anonymous function bodies keep their own scope."""
+    yield node
+    if isinstance(node, AnonymousFunc):
+        return
+    for child in _children(node):
+        yield from _walk(child)
+
+
+def _reads(node, names):
+    """Collects variable names read by an expression."""
+    for n in _walk(node):
+        if isinstance(n, Variable):
+            names.add(n.name)
+        elif isinstance(n, AnonymousFunc):
+            inner = set()
+            _reads(n.body, inner)
+            names.update(inner - set(n.args))
+
+
+def _mentions(node, name):
+    found = set()
+    _reads(node, found)
+    return name in found
+
+
+def _is_var(node, name):
+    return isinstance(node, Variable) and node.name == name
+
+
+def _reduction_op(name, rhs):
+    """Operator of `name = rhs` if it is a reduction of `name`, else None."""
+    if isinstance(rhs, BinOp) and rhs.op in REDUCTION_OPS:
+        if _is_var(rhs.left, name) and not _mentions(rhs.right, name):
+            return rhs.op
+        if rhs.op in COMMUTATIVE_OPS and _is_var(rhs.right, name) and not _mentions(rhs.left, name):
+            return rhs.op
+
+    if (isinstance(rhs, Call) and _is_var_name(rhs.func, REDUCTION_CALLS)
+            and len(rhs.args) == 2):
+        a, b = rhs.args
+        if (_is_var(a, name) and not _mentions(b, name)) or (_is_var(b, name) and not _mentions(a, name)):
+            return rhs.func.name
+
+    if isinstance(rhs, Matrix) and rhs.rows:
+        # [s, expr] (horizontal) or [s; expr] (vertical); s must come first
+        if len(rhs.rows) == 1 and len(rhs.rows[0]) == 2:
+            a, b = rhs.rows[0]
+            if _is_var(a, name) and not _mentions(b, name):
+                return '[,]'
+        if len(rhs.rows) == 2 and len(rhs.rows[0]) == 1 and len(rhs.rows[1]) == 1:
+            a, b = rhs.rows[0][0], rhs.rows[1][0]
+            if _is_var(a, name) and not _mentions(b, name):
+                return '[;]'
+    return None
+
+
+def _is_var_name(node, names):
+    return isinstance(node, Variable) and node.name in names
+
+
+def classify_parfor(node: ParforLoop) -> ParforPlan:
+    """
+    Classifies every variable of a parfor body.
+    Raises SyntaxError for bodies MATLAB would reject (break/return, writing
+    the loop variable, or variables that fit no class).
+    """
+    var = node.var
+    plan = ParforPlan(loop_var=var)
+
+    assigned = set()          # plain assignments (temporaries or reductions)
+    reduction_stmts = {}      # name -> list of (op, stmt)
+    other_assign = set()      # names assigned in a non-reduction form
+    indexed = {}              # name -> True if indexed by the loop var
+    reads = set()
+
+    for n in _walk_body(node.body):
+        if isinstance(n, (Break, Return)):
+            raise SyntaxError("parfor loops cannot contain break or return statements.")
+        if isinstance(n, FunctionDef):
+            raise SyntaxError("Functions cannot be defined inside a parfor loop.")
+
+        if isinstance(n, Assign):
+            target = n.target
+            if isinstance(target, str):
+                if target == var:
+                    raise SyntaxError(f"The parfor loop variable '{var}' cannot be assigned.")
+                assigned.add(target)
+                op = _reduction_op(target, n.value)
+                if op is None:
+                    other_assign.add(target)
+                else:
+                    reduction_stmts.setdefault(target, []).append((op, n))
+            elif isinstance(target, Call) and isinstance(target.func, Variable):
+                name = target.func.name
+                by_loop = any(_mentions(a, var) for a in target.args)
+                indexed[name] = indexed.get(name, False) or by_loop
+            elif isinstance(target, Member):
+                base = target
+                while isinstance(base, Member):
+                    base = base.target
+                if isinstance(base, Variable):
+                    other_assign.add(base.name)
+                    assigned.add(base.name)
+        elif isinstance(n, MultiAssign):
+            for t in n.targets:
+                if t == var:
+                    raise SyntaxError(f"The parfor loop variable '{var}' cannot be assigned.")
+                assigned.add(t)
+                other_assign.add(t)
+        elif isinstance(n, ForLoop):
+            assigned.add(n.var)
+            other_assign.add(n.var)
+        elif isinstance(n, TryBlock) and n.catch_var:
+            assigned.add(n.catch_var)
+            other_assign.add(n.catch_var)
+
+    # Reads: every Variable, except inside the reduction statements themselves
+    # (their own reduction variable) and assignment targets
+    reduction_ids = {id(stmt) for stmts in reduction_stmts.values() for _, stmt in stmts}
+    for stmt in node.body:
+        _collect_reads(stmt, reads, reduction_ids, reduction_stmts)
+
+    # --- Reductions: every write is a reduction with one operator, never read otherwise
+    for name, stmts in reduction_stmts.items():
+        ops = {op for op, _ in stmts}
+        if name in other_assign or len(ops) != 1:
+            other_assign.add(name)
+            continue
+        if name in reads:
+            raise SyntaxError(
+                f"The reduction variable '{name}' cannot be used outside its reduction statements in a parfor loop."
+            )
+        plan.reductions[name] = ops.pop()
+
+    # --- Temporaries
+    temporaries = sorted(other_assign)
+    plan.temporaries = temporaries
+
+    # --- Sliced outputs
+    for name, by_loop in indexed.items():
+        if name in other_assign:
+            continue  # indexing into a temporary
+        if not by_loop or name in plan.reductions:
+            raise SyntaxError(f"The variable '{name}' in a parfor cannot be classified.")
+        plan.sliced.append(name)
+    plan.sliced.sort()
+
+    # --- Broadcast: read, not produced inside the body (sliced outputs may be read)
+    local = set(temporaries) | set(plan.reductions) | {var}
+    plan.broadcast = sorted(n for n in reads if n not in local)
+    return plan
+
+
+def _walk_body(stmts):
+    for stmt in stmts:
+        yield from _walk(stmt)
+
+
+def _collect_reads(node, reads, reduction_ids, reduction_stmts):
+    if isinstance(node, Assign):
+        target = node.target
+        if id(node) in reduction_ids:
+            # s = s + expr: only expr counts as a read
+            inner = set()
+            _reads(node.value, inner)
+            inner.discard(target)
+            reads.update(inner)
+            return
+        if isinstance(target, Call):
+            # A(i) = expr: index expressions and expr are reads, A itself is not
+            for a in target.args:
+                _reads(a, reads)
+        elif isinstance(target, Member):
+            _reads(target.target, reads)
+        _reads(node.value, reads)
+        return
+    if isinstance(node, MultiAssign):
+        _reads(node.value, reads)
+        return
+    if isinstance(node, ForLoop):
+        _reads(node.iterable, reads)
+        for stmt in node.body:
+            _collect_reads(stmt, reads, reduction_ids, reduction_stmts)
+        return
+    if isinstance(node, (Variable, AnonymousFunc)):
+        _reads(node, reads)
+        return
+    for child in _children(node):
+        _collect_reads(child, reads, reduction_ids, reduction_stmts)
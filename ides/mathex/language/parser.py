@@ -1,36 +1,62 @@
+from collections import deque
 from typing import List
 from .tokenizer import Token
 from .ast_nodes import (
     Node, Program, Assign, MultiAssign, BinOp, UnaryOp, Number, String,
-    Variable, Call, Index, Member, Matrix, CellArray, Range, Command,
-    IfBlock, ForLoop, WhileLoop, Break, Continue, GlobalDecl,
+    Variable, End, Call, Index, Member, Matrix, CellArray, Range, Command,
+    IfBlock, ForLoop, ParforLoop, WhileLoop, Break, Continue, GlobalDecl,
     FunctionDef, Return, AnonymousFunc, TryBlock, SwitchBlock, ClassDef
 )
 
+# Keywords opening a block closed by 'end'
+BLOCK_OPENERS = {
+    'if', 'for', 'parfor', 'while', 'switch', 'try', 'function',
+    'classdef', 'properties', 'methods', 'events'
+}
+BLOCK_BREAKS = ('else', 'elseif', 'case', 'otherwise', 'catch')
+
+
 # ==========================================================
 # PARSER IMPLEMENTATION
 # ==========================================================
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.pos = 0
+    """
+    Recursive-descent parser. `tokens` is any iterable of Tokens ending with
+    EOF, e.g. Tokenizer.iter_tokens(); it is read one token ahead at most,
+    so the token list never has to exist as a whole.
+
+    With recover=True a statement that fails to parse is skipped (up to the
+    end of its line, or past the 'end' of the block it opens) and parsing
+    goes on; `errors` then lists (line, message) for every such statement.
+    """
+    def __init__(self, tokens, recover=False):
+        self._stream = iter(tokens)
+        self._ahead = deque()      # tokens read past the current one
+        self._eof = Token('EOF', '')
+        self._tok = next(self._stream, self._eof)
+        self.pos = 0               # number of tokens consumed
+        self.recover = recover
+        self.errors = []
+        self._siblings = []        # functions following an end-less one (see parse_function)
 
     # ---------------- Token helpers ----------------
     def curr(self) -> Token:
-        return self.tokens[self.pos]
+        return self._tok
 
     def consume(self, type_name=None, value=None):
-        t = self.curr()
+        t = self._tok
         if type_name and t.type != type_name:
             raise SyntaxError(f"Expected {type_name}, got {t.type} near {t.value}")
         if value and t.value != value:
             raise SyntaxError(f"Expected '{value}', got '{t.value}'")
+        self._tok = self._ahead.popleft() if self._ahead else next(self._stream, self._eof)
         self.pos += 1
         return t
 
     def lookahead(self, n=1) -> Token:
-        p = self.pos + n
-        return self.tokens[p] if p < len(self.tokens) else Token('EOF', '')
+        while len(self._ahead) < n:
+            self._ahead.append(next(self._stream, self._eof))
+        return self._ahead[n - 1]
 
     def match(self, value) -> bool:
         if self.curr().value == value:
@@ -45,9 +71,63 @@ class Parser:
             if self.curr().type in ('NEWLINE', ';'):
                 self.consume()
                 continue
-            stmts.append(self.statement())
+            self._statement_into(stmts)
+            stmts.extend(self._siblings)
+            self._siblings = []
         return Program(stmts)
 
+    def _statement_into(self, body):
+        if not self.recover:
+            body.append(self.statement())
+            return
+        start, pos = self.curr(), self.pos
+        try:
+            stmt = self.statement()
+        except SyntaxError as e:
+            if self.curr().type == 'EOF' and start.type == 'KEYWORD' and start.value in BLOCK_OPENERS:
+                self.errors.append((start.line, f"'{start.value}' without a matching 'end'"))
+            else:
+                self.errors.append((self.curr().line or start.line, str(e)))
+            self._synchronize(start, pos)
+            return
+        if isinstance(stmt, End):
+            self.errors.append((start.line, "'end' without a matching block"))
+            return
+        body.append(stmt)
+
+    def _synchronize(self, start, pos):
+        """Skips the rest of a failed statement (recover mode)."""
+        # A failed block statement is skipped through its own 'end'
+        depth = 1 if start.type == 'KEYWORD' and start.value in BLOCK_OPENERS else 0
+        nesting = 0
+        while self.curr().type != 'EOF':
+            t = self.curr()
+            if t.type in ('(', '[', '{'):
+                nesting += 1
+            elif t.type in (')', ']', '}'):
+                nesting = max(nesting - 1, 0)
+            elif nesting == 0 and t.type == 'KEYWORD':
+                if t.value in BLOCK_OPENERS:
+                    depth += 1
+                elif t.value == 'end':
+                    if depth == 0:
+                        break       # closes the enclosing block
+                    depth -= 1
+                    if depth == 0:
+                        self.consume()
+                        break
+                elif depth == 0 and t.value in BLOCK_BREAKS:
+                    break
+            elif t.type == 'NEWLINE':
+                nesting = 0
+                if depth == 0:
+                    break
+            elif t.type == ';' and nesting == 0 and depth == 0:
+                break
+            self.consume()
+        if self.pos == pos and self.curr().type != 'EOF':
+            self.consume()  # always make progress
+
     # ---------------- Statement ----------------
     def statement(self) -> Node:
         t = self.curr()
@@ -60,6 +140,7 @@ class Parser:
             if t.value == 'switch': return self.parse_switch()
             if t.value == 'try': return self.parse_try()
             if t.value == 'for': return self.parse_for()
+            if t.value == 'parfor': return self.parse_parfor()
             if t.value == 'while': return self.parse_while()
             if t.value == 'break': self.consume(); return Break()
             if t.value == 'continue': self.consume(); return Continue()
@@ -143,6 +224,15 @@ class Parser:
         self.consume(')')
 
         body = self.parse_block()
+        if self.curr().type == 'EOF':
+            # Function file without 'end's: each function ends at the next
+            # 'function' line, which was parsed into this body as nested
+            for i, stmt in enumerate(body):
+                if isinstance(stmt, FunctionDef):
+                    self._siblings[:0] = body[i:]
+                    body = body[:i]
+                    break
+            return FunctionDef(name, args, outputs, body)
         self.consume('KEYWORD','end')
         return FunctionDef(name, args, outputs, body)
 
@@ -155,7 +245,7 @@ class Parser:
             if self.curr().type in ('NEWLINE',';'):
                 self.consume()
                 continue
-            body.append(self.statement())
+            self._statement_into(body)
         return body
 
     # ---------------- Control Flow ----------------
@@ -235,6 +325,27 @@ class Parser:
         self.consume('KEYWORD','end')
         return ForLoop(var, rng, body)
 
+    def parse_parfor(self) -> ParforLoop:
+        # parfor i = 1:N  |  parfor (i = 1:N, M)
+        self.consume('KEYWORD','parfor')
+        workers = None
+        if self.curr().value == '(':
+            self.consume('(')
+            var = self.consume('ID').value
+            self.consume(value='=')
+            rng = self.expression()
+            if self.curr().value == ',':
+                self.consume(',')
+                workers = self.expression()
+            self.consume(')')
+        else:
+            var = self.consume('ID').value
+            self.consume(value='=')
+            rng = self.expression()
+        body = self.parse_block()
+        self.consume('KEYWORD','end')
+        return ParforLoop(var, rng, body, workers)
+
     def parse_while(self) -> WhileLoop:
         self.consume('KEYWORD','while')
         cond = self.expression()
@@ -325,10 +436,10 @@ class Parser:
         if t.value == '-': self.consume(); return UnaryOp('-', self.atom())
         if t.value == '~': self.consume(); return UnaryOp('~', self.atom())
 
-        # [FIX] Handle 'end' as a String node instead of a Variable
+        # 'end' inside a subscript (resolved against the indexed value)
         if t.type == 'KEYWORD' and t.value == 'end':
             self.consume()
-            return String('end')
+            return End()
 
         # 2. Base Nodes
         node = None
@@ -1,10 +1,11 @@
 # mathex/language/tokenizer.py
 
+import re
 from dataclasses import dataclass
-from typing import List
+from typing import Iterator, List
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     type: str
     value: str
@@ -13,36 +14,52 @@ class Token:
 
 # MATLAB keywords (lowercase compare)
 KEYWORDS = {
-    'if', 'elseif', 'else', 'end', 'for', 'while', 'break', 'continue',
+    'if', 'elseif', 'else', 'end', 'for', 'parfor', 'while', 'break', 'continue',
     'global', 'switch', 'case', 'otherwise', 'try', 'catch',
     'function', 'return',
     'classdef', 'properties', 'methods', 'events'
 }
 
+# Runs matched in one step instead of character by character
+_WORD = re.compile(r'\w+')
+_BLANKS = re.compile(r'[^\S\n]+')
+
 
 class Tokenizer:
     """
     MATLAB-style lexical scanner.
     """
-    def __init__(self, text: str):
+    def __init__(self, text: str, recover: bool = False):
         self.text = text
         self.pos = 0
         self.line = 1
+        # recover=True skips unexpected characters, noting (line, message) in errors
+        self.recover = recover
+        self.errors = []
 
     def tokenize(self) -> List[Token]:
-        tokens: List[Token] = []
+        return list(self.iter_tokens())
+
+    def iter_tokens(self) -> Iterator[Token]:
+        """Yields the tokens one at a time, ending with EOF (the Parser reads them lazily)."""
+        text = self.text
+        n = len(text)
+        prev = None     # last token, for transpose vs string
         # [FIX] Track if we just skipped space to distinguish '1 -5' from '1-5'
         space_skipped = True 
 
-        while self.pos < len(self.text):
-            ch = self.text[self.pos]
+        while self.pos < n:
+            ch = text[self.pos]
 
             # whitespace / newline
             if ch.isspace():
                 if ch == '\n':
-                    tokens.append(Token('NEWLINE', '\n', self.line))
+                    prev = Token('NEWLINE', '\n', self.line)
+                    yield prev
                     self.line += 1
-                self.pos += 1
+                    self.pos += 1
+                else:
+                    self.pos = _BLANKS.match(text, self.pos).end()
                 space_skipped = True
                 continue
 
@@ -70,7 +87,8 @@ class Tokenizer:
                 
                 if is_digit or is_float:
                     # It's a signed number!
-                    tokens.append(self._read_number())
+                    prev = self._read_number()
+                    yield prev
                     space_skipped = False
                     continue
 
@@ -79,13 +97,15 @@ class Tokenizer:
                 tok = self._read_identifier()
                 if tok.value.lower() in KEYWORDS:
                     tok.type = 'KEYWORD'
-                tokens.append(tok)
+                prev = tok
+                yield tok
                 space_skipped = False
                 continue
 
             # numbers, decimals, sci, 3i
             if ch.isdigit() or (ch == '.' and self._peek().isdigit()):
-                tokens.append(self._read_number())
+                prev = self._read_number()
+                yield prev
                 space_skipped = False
                 continue
 
@@ -95,44 +115,51 @@ class Tokenizer:
             if ch == "'":
                 is_transpose = False
                 # [FIX] Transpose requires ADJACENCY. If space was skipped, it's a string.
-                if tokens and not space_skipped:
-                    prev = tokens[-1]
+                if prev is not None and not space_skipped:
                     # Transpose valid after: ID, Number, ), ], }, '
                     if prev.type in ('ID', 'NUMBER') or prev.value in (')', ']', '}', "'"):
                         is_transpose = True
                 
                 if is_transpose:
-                    tokens.append(Token('OP', "'", self.line))
+                    prev = Token('OP', "'", self.line)
+                    yield prev
                     self.pos += 1
                 else:
-                    tokens.append(self._read_string())
+                    prev = self._read_string()
+                    yield prev
                 space_skipped = False
                 continue
 
             # anonymous function @
             if ch == '@':
-                tokens.append(Token('AT', '@', self.line))
+                prev = Token('AT', '@', self.line)
+                yield prev
                 self.pos += 1
                 space_skipped = False
                 continue
 
             # cell { } handled literally
             if ch in "{}":
-                tokens.append(Token(ch, ch, self.line))
+                prev = Token(ch, ch, self.line)
+                yield prev
                 self.pos += 1
                 space_skipped = False
                 continue
 
             # operators / punctuation / symbols
             if ch in "+-*/^=<>:;(),[]\\.~&|":
-                tokens.append(self._read_operator())
+                prev = self._read_operator()
+                yield prev
                 space_skipped = False
                 continue
 
+            if self.recover:
+                self.errors.append((self.line, f"Unexpected character '{ch}'"))
+                self.pos += 1
+                continue
             raise SyntaxError(f"Unexpected character '{ch}' at line {self.line}")
 
-        tokens.append(Token('EOF', '', self.line))
-        return tokens
+        yield Token('EOF', '', self.line)
 
     # ---------------------------------------------------
     # Helpers
@@ -152,10 +179,7 @@ class Tokenizer:
 
     def _read_identifier(self) -> Token:
         start = self.pos
-        while self.pos < len(self.text) and (
-            self.text[self.pos].isalnum() or self.text[self.pos] == '_'
-        ):
-            self.pos += 1
+        self.pos = _WORD.match(self.text, start).end()
         return Token('ID', self.text[start:self.pos], self.line)
 
     def _read_number(self) -> Token:
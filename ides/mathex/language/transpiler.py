@@ -2,11 +2,16 @@ from .tokenizer import Tokenizer
 from .parser import Parser
 from .ast_nodes import (
     Program, Assign, BinOp, UnaryOp, Number, Variable, Call,
-    Matrix, CellArray, Range, Command, String, Index, Member,
-    IfBlock, ForLoop, WhileLoop, Break, Continue, GlobalDecl,
+    Matrix, CellArray, Range, Command, String, End, Index, Member,
+    IfBlock, ForLoop, ParforLoop, WhileLoop, Break, Continue, GlobalDecl,
     FunctionDef, Return, AnonymousFunc, MultiAssign, TryBlock, SwitchBlock,
     ClassDef
 )
+from .parfor import _children, classify_parfor
+from .inference import ANY, infer_types
+from .optimize import _assigned, _is_opaque, _scope_walk, optimize as optimize_tree
+from .vectorize import vectorize_loop
+from .jit import register_anonymous
 
 # List of commands that should be auto-called if found as bare variables
 AUTO_CALL_COMMANDS = {
@@ -15,16 +20,60 @@ AUTO_CALL_COMMANDS = {
     'axis', 'shading', 'lighting', 'view', 'figure', 'shg'
 }
 
+# Builtins returning all their outputs unless told otherwise (their Python
+# callers expect the tuple): a call used as one value passes nargout=1
+NARGOUT_BUILTINS = {'eig', 'eigs', 'svd', 'qr', 'lu', 'histcounts'}
+
+def _uses(stmts, name):
+    """True if a function body may read `name` (nargin / nargout; nested functions have their own)."""
+    if _is_opaque(stmts):
+        return True     # eval('nargin'), or a nested function
+    stack = list(stmts)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (Variable, Command)) and node.name == name:
+            return True
+        stack.extend(_children(node))
+    return False
+
+
 class ASTCompiler:
-    def __init__(self):
+    def __init__(self, facts=None, vectorize=False, index_plans=False):
         self.indent_level = 0
         # Maps generated Python line number -> Original MATLAB line number
         self.line_map = {} 
         self.current_py_line = 1
+        # Sliced output variables of the parfor body being compiled
+        self.parfor_sliced = ()
+        # id(node) -> TypeInfo from the inference pass (empty: every value is opaque)
+        self.facts = facts if facts is not None else {}
+        # Rewrite elementwise for loops into array code (see vectorize.py)
+        self.vectorize = vectorize
+        self.vectorized_loops = 0
+        # Subscripts inside loops go through cached IndexPlan objects
+        self.index_plans = index_plans
+        self.pending_plans = []
+        self.plan_count = 0
+        self.loop_depth = 0
+        # Functions and classes being generated (0: script code, whose
+        # variables are the workspace)
+        self.function_depth = 0
+        # (target code, target is an array, k, n) of the subscripts being generated
+        self._ends = []
+        # Variables of the functions enclosing the nested function being generated
+        self._enclosing = []
+        # Return expression of each function being generated
+        self._returns = []
 
     def indent(self):
         return "    " * self.indent_level
 
+    def _fact(self, node):
+        return self.facts.get(id(node), ANY)
+
+    def _scalar_args(self, args):
+        return len(args) in (1, 2) and all(self._fact(a).is_scalar for a in args)
+
     def _append_stmt(self, lines, stmt):
         """Helper to append a statement with correct indentation handling."""
         generated = self.generate(stmt)
@@ -48,6 +97,88 @@ class ASTCompiler:
             # Increment Python line counter
             self.current_py_line += 1
 
+    def _loop(self, node):
+        """A for / while loop; index plans used inside are created before the outermost loop."""
+        self.loop_depth += 1
+        try:
+            code = self._for_loop(node) if isinstance(node, ForLoop) else self._while_loop(node)
+        finally:
+            self.loop_depth -= 1
+        if self.loop_depth:
+            return code
+        if not self.function_depth:
+            # Counters and accumulators may be plain Python numbers: the
+            # workspace gets them back as MatlabArray
+            names = tuple(sorted(n for n in _assigned([node]) if not n.startswith("_")))
+            code += f"\n{self.indent()}_box_scalars(globals(), {names!r})"
+        if not self.pending_plans:
+            return code
+        plans = [f"{self.indent()}{name} = _IndexPlan()" for name in self.pending_plans]
+        self.pending_plans = []
+        return "\n".join(plans + [code])
+
+    def _for_loop(self, node):
+        if self.vectorize and self._fact(node).is_scalar:
+            code = vectorize_loop(self, node, f"_vec{self.vectorized_loops}")
+            if code is not None:
+                self.vectorized_loops += 1
+                return code
+        if self._fact(node).is_scalar:
+            # Range loop: the counter is a plain Python number
+            rng = node.iterable
+            step = self.generate(rng.step) if rng.step else "1"
+            iterable = f"_for_range({self.generate(rng.start)}, {self.generate(rng.end)}, {step})"
+        else:
+            iterable = self.generate(node.iterable)
+        header = f"{self.indent()}for {node.var} in {iterable}:"
+        self.indent_level += 1
+        body = []
+        for stmt in node.body:
+            self._append_stmt(body, stmt)
+        self.indent_level -= 1
+        return header + "\n" + "\n".join(body)
+
+    def _while_loop(self, node):
+        header = f"{self.indent()}while {self.generate(node.condition)}:"
+        self.indent_level += 1
+        body = []
+        for stmt in node.body:
+            self._append_stmt(body, stmt)
+        self.indent_level -= 1
+        return header + "\n" + "\n".join(body)
+
+    def _call_nargout(self, node, nargout):
+        """
+        _nargout(n, f, args...) for a call f(args) with n outputs (None when
+        `node` is not a call of a name, or indexes a known variable).
+        """
+        if not (isinstance(node, Call) and isinstance(node.func, Variable)):
+            return None
+        fact = self._fact(node.func)
+        if fact.is_array or fact.is_scalar:
+            return None
+        args = self._subscripts(node.func.name, False, node.args)
+        return f"_nargout({nargout}, {node.func.name}{', ' if args else ''}{args})"
+
+    def _subscripts(self, target, is_array, args, spans=False):
+        """
+        Generated subscripts of target(args). `end` in the k-th of n
+        subscripts is that dimension's extent, read from the target here.
+        spans=True passes ranges as (start, stop, step) for an IndexPlan.
+        """
+        out = []
+        for k, arg in enumerate(args):
+            self._ends.append((target, is_array, k, len(args)))
+            try:
+                if spans and isinstance(arg, Range):
+                    step = self.generate(arg.step) if arg.step else "1"
+                    out.append(f"({self.generate(arg.start)}, {self.generate(arg.end)}, {step})")
+                else:
+                    out.append(self.generate(arg))
+            finally:
+                self._ends.pop()
+        return ", ".join(out)
+
     # --------------------------------------------------
     def generate(self, node):
         # ---------------- Program ----------------
@@ -62,6 +193,7 @@ class ASTCompiler:
             lines = [f"{self.indent()}class {node.name}:"]
             self.current_py_line += 1 # Account for class def line
             self.indent_level += 1
+            self.function_depth += 1
 
             # 1. Identify Constructor (Method name == Class name)
             ctor = None
@@ -141,36 +273,86 @@ class ASTCompiler:
                 self.indent_level -= 1
 
             self.indent_level -= 1 # Exit class
+            self.function_depth -= 1
             return "\n".join(lines)
 
         # ---------------- FunctionDef ----------------
         if isinstance(node, FunctionDef):
-            header = f"def {node.name}(*args):"
+            # Plain positional parameters: a missing argument is None
+            params = list(node.args)
+            if "varargin" in params:
+                params = params[:params.index("varargin")]
+                signature = [f"{p}=None" for p in params] + ["*varargin"]
+            else:
+                signature = [f"{p}=None" for p in params]
+            # nargout: the number of outputs the caller assigns (see _nargout)
+            if len(node.outputs) > 1 or _uses(node.body, "nargout"):
+                signature.append("nargout=1" if len(params) < len(node.args) else "*, nargout=1")
+            header = f"def {node.name}({', '.join(signature)}):"
             self.indent_level += 1
             body_lines = []
-            
-            # 1. Calculate nargin
-            body_lines.append(self.indent() + "nargin = len(args)")
-
-            # 2. Unpack arguments manually
-            for i, arg_name in enumerate(node.args):
-                if arg_name == "varargin":
-                    # varargin captures remaining args into a cell array
-                    body_lines.append(self.indent() + f"varargin = cell(list(args[{i}:]))")
-                    break
-                else:
-                    # Support optional args by checking nargin
-                    body_lines.append(self.indent() + f"{arg_name} = args[{i}] if nargin > {i} else None")
-
-            # 3. Generate Body
+            assigned = _assigned(node.body)
+
+            # 0. A nested function shares the variables of the functions around it
+            if self._enclosing:
+                own = set(node.args) | set(node.outputs)
+                own |= {name for s in node.body if isinstance(s, GlobalDecl) for name in s.names}
+                shared = (assigned - own) & set().union(*self._enclosing)
+                if shared:
+                    body_lines.append(self.indent() + f"nonlocal {', '.join(sorted(shared))}")
+
+            # 1. nargin, only if the body reads it: the last argument passed
+            if _uses(node.body, "nargin"):
+                count = " else ".join(f"{i + 1} if {p} is not None" for i, p in reversed(list(enumerate(params))))
+                count = f"{count} else 0" if count else "0"
+                if len(params) < len(node.args):
+                    count = f"{len(params)} + len(varargin) if varargin else {count}"
+                body_lines.append(self.indent() + f"nargin = {count}")
+
+            # 2. varargin captures the remaining args into a cell array
+            if len(params) < len(node.args):
+                body_lines.append(self.indent() + "varargin = cell(list(varargin))")
+
+            # 3. Nested functions first: they can be called from anywhere in the body
+            nested = [s for s in node.body if isinstance(s, FunctionDef)]
+            if nested:
+                written = set().union(*(_assigned(f.body) for f in nested))
+                for name in node.outputs:
+                    if name in written and name not in assigned and name not in node.args:
+                        # (an output set by a nested function only)
+                        body_lines.append(self.indent() + f"{name} = None")
+                self._enclosing.append(assigned | set(node.args) | set(node.outputs))
+                for stmt in nested:
+                    self._append_stmt(body_lines, stmt)
+                self._enclosing.pop()
+
+            # 4. Generate Body
+            # Only the outputs the caller asked for are returned (and must be set);
+            # values computed in loops may be plain Python numbers, and so
+            # may anything derived from them after the loop
+            looped = any(isinstance(n, (ForLoop, WhileLoop)) for n in _scope_walk(node.body))
+            outs = [f"_box({o})" if looped else o for o in node.outputs]
+            ret = ", ".join(outs)
+            if len(outs) > 1:
+                # a if nargout < 2 else (a, b) if nargout < 3 else (a, b, c)
+                options = [outs[0]] + [f"({', '.join(outs[:n])})" for n in range(2, len(outs) + 1)]
+                ret = " else ".join(f"{o} if nargout < {n + 2}" for n, o in enumerate(options[:-1]))
+                ret += f" else {options[-1]}"
+            self._returns.append(ret)
+            self.function_depth += 1
             for stmt in node.body:
-                self._append_stmt(body_lines, stmt)
+                if not isinstance(stmt, FunctionDef):
+                    self._append_stmt(body_lines, stmt)
+            self.function_depth -= 1
+            self._returns.pop()
             
             # GENERATE RETURN INSIDE FUNCTION SCOPE
             if node.outputs:
-                ret = ", ".join(node.outputs)
                 body_lines.append(self.indent() + f"return {ret}")
 
+            if not body_lines:
+                body_lines.append(self.indent() + "pass")
+
             self.indent_level -= 1 # Exit function
 
             return header + "\n" + "\n".join(body_lines)
@@ -178,7 +360,7 @@ class ASTCompiler:
         # ---------------- MultiAssign ----------------
         if isinstance(node, MultiAssign):
             lhs = ", ".join(node.targets)
-            rhs = self.generate(node.value)
+            rhs = self._call_nargout(node.value, len(node.targets)) or self.generate(node.value)
             return f"{self.indent()}{lhs} = {rhs}"
 
         # ---------------- Assign ----------------
@@ -196,10 +378,26 @@ class ASTCompiler:
                  else:
                      func_str = self.generate(func_node)
                      
-                 args = ", ".join(self.generate(a) for a in node.target.args)
+                 # Inferred array: it exists, and scalar subscripts write in place
+                 target_fact = self._fact(func_node)
+                 args = self._subscripts(func_str, target_fact.is_array, node.target.args)
                  
                  # Use raw value for set_val
                  val_raw = self.generate(node.value) 
+
+                 # parfor sliced output: recorded and written back by the client
+                 if isinstance(func_node, Variable) and func_str in self.parfor_sliced:
+                     return f"{self.indent()}_parfor_out({func_str!r}, {val_raw}, {args})"
+
+                 if isinstance(func_node, Variable) and target_fact.is_array:
+                     if self._scalar_args(node.target.args):
+                         return f"{self.indent()}{func_str}.set_elem({val_raw}, {args})"
+                     return f"{self.indent()}{func_str}.set_val({val_raw}, {args})"
+                 if isinstance(func_node, Variable) and target_fact.is_scalar:
+                     return (
+                         f"{self.indent()}{func_str} = mat({func_str})\n"
+                         f"{self.indent()}{func_str}.set_val({val_raw}, {args})"
+                     )
                  
                  assign_stmt = f"{func_str}.set_val({val_raw}, {args})"
 
@@ -235,13 +433,30 @@ class ASTCompiler:
         # ---------------- Return ----------------
         if isinstance(node, Return):
             if node.value is None:
-                return self.indent() + "return"
+                # (from a function: its outputs)
+                ret = self._returns[-1] if self._returns else ""
+                return self.indent() + f"return {ret}".rstrip()
             return self.indent() + f"return {self.generate(node.value)}"
 
         # ---------------- Binary Operators ----------------
         if isinstance(node, BinOp):
             l = self.generate(node.left)
             r = self.generate(node.right)
+
+            # Inferred scalars: plain Python arithmetic (MATLAB division by zero kept)
+            lf, rf = self._fact(node.left), self._fact(node.right)
+            if lf.is_scalar and rf.is_scalar:
+                if node.op in ('*', '.*'): return f"({l} * {r})"
+                if node.op in ('/', './'): return f"_sdiv({l}, {r})"
+                if node.op == '\\': return f"_sdiv({r}, {l})"
+                if node.op in ('^', '.^'): return f"_spow({l}, {r})"
+                if node.op in ('&', '|'): return f"(bool({l}) {node.op} bool({r}))"
+            elif (lf.is_scalar and rf.is_array) or (lf.is_array and rf.is_scalar):
+                # Scalar and array: elementwise is what MatlabArray's * and / do
+                if node.op == '.*': return f"({l} * {r})"
+                if node.op == './' and rf.is_scalar: return f"({l} / {r})"
+                if node.op == './': return f"mat({l}).ediv({r})"
+                if node.op == '.^' and lf.is_scalar: return f"mat({l}).epow({r})"
             
             if node.op == '&&': return f"({l} and {r})"
             if node.op == '||': return f"({l} or {r})"
@@ -258,6 +473,7 @@ class ASTCompiler:
         # ---------------- Unary Operators ----------------
         if isinstance(node, UnaryOp):
             val = self.generate(node.operand)
+            if node.op == '~' and self._fact(node.operand).is_scalar: return f"(not {val})"
             if node.op == '~': return f"(~{val})"
             return f"({node.op}{val})"
 
@@ -348,25 +564,42 @@ class ASTCompiler:
                 
             return "\n".join(lines)
 
-        # ---------------- ForLoop ----------------
-        if isinstance(node, ForLoop):
-            header = f"{self.indent()}for {node.var} in {self.generate(node.iterable)}:"
-            self.indent_level += 1
+        # ---------------- ForLoop / WhileLoop ----------------
+        if isinstance(node, (ForLoop, WhileLoop)):
+            return self._loop(node)
+
+        # ---------------- ParforLoop ----------------
+        if isinstance(node, ParforLoop):
+            plan = classify_parfor(node)
+
+            # The body becomes a chunk function run by the workers:
+            #   def _parfor_chunk(_parfor_values):
+            #       global <reductions>
+            #       for i in _parfor_values: <body>
+            body_compiler = ASTCompiler()
+            body_compiler.indent_level = 2
+            body_compiler.parfor_sliced = tuple(plan.sliced)
             body = []
             for stmt in node.body:
-                self._append_stmt(body, stmt)
-            self.indent_level -= 1
-            return header + "\n" + "\n".join(body)
-
-        # ---------------- WhileLoop ----------------
-        if isinstance(node, WhileLoop):
-            header = f"{self.indent()}while {self.generate(node.condition)}:"
-            self.indent_level += 1
-            body = []
-            for stmt in node.body:
-                self._append_stmt(body, stmt)
-            self.indent_level -= 1
-            return header + "\n" + "\n".join(body)
+                body_compiler._append_stmt(body, stmt)
+
+            chunk = ["def _parfor_chunk(_parfor_values):"]
+            if plan.reductions:
+                chunk.append(f"    global {', '.join(plan.reductions)}")
+            chunk.append(f"    for {node.var} in _parfor_values:")
+            chunk.extend(body or ["        pass"])
+            chunk_src = "\n".join(chunk)
+
+            workers = self.generate(node.max_workers) if node.max_workers is not None else "None"
+            lines = [
+                f"{self.indent()}_parfor_result = _parfor_run(globals(), locals(), "
+                f"{self.generate(node.iterable)}, {chunk_src!r}, {node.var!r}, "
+                f"{tuple(plan.broadcast)!r}, {tuple(plan.reductions.items())!r}, "
+                f"{tuple(plan.sliced)!r}, {workers})"
+            ]
+            for name in list(plan.reductions) + plan.sliced:
+                lines.append(f"{self.indent()}{name} = _parfor_result[{name!r}]")
+            return "\n".join(lines)
 
         # ---------------- Break / Continue ----------------
         if isinstance(node, Break): return self.indent() + "break"
@@ -397,12 +630,33 @@ class ASTCompiler:
             else:
                 func_str = self.generate(node.func)
             
-            args = ", ".join(self.generate(a) for a in node.args)
+            # Indexing an inferred array / scalar variable. Elements come back
+            # as plain Python numbers, so only inside loops (whose workspace
+            # variables are boxed again at the exit, see _loop)
+            func_fact = self._fact(node.func)
+            if func_fact.is_array and self.loop_depth and self._scalar_args(node.args):
+                return f"{func_str}.get_elem({self._subscripts(func_str, True, node.args)})"
+            if func_fact.is_array and self.index_plans and self.loop_depth and node.args:
+                # Subscripts converted once per loop, not per iteration
+                plan = f"_ix{self.plan_count}"
+                self.plan_count += 1
+                self.pending_plans.append(plan)
+                return f"{plan}.get({func_str}, {self._subscripts(func_str, True, node.args, spans=True)})"
+            if func_str in NARGOUT_BUILTINS and isinstance(node.func, Variable):
+                call = self._call_nargout(node, 1)
+                if call:
+                    return call
+            args = self._subscripts(func_str, func_fact.is_array, node.args)
+            if func_fact.is_scalar:
+                return f"mat({func_str})({args})"
             return f"{func_str}({args})"
 
         # ---------------- Member ----------------
         if isinstance(node, Member):
             target = self.generate(node.target)
+            # Transpose of a real scalar is the scalar itself
+            if node.field in ('H', 'T') and self._fact(node.target).is_scalar and self._fact(node.target).is_real:
+                return target
             return f"{target}.{node.field}"
 
         # ---------------- Index (Universal Call Fix) ----------------
@@ -411,19 +665,16 @@ class ASTCompiler:
             # NEW: Generate standard call syntax A(1:10).
             # The runtime MatlabArray.__call__ logic will distinguish index vs function call.
             target = self.generate(node.target)
-            
-            args = []
-            for a in node.args:
-                args.append(self.generate(a))
-            
-            arg_str = ", ".join(args)
+            arg_str = self._subscripts(target, self._fact(node.target).is_array, node.args)
             return f"{target}({arg_str})"
 
         # ---------------- Anonymous Function ----------------
         if isinstance(node, AnonymousFunc):
             args = ", ".join(node.args)
             body = self.generate(node.body)
-            return f"(lambda {args}: {body})"
+            # Tagged with its MATLAB AST, for solvers that compile it (jit.lower_anonymous)
+            lam = f"(lambda {args}: {body})"
+            return f"_anonymous({lam}, {register_anonymous(node, lam)!r})"
 
         # ---------------- Matrix / Cell ----------------
         if isinstance(node, Matrix):
@@ -436,6 +687,14 @@ class ASTCompiler:
 
         # ---------------- Terminals ----------------
         if isinstance(node, Number): return node.value
+
+        if isinstance(node, End):
+            if not self._ends:
+                return "'end'"
+            target, is_array, k, n = self._ends[-1]
+            if is_array and n <= 2:
+                return f"{target}.size" if n == 1 else f"{target}.shape[{k}]"
+            return f"_end({target}, {k}, {n})"
         
         if isinstance(node, String):
             if node.value == ':':
@@ -450,17 +709,26 @@ class ASTCompiler:
         return ""
 
 
-def transpile(code: str):
+def transpile(code: str, infer: bool = True, optimize: bool = True, vectorize: bool = True,
+              index_plans: bool = True, workspace=()):
     """
     Returns: (python_code, line_map)
+    infer=False skips type inference (every value handled as an opaque object).
+    optimize=False skips constant folding and loop-invariant hoisting.
+    workspace: names of the variables bound before the code runs (any
+    container supporting `in`); the optimizer never takes them for builtins.
+    vectorize=False keeps elementwise for loops as scalar loops (needs infer).
+    index_plans=False indexes arrays in loops through A(...) (needs infer).
     """
     if not code.strip():
         return "", {}
     try:
-        tokens = Tokenizer(code).tokenize()
-        tree = Parser(tokens).parse()
+        tree = Parser(Tokenizer(code).iter_tokens()).parse()
+        if optimize:
+            optimize_tree(tree, workspace=workspace)
         
-        compiler = ASTCompiler()
+        compiler = ASTCompiler(infer_types(tree) if infer else None, vectorize=vectorize,
+                               index_plans=index_plans)
         
         # Manually drive the top-level generation to capture lines
         if isinstance(tree, Program):
@@ -0,0 +1,235 @@
+"""
+mathex.language.vectorize
+
+Rewrites simple elementwise for loops into whole-array NumPy code.
+
+A range loop qualifies when every statement of its body is one of
+
+    y(k) = expr          (elementwise map; one element per iteration)
+    s = s + expr         (reduction; also s - expr, expr + s, s * expr)
+
+where `expr` is built from numbers, the counter k, loop-invariant
+variables, reads x(..) whose subscripts are scalar per iteration, the
+elementwise builtins (sin, sqrt, mod...) and the scalar operators.
+There must be no dependence between iterations: an array written by the
+loop is only read back as y(k), a reduction variable only appears in its
+own update, and nothing else is assigned.
+
+The generated code evaluates every right-hand side for all counter values
+first, with runtime checks (invariant operands are numeric scalars,
+subscripts are in-bounds integers, written arrays are dense and already
+large enough). Only then are the results written. When a check fails
+nothing has been modified yet, and the original scalar loop runs instead,
+so errors and array growth behave exactly as written.
+
+Reductions add the values pairwise (np.sum), so a vectorized sum can
+differ from the loop's running sum in the last bits.
+"""
+
+from .ast_nodes import BinOp, Call, End, Number, Range, UnaryOp, Variable, Assign, ForLoop
+
+# Elementwise builtins (checked against the real functions at runtime)
+ELEMENTWISE_BUILTINS = {
+    "sin", "cos", "tan", "asin", "acos", "atan", "atan2",
+    "sinh", "cosh", "tanh", "exp", "log", "log10", "sqrt",
+    "abs", "sign", "floor", "ceil", "fix", "mod", "rem",
+    "real", "imag", "conj",
+}
+
+REDUCTION_OPS = ("+", "-", "*", ".*")
+
+
+class NotVectorizable(Exception):
+    """Raised by the analysis for loops that keep their scalar form."""
+
+
+class LoopVectorizer:
+    """
+    Vectorized code for one for loop. `compiler` (an ASTCompiler) provides
+    the indentation, temporary names and the scalar fallback loop.
+    """
+
+    def __init__(self, compiler, loop, prefix):
+        self.compiler = compiler
+        self.loop = loop
+        self.prefix = prefix
+        self.counter = f"{prefix}_k"
+        self.pending = {}       # array name -> temp holding its new elements
+        self.lines = []         # compute phase (inside try)
+        self.writes = []        # write phase
+        self.ends = []          # (array, k, n) of the subscripts being generated
+
+    def generate(self):
+        """Returns the Python source for the loop, or None if it must stay scalar."""
+        loop = self.loop
+        if not isinstance(loop.iterable, Range) or not loop.body:
+            return None
+        try:
+            self._analyze()
+        except NotVectorizable:
+            return None
+
+        c = self.compiler
+        rng = loop.iterable
+        step = c.generate(rng.step) if rng.step else "1"
+        values = f"{self.prefix}_r"
+        ok = f"{self.prefix}_ok"
+        ind = c.indent()
+        inner = ind + "    "
+
+        out = [f"{ind}{values} = _for_range({c.generate(rng.start)}, {c.generate(rng.end)}, {step})"]
+        out.append(f"{ind}try:")
+        out.append(f"{inner}{self.counter} = _vrange({values})")
+        out.extend(inner + line for line in self.lines)
+        out.append(f"{inner}{ok} = True")
+        out.append(f"{ind}except Exception:")
+        out.append(f"{inner}{ok} = False")
+        out.append(f"{ind}if {ok}:")
+        out.extend(inner + line for line in self.writes)
+        out.append(f"{inner}{loop.var} = {values}[-1]")
+        out.append(f"{ind}else:")
+
+        # Scalar fallback: the loop as written, over the same counter values
+        c.indent_level += 1
+        out.append(f"{c.indent()}for {loop.var} in {values}:")
+        c.indent_level += 1
+        body = []
+        for stmt in loop.body:
+            c._append_stmt(body, stmt)
+        c.indent_level -= 2
+        out.extend(body)
+        return "\n".join(out)
+
+    # ---------------------------------------------------------
+    # Analysis
+    # ---------------------------------------------------------
+    def _analyze(self):
+        var = self.loop.var
+        arrays, reductions = set(), set()
+        for stmt in self.loop.body:
+            if not isinstance(stmt, Assign):
+                raise NotVectorizable
+            if isinstance(stmt.target, Call):
+                name = self._write_target(stmt.target)
+                arrays.add(name)
+            elif isinstance(stmt.target, str) and stmt.target not in reductions:
+                reductions.add(stmt.target)
+            else:
+                raise NotVectorizable
+        if var in arrays | reductions or arrays & reductions:
+            raise NotVectorizable
+        if arrays & set(self.compiler.parfor_sliced):
+            raise NotVectorizable
+        self.arrays, self.reductions = arrays, reductions
+
+        n = 0
+        for stmt in self.loop.body:
+            if isinstance(stmt.target, Call):
+                name = stmt.target.func.name
+                temp = f"{self.prefix}_{n}"
+                self.lines.append(f"{temp} = {self._expr(stmt.value)}")
+                self.pending[name] = temp
+            else:
+                name, op, expr = self._reduction(stmt)
+                temp = f"{self.prefix}_{n}"
+                total = f"_vreduce({self._expr(expr)}, {self.counter}.size, {'*' if op == '*' else '+'!r})"
+                # The new value is computed here so a failing `s + ...` falls back too
+                self.lines.append(f"{temp} = {name} {op} {total}")
+                self.writes.append(f"{name} = {temp}")
+            n += 1
+        for name, temp in self.pending.items():
+            self.lines.append(f"_vtarget({name}, {self.counter})")
+            self.writes.append(f"{name}.set_val({temp}, {self.counter})")
+
+    def _write_target(self, target):
+        func, args = target.func, target.args
+        if not isinstance(func, Variable) or len(args) != 1:
+            raise NotVectorizable
+        if not (isinstance(args[0], Variable) and args[0].name == self.loop.var):
+            raise NotVectorizable
+        return func.name
+
+    def _reduction(self, stmt):
+        name, value = stmt.target, stmt.value
+        if not isinstance(value, BinOp) or value.op not in REDUCTION_OPS:
+            raise NotVectorizable
+        op = "*" if value.op == ".*" else value.op
+        if _is_var(value.left, name):
+            expr = value.right
+        elif _is_var(value.right, name) and op != "-":
+            expr = value.left
+        else:
+            raise NotVectorizable
+        return name, op, expr
+
+    # ---------------------------------------------------------
+    # Expressions (one value per iteration)
+    # ---------------------------------------------------------
+    def _expr(self, node):
+        if isinstance(node, Number):
+            try:
+                float(node.value)
+            except ValueError:
+                raise NotVectorizable   # imaginary literals
+            return node.value
+        if isinstance(node, Variable):
+            self._check_read(node.name)
+            if node.name == self.loop.var:
+                return self.counter
+            return f"_vscalar({node.name})"
+        if isinstance(node, UnaryOp) and node.op in ("-", "+"):
+            return f"({node.op}{self._expr(node.operand)})"
+        if isinstance(node, BinOp):
+            left, right = self._expr(node.left), self._expr(node.right)
+            if node.op in ("+", "-"):
+                return f"({left} {node.op} {right})"
+            if node.op in ("*", ".*"):
+                return f"({left} * {right})"
+            if node.op in ("/", "./"):
+                return f"_vdiv({left}, {right})"
+            if node.op in ("\\", ".\\"):
+                return f"_vdiv({right}, {left})"
+            if node.op in ("^", ".^"):
+                return f"_vpow({left}, {right})"
+            raise NotVectorizable
+        if isinstance(node, Call) and isinstance(node.func, Variable):
+            name = node.func.name
+            if name in self.arrays:
+                # Only the element this iteration writes
+                if len(node.args) == 1 and _is_var(node.args[0], self.loop.var):
+                    return self.pending.get(name) or f"_vget({name}, {self.counter})"
+                raise NotVectorizable
+            self._check_read(name)
+            if not node.args:
+                raise NotVectorizable
+            if name in ELEMENTWISE_BUILTINS:
+                # _vcall rejects anything but the builtin (e.g. a variable named sin)
+                return f"_vcall({name}, {', '.join(self._expr(a) for a in node.args)})"
+            if len(node.args) <= 2:
+                args = []
+                for k, arg in enumerate(node.args):
+                    self.ends.append((name, k, len(node.args)))
+                    try:
+                        args.append(self._expr(arg))
+                    finally:
+                        self.ends.pop()
+                return f"_vget({name}, {', '.join(args)})"
+        if isinstance(node, End) and self.ends:
+            name, k, n = self.ends[-1]
+            return f"{name}.size" if n == 1 else f"{name}.shape[{k}]"
+        raise NotVectorizable
+
+    def _check_read(self, name):
+        if name in self.arrays or name in self.reductions:
+            raise NotVectorizable
+
+
+def _is_var(node, name):
+    return isinstance(node, Variable) and node.name == name
+
+
+def vectorize_loop(compiler, loop, prefix):
+    """Vectorized source for `loop` (a ForLoop), or None to keep the scalar loop."""
+    if not isinstance(loop, ForLoop):
+        return None
+    return LoopVectorizer(compiler, loop, prefix).generate()
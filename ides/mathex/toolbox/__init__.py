@@ -1,11 +1,27 @@
-from .ode import ode45, ode23, ode15s, bvp4c
-from .pde import pdepe
+# Toolbox functions are imported on first access (PEP 562): the ODE, PDE
+# (numba), signal and interpolation modules are heavy and most sessions
+# only touch a few of them.
+from shared.symbolic_core.lazy import lazy_exports
+
+_EXPORTS = {}
+
+
+def _export(module, *names):
+    for name in names:
+        _EXPORTS[name] = (module, name)
+
+
+_export(".ode", "ode45", "ode23", "ode15s", "odeset", "bvp4c", "deval", "odeensemble")
+_export(".pde", "pdepe")
 # [Updated] Added fft2, ifft2, filter
-from .signals import (
-    fft, ifft, fftshift, ifftshift, spectrogram, pwelch, findpeaks,
-    fft2, ifft2, filter
+_export(".signals",
+    "fft", "ifft", "fftshift", "ifftshift", "spectrogram", "pwelch", "findpeaks",
+    "fft2", "ifft2", "filter",
 )
-from .interpolation import interp1, interp2, griddata
-from .integration import trapz, cumtrapz, integral
-from .polynomials import roots, polyval
-from .geometry import meshgrid, sphere, cylinder, gradient, cross, dot
\ No newline at end of file
+_export(".interpolation", "interp1", "interp2", "griddata")
+_export(".integration", "trapz", "cumtrapz", "integral")
+_export(".polynomials", "roots", "polyval")
+_export(".geometry", "meshgrid", "sphere", "cylinder", "gradient", "cross", "dot")
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,16 +1,32 @@
+import os
+import warnings
+
 import numpy as np
 import scipy.integrate
-from shared.symbolic_core.arrays import MatlabArray
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
+from shared.symbolic_core.arrays import MatlabArray, _from_data
+from shared.symbolic_core.structs import MatlabStruct
 
 # ==========================================================
 # HELPER: ODE Solution Struct
 # ==========================================================
 class ODESolution:
-    """Emulates a MATLAB struct for ODE results (sol.x, sol.y, sol.te, sol.ye, sol.ie)."""
-    def __init__(self, t, y, te=None, ye=None, ie=None):
-        self.x = MatlabArray(t)   # Independent var (Stored as Row Vector 1xN)
-        self.y = MatlabArray(y)   # Solution (Stored as Vars x N)
+    """
+    Emulates a MATLAB struct for ODE results (sol.x, sol.y, sol.te, sol.ye, sol.ie).
+
+    x and y hold the solver steps only; values in between come from the
+    solver's dense output (`interpolant`), evaluated on demand by deval.
+    When tspan lists more than two points, [t, y] = ode45(...) returns the
+    solution at those points, interpolated when unpacked.
+    """
+    def __init__(self, t, y, te=None, ye=None, ie=None, interpolant=None, tspan=None):
+        self.x = _from_data(t)    # Independent var (Stored as Row Vector 1xN)
+        self.y = _from_data(y)    # Solution (Stored as Vars x N)
         self.t = self.x 
+        self.interpolant = interpolant
+        self.tspan = tspan
         
         # Events support
         self.te = MatlabArray(te) if te is not None else MatlabArray([])
@@ -27,8 +43,15 @@ class ODESolution:
         # [FIX] Yield transposed versions to match MATLAB [t, y] = ode45(...) behavior
         # Struct stores x: (1,N), y: (Vars, N)
         # Unpacking expects t: (N,1), y: (N, Vars)
-        yield self.x.T
-        yield self.y.T
+        if self.tspan is None:
+            yield self.x.T
+            yield self.y.T
+            return
+        # Output points, up to where the integration stopped (terminal events)
+        lo, hi = sorted((self.x._data[0, 0], self.x._data[0, -1]))
+        ts = self.tspan[(self.tspan >= lo) & (self.tspan <= hi)]
+        yield _from_data(ts.reshape(-1, 1))
+        yield deval(self, ts).T
 
     def __getitem__(self, key):
         if isinstance(key, int):
@@ -46,22 +69,448 @@ class ODESolution:
         if key == 'ie': return self.ie
         raise KeyError(f"Field '{key}' not found in solution structure.")
 
-def _wrap_ode_func(fun):
-    """Wraps a Mathex function @(t,y) to work with SciPy."""
+def _option(options, name, default=None):
+    """Field `name` of an options struct (or dict), matched case-insensitively."""
+    if options is None:
+        return default
+    fields = options if isinstance(options, dict) else vars(options)
+    for key, value in fields.items():
+        if key.lower() == name.lower():
+            if value is None or np.size(value) == 0:
+                return default      # [] means unset, as in MATLAB
+            return value
+    return default
+
+def _switch(value):
+    """An 'on'/'off' (or true/false) option."""
+    if isinstance(value, str):
+        return value.lower() == 'on'
+    return bool(np.asarray(value).all())
+
+def _wrap_ode_func(fun, vectorized=False):
+    """
+    Wraps a Mathex function @(t,y) to work with SciPy.
+
+    y is passed as a column (Vars x 1), or with 'Vectorized' as the whole
+    Vars x k batch SciPy evaluates at once (finite-difference Jacobians).
+    It is a read-only view of the solver state, not a copy: assigning into
+    y inside the function copies it first. Functions flagged with
+    accepts_ndarray (compiled %#jit functions) get the raw ndarray.
+    """
+    raw = getattr(fun, 'accepts_ndarray', False)
+
     def wrapper(t, y):
-        y_col = y.reshape(-1, 1) 
-        res = fun(t, MatlabArray(y_col))
-        
+        y_col = y.reshape(y.shape[0], -1)
+        y_col.flags.writeable = False
+        res = fun(t, y_col if raw else _from_data(y_col))
+
         if isinstance(res, MatlabArray):
-            return res._data.flatten()
-            
-        if isinstance(res, (list, tuple)):
-            return np.array([float(x) for x in res])
-            
-        return np.asarray(res).flatten()
+            res = res._data
+        elif isinstance(res, (list, tuple)):
+            if not vectorized:
+                return np.array([float(x) for x in res])
+            res = np.vstack([np.ravel(x) for x in res])
+
+        return np.asarray(res).reshape(y.shape)
+    return wrapper
+
+def _matrix(value):
+    """Raw data of a matrix option (sparse matrices stay sparse)."""
+    data = value._data if isinstance(value, MatlabArray) else value
+    if scipy.sparse.issparse(data):
+        return data
+    return np.atleast_2d(np.asarray(data, dtype=float))
+
+class _MassMatrix:
+    """
+    Constant, nonsingular mass matrix M of M*y' = f(t,y). SciPy has no
+    mass matrices, so the solver integrates y' = M \\ f(t,y) (and uses
+    M \\ J as the Jacobian). A diagonal M scales the rows, which keeps
+    the sparsity of J; any other M is factorized once, and the Jacobian
+    of M \\ f is dense.
+    """
+    def __init__(self, mass):
+        M = _matrix(mass)
+        self.sparse = scipy.sparse.issparse(M)
+        d = M.diagonal()
+        off = M - scipy.sparse.diags(d) if self.sparse else M - np.diag(d)
+        self.diagonal = (off.count_nonzero() if self.sparse else np.count_nonzero(off)) == 0
+
+        if self.diagonal:
+            if not np.all(d):
+                raise ValueError("ode: Mass matrix is singular (DAEs are not supported).")
+            self.inv = 1.0 / d
+        elif self.sparse:
+            try:
+                self.lu = scipy.sparse.linalg.splu(M.tocsc())
+            except RuntimeError:
+                raise ValueError("ode: Mass matrix is singular (DAEs are not supported).")
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', scipy.linalg.LinAlgWarning)
+                self.lu = scipy.linalg.lu_factor(M)
+            if not np.all(np.diag(self.lu[0])):
+                raise ValueError("ode: Mass matrix is singular (DAEs are not supported).")
+
+    def solve(self, x):
+        if self.diagonal:
+            if scipy.sparse.issparse(x):
+                return scipy.sparse.diags(self.inv) @ x
+            return x * self.inv.reshape((-1,) + (1,) * (np.ndim(x) - 1))
+        if scipy.sparse.issparse(x):
+            x = x.toarray()
+        if self.sparse:
+            return self.lu.solve(x)
+        return scipy.linalg.lu_solve(self.lu, x)
+
+def _wrap_jacobian(jac, mass=None):
+    """'Jacobian' option for SciPy: a constant matrix, or a function @(t,y)."""
+    if isinstance(jac, MatlabArray) or not callable(jac):
+        J = _matrix(jac)
+        return mass.solve(J) if mass else J
+    raw = getattr(jac, 'accepts_ndarray', False)
+
+    def wrapper(t, y):
+        y_col = y.reshape(-1, 1)
+        y_col.flags.writeable = False
+        J = _matrix(jac(t, y_col if raw else _from_data(y_col)))
+        return mass.solve(J) if mass else J
     return wrapper
 
-def _solve_ivp_generic(fun, tspan, y0, method, events=None):
+def _solver_options(options, method, fun):
+    """solve_ivp arguments for the odeset-style options."""
+    kwargs = {}
+    for name, key in (('RelTol', 'rtol'), ('MaxStep', 'max_step'), ('InitialStep', 'first_step')):
+        value = _option(options, name)
+        if value is not None:
+            kwargs[key] = float(value)
+    atol = _option(options, 'AbsTol')
+    if atol is not None:
+        atol = _matrix(atol).ravel()    # a scalar, or one tolerance per state
+        kwargs['atol'] = float(atol[0]) if atol.size == 1 else atol
+
+    mass = _option(options, 'Mass')
+    if mass is not None:
+        mass, rhs = _MassMatrix(mass), fun
+
+        def fun(t, y):
+            return mass.solve(rhs(t, y))
+
+    # Only the implicit methods (ode15s) use a Jacobian
+    if method in ('BDF', 'Radau', 'LSODA'):
+        jac = _option(options, 'Jacobian')
+        pattern = _option(options, 'JPattern')
+        if jac is not None:
+            kwargs['jac'] = _wrap_jacobian(jac, mass)
+        elif pattern is not None and (mass is None or mass.diagonal):
+            kwargs['jac_sparsity'] = _matrix(pattern)
+    return fun, kwargs
+
+# ==========================================================
+# COMPILED RK45: anonymous functions lowered to numba
+# ==========================================================
+# Dormand-Prince 5(4) with SciPy's RK45 step size control, initial step
+# and quartic dense output, for a right-hand side rhs(t, y, params) on
+# 1-D states. Every accepted step is recorded with its interpolant.
+_DOPRI5_SOURCE = '''
+C = np.array([0.0, 1/5, 3/10, 4/5, 8/9, 1.0])
+A = np.array([
+    [0.0, 0.0, 0.0, 0.0, 0.0],
+    [1/5, 0.0, 0.0, 0.0, 0.0],
+    [3/40, 9/40, 0.0, 0.0, 0.0],
+    [44/45, -56/15, 32/9, 0.0, 0.0],
+    [19372/6561, -25360/2187, 64448/6561, -212/729, 0.0],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+])
+B = np.array([35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84])
+E = np.array([-71/57600, 0.0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+P = np.array([
+    [1.0, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0.0, 0.0, 0.0, 0.0],
+    [0.0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0.0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0.0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0.0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0.0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+def _state(dy, n):
+    if dy.size != n:
+        raise ValueError("ode45: The function must return a column vector with one element per state.")
+    out = np.empty(n)
+    k = 0
+    for v in dy.flat:
+        out[k] = v
+        k += 1
+    return out
+
+def _scalar_state(dy, n):
+    if n != 1:
+        raise ValueError("ode45: The function must return a column vector with one element per state.")
+    out = np.empty(1)
+    out[0] = dy
+    return out
+
+def _rms(x):
+    acc = 0.0
+    for v in x:
+        acc += v * v
+    return np.sqrt(acc / x.size)
+
+def _dopri5(rhs, t0, t_bound, y0, p, rtol, atol, max_step, first_step):
+    n = y0.size
+    direction = 1.0 if t_bound >= t0 else -1.0
+    ts = np.empty(64)
+    ys = np.empty((64, n))
+    Qs = np.empty((64, 4 * n))
+    ts[0] = t0
+    for i in range(n):
+        ys[0, i] = y0[i]
+    m = 1
+    t = t0
+    y = y0.copy()
+    f = rhs(t, y, p)
+    interval = abs(t_bound - t0)
+    if interval == 0.0:
+        return ts[:1], ys[:1], Qs[:0]
+
+    work = np.empty(n)
+    scale = np.empty(n)
+    if first_step > 0.0:
+        h_abs = first_step
+    else:
+        for i in range(n):
+            scale[i] = atol[i] + abs(y[i]) * rtol
+            work[i] = y[i] / scale[i]
+        d0 = _rms(work)
+        for i in range(n):
+            work[i] = f[i] / scale[i]
+        d1 = _rms(work)
+        h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+        h0 = min(h0, interval)
+        for i in range(n):
+            work[i] = y[i] + h0 * direction * f[i]
+        f1 = rhs(t + h0 * direction, work, p)
+        for i in range(n):
+            work[i] = (f1[i] - f[i]) / scale[i]
+        d2 = _rms(work) / h0
+        if d1 <= 1e-15 and d2 <= 1e-15:
+            h1 = max(1e-6, h0 * 1e-3)
+        else:
+            h1 = (0.01 / max(d1, d2)) ** 0.2
+        h_abs = min(min(100 * h0, h1), min(interval, max_step))
+
+    K = np.empty((7, n))
+    while direction * (t - t_bound) < 0:
+        min_step = 10 * abs(np.nextafter(t, direction * np.inf) - t)
+        if h_abs > max_step:
+            h_abs = max_step
+        elif h_abs < min_step:
+            h_abs = min_step
+
+        rejected = False
+        while True:
+            if not h_abs >= min_step:
+                # Step size underflow (or NaN): stop where the solution got to
+                return ts[:m], ys[:m], Qs[:m - 1]
+            t_new = t + h_abs * direction
+            if direction * (t_new - t_bound) > 0:
+                t_new = t_bound
+            h = t_new - t
+            h_abs = abs(h)
+
+            for i in range(n):
+                K[0, i] = f[i]
+            for s in range(1, 6):
+                for i in range(n):
+                    acc = 0.0
+                    for j in range(s):
+                        acc += A[s, j] * K[j, i]
+                    work[i] = y[i] + h * acc
+                k = rhs(t + C[s] * h, work, p)
+                for i in range(n):
+                    K[s, i] = k[i]
+            y_new = np.empty(n)
+            for i in range(n):
+                acc = 0.0
+                for j in range(6):
+                    acc += B[j] * K[j, i]
+                y_new[i] = y[i] + h * acc
+            f_new = rhs(t_new, y_new, p)
+            for i in range(n):
+                K[6, i] = f_new[i]
+
+            for i in range(n):
+                acc = 0.0
+                for j in range(7):
+                    acc += E[j] * K[j, i]
+                work[i] = acc * h / (atol[i] + max(abs(y[i]), abs(y_new[i])) * rtol)
+            error_norm = _rms(work)
+            if error_norm < 1:
+                factor = 10.0 if error_norm == 0 else min(10.0, 0.9 * error_norm ** -0.2)
+                if rejected:
+                    factor = min(1.0, factor)
+                h_abs *= factor
+                break
+            h_abs *= max(0.2, 0.9 * error_norm ** -0.2)
+            rejected = True
+
+        if m == ts.size:
+            grown = np.empty(2 * m)
+            grown_y = np.empty((2 * m, n))
+            grown_q = np.empty((2 * m, 4 * n))
+            for r in range(m):
+                grown[r] = ts[r]
+                for i in range(n):
+                    grown_y[r, i] = ys[r, i]
+                for i in range(4 * n):
+                    grown_q[r, i] = Qs[r, i]
+            ts, ys, Qs = grown, grown_y, grown_q
+        for i in range(n):
+            for k in range(4):
+                acc = 0.0
+                for j in range(7):
+                    acc += K[j, i] * P[j, k]
+                Qs[m - 1, 4 * i + k] = acc
+        ts[m] = t_new
+        for i in range(n):
+            ys[m, i] = y_new[i]
+        m += 1
+        t = t_new
+        y = y_new
+        f = f_new
+    return ts[:m], ys[:m], Qs[:m - 1]
+'''
+
+_dopri5 = None          # namespace of the compiled loop, built on first use
+_compiled_rhs = {}      # lowered source -> compiled rhs(t, y, params), or why it failed
+_engine_notes = set()
+
+class _Dopri5DenseOutput:
+    """Dense output of the compiled RK45: the quartic interpolant of each step, as SciPy's."""
+    def __init__(self, t, y, Q):
+        self.t = t      # steps (m)
+        self.y = y      # states at the steps (m x n)
+        self.Q = Q      # interpolant coefficients of each step (m-1 x n x 4)
+
+    def __call__(self, x):
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        if self.t.size < 2:
+            return np.repeat(self.y[:1].T, x.size, axis=1)
+        d = 1.0 if self.t[-1] > self.t[0] else -1.0
+        k = np.clip(np.searchsorted(d * self.t, d * x, side='right') - 1, 0, self.t.size - 2)
+        h = self.t[k + 1] - self.t[k]
+        powers = ((x - self.t[k]) / h)[:, None] ** np.arange(1, 5)
+        return (self.y[k] + h[:, None] * np.einsum('kij,kj->ki', self.Q[k], powers)).T
+
+def _dopri5_namespace():
+    """The compiled loop (once, for any right-hand side) and its helpers."""
+    global _dopri5
+    if _dopri5 is None:
+        from ides.mathex.language import jit
+        numba = jit._numba()
+        ns = {'np': np}
+        exec(_DOPRI5_SOURCE, ns)
+        for name in ('_state', '_scalar_state', '_rms'):
+            ns[name] = numba.njit(cache=False)(ns[name])
+        f8, vec = numba.types.float64, numba.types.float64[::1]
+        ns['rhs_type'] = vec(f8, vec, vec)
+        ns['_dopri5'] = numba.njit((numba.types.FunctionType(ns['rhs_type']), f8, f8, vec, vec,
+                                    f8, vec, f8, f8), cache=False)(ns['_dopri5'])
+        _dopri5 = ns
+    return _dopri5
+
+def _compile_rhs(fun):
+    """
+    (compiled rhs(t, y, params), params) for an anonymous function @(t,y);
+    raises JitUnsupported. The values it captures are packed in params.
+    """
+    from ides.mathex.language import jit
+    source, values, kind = jit.lower_anonymous(fun, (jit.SCALAR, jit.ARRAY))
+    args, offset = "", 0
+    for value in values:
+        if np.ndim(value) == 0:
+            args += f", p[{offset}]"
+            offset += 1
+        else:
+            args += f", p[{offset}:{offset + value.size}].reshape({value.shape})"
+            offset += value.size
+    state = '_scalar_state' if kind == jit.SCALAR else '_state'
+    wrapper = (f"def _rhs(t, y, p):\n"
+               f"    return {state}(_jit_anonymous(t, y.reshape((y.size, 1)){args}), y.size)\n")
+    params = np.concatenate([np.ravel(v) for v in values]) if values else np.empty(0)
+
+    rhs = _compiled_rhs.get(source + wrapper)
+    if isinstance(rhs, str):
+        raise jit.JitUnsupported(rhs)
+    if rhs is None:
+        numba = jit._numba()
+        helpers = _dopri5_namespace()
+        ns = jit._runtime_namespace()
+        ns.update(_state=helpers['_state'], _scalar_state=helpers['_scalar_state'])
+        exec(source, ns)
+        exec(wrapper, ns)
+        try:
+            ns['_jit_anonymous'] = numba.njit(cache=False)(ns['_jit_anonymous'])
+            rhs = numba.njit(helpers['rhs_type'], cache=False)(ns['_rhs'])
+        except Exception as e:
+            if not jit._is_compile_error(e):
+                raise
+            rhs = f"numba could not compile it: {str(e).splitlines()[0]}"
+        _compiled_rhs[source + wrapper] = rhs
+        if isinstance(rhs, str):
+            raise jit.JitUnsupported(rhs)
+    return rhs, params
+
+def _engine_note(fun, reason):
+    node = getattr(fun, 'matlab_node', None)
+    key = (id(node) if node is not None else getattr(fun, '__qualname__', None), reason)
+    if key not in _engine_notes:
+        _engine_notes.add(key)
+        print(f"Note: ode45 runs through SciPy: {reason}")
+
+def _compiled_rk45(fun, ts, y0, options, events, t_out):
+    """
+    ode45 with the 'Engine' option 'numba': the ODESolution, or None (after
+    a note) when the problem is outside what the compiled loop supports.
+    The loop is compiled once per process (a few seconds) and each lowered
+    function once (under a second); the values a function captures are
+    passed in, so changing them does not recompile.
+    """
+    from ides.mathex.language import jit
+    if events is not None:
+        return _engine_note(fun, "Events are not supported by the numba engine.")
+    if _option(options, 'Mass') is not None:
+        return _engine_note(fun, "Mass matrices are not supported by the numba engine.")
+    if np.iscomplexobj(y0):
+        return _engine_note(fun, "Complex initial values are not supported by the numba engine.")
+    try:
+        rhs, params = _compile_rhs(fun)
+    except jit.JitUnsupported as e:
+        return _engine_note(fun, str(e))
+
+    y0 = np.asarray(y0, dtype=float)
+    atol = _matrix(_option(options, 'AbsTol', 1e-6)).ravel()
+    atol = np.full(y0.size, atol[0]) if atol.size == 1 else np.ascontiguousarray(atol)
+    try:
+        t, y, Q = _dopri5_namespace()['_dopri5'](
+            rhs, float(ts[0]), float(ts[-1]), np.ascontiguousarray(y0), params,
+            float(_option(options, 'RelTol', 1e-3)), atol,
+            float(_option(options, 'MaxStep', np.inf)), float(_option(options, 'InitialStep', 0.0)))
+    except Exception:
+        return None     # runtime failures (bounds, state size, ...) are reported by the SciPy run
+    return ODESolution(t.reshape(1, -1), np.ascontiguousarray(y.T),
+                       interpolant=_Dopri5DenseOutput(t, y, Q.reshape(-1, y0.size, 4)), tspan=t_out)
+
+def _solve_ivp_generic(fun, tspan, y0, method, options=None, events=None):
+    # ode45(fun, tspan, y0, events) (events in place of the options)
+    if callable(options) or isinstance(options, (list, tuple)):
+        options, events = None, options
+    if events is None:
+        events = _option(options, 'Events')
+    vectorized = _switch(_option(options, 'Vectorized', 'off'))
+    rhs, solver_options = _solver_options(options, method, _wrap_ode_func(fun, vectorized))
+
     if isinstance(tspan, MatlabArray):
         ts = tspan._data
     else:
@@ -69,22 +518,32 @@ def _solve_ivp_generic(fun, tspan, y0, method, events=None):
     ts = ts.flatten()
     t_start, t_end = float(ts[0]), float(ts[-1])
 
-    t_eval = None
-    if ts.size > 2:
-        t_eval = ts
+    # Only the steps are stored; output at tspan is interpolated on demand
+    t_out = ts.astype(float) if ts.size > 2 else None
 
     if isinstance(y0, MatlabArray):
         y0_val = y0._data.flatten()
     else:
         y0_val = np.asarray(y0).flatten()
+
+    # Compiled Dormand-Prince loop for anonymous functions (ode45 only)
+    engine = str(_option(options, 'Engine', 'scipy')).lower()
+    if engine not in ('scipy', 'numba'):
+        raise ValueError(f"ode: Unknown engine '{engine}' (use 'scipy' or 'numba').")
+    if engine == 'numba' and method == 'RK45':
+        sol = _compiled_rk45(fun, ts, y0_val, options, events, t_out)
+        if sol is not None:
+            return sol
     
     sol = scipy.integrate.solve_ivp(
-        _wrap_ode_func(fun), 
+        rhs, 
         (t_start, t_end), 
         y0_val, 
         method=method,
         events=events,
-        t_eval=t_eval
+        dense_output=True,
+        vectorized=vectorized,
+        **solver_options
     )
     
     te, ye, ie = None, None, None
@@ -109,22 +568,60 @@ def _solve_ivp_generic(fun, tspan, y0, method, events=None):
             ie = ie[idx]
 
     # [FIX] Reshape to match MATLAB Struct: x is row (1,N), y is (Vars,N)
-    t_out = sol.t.reshape(1, -1)
-    y_out = sol.y # solve_ivp returns (Vars, N) by default
+    t_steps = sol.t.reshape(1, -1)
+    y_steps = sol.y # solve_ivp returns (Vars, N) by default
+
+    return ODESolution(t_steps, y_steps, te, ye, ie, interpolant=sol.sol, tspan=t_out)
 
-    return ODESolution(t_out, y_out, te, ye, ie)
+def ode45(fun, tspan, y0, options=None, events=None):
+    return _solve_ivp_generic(fun, tspan, y0, method='RK45', options=options, events=events)
 
-def ode45(fun, tspan, y0, events=None):
-    return _solve_ivp_generic(fun, tspan, y0, method='RK45', events=events)
+def ode23(fun, tspan, y0, options=None, events=None):
+    return _solve_ivp_generic(fun, tspan, y0, method='RK23', options=options, events=events)
 
-def ode23(fun, tspan, y0, events=None):
-    return _solve_ivp_generic(fun, tspan, y0, method='RK23', events=events)
+def ode15s(fun, tspan, y0, options=None, events=None):
+    return _solve_ivp_generic(fun, tspan, y0, method='BDF', options=options, events=events)
 
-def ode15s(fun, tspan, y0, events=None):
-    return _solve_ivp_generic(fun, tspan, y0, method='BDF', events=events)
+# odeset properties (MATLAB spelling); each solver reads the ones it supports.
+# Engine is Mathex's own: 'scipy' (default) or 'numba', ode45 integrating
+# anonymous functions it can lower with a compiled loop
+_ODESET_FIELDS = (
+    'AbsTol', 'BDF', 'Engine', 'Events', 'InitialSlope', 'InitialStep', 'Jacobian', 'JConstant',
+    'JPattern', 'Mass', 'MassSingular', 'MaxOrder', 'MaxStep', 'MinStep', 'MStateDependence',
+    'MvPattern', 'NonNegative', 'NormControl', 'OutputFcn', 'OutputSel', 'Refine', 'RelTol',
+    'Stats', 'Vectorized',
+)
+
+def odeset(*args):
+    """
+    options = odeset('Name', value, ...)
+    options = odeset(oldopts, 'Name', value, ...)
+    options = odeset(oldopts, newopts)
+    Every property is present; the ones not set are [].
+    """
+    fields = {name: MatlabArray([]) for name in _ODESET_FIELDS}
+    canonical = {name.lower(): name for name in _ODESET_FIELDS}
+
+    def set_field(name, value):
+        key = canonical.get(str(name).lower())
+        if key is None:
+            raise ValueError(f"odeset: Unrecognized property name '{name}'.")
+        fields[key] = value
+
+    args = list(args)
+    while args and not isinstance(args[0], str):
+        old = args.pop(0)
+        for name, value in (old if isinstance(old, dict) else vars(old)).items():
+            if np.size(value) > 0:
+                set_field(name, value)
+    if len(args) % 2 != 0:
+        raise ValueError("odeset: Arguments must occur in name-value pairs.")
+    for name, value in zip(args[0::2], args[1::2]):
+        set_field(name, value)
+    return MatlabStruct(**fields)
 
 def bvp4c(ode_fun, bc_fun, solinit):
-    x_mesh = solinit.x._data if isinstance(solinit.x, MatlabArray) else solinit.x
+    x_mesh = np.ravel(solinit.x._data if isinstance(solinit.x, MatlabArray) else solinit.x)
     y_guess = solinit.y._data if isinstance(solinit.y, MatlabArray) else solinit.y
     
     def wrapped_ode(x, y):
@@ -136,4 +633,220 @@ def bvp4c(ode_fun, bc_fun, solinit):
         return res._data.flatten() if isinstance(res, MatlabArray) else np.asarray(res).flatten()
 
     res = scipy.integrate.solve_bvp(wrapped_ode, wrapped_bc, x_mesh, y_guess)
-    return ODESolution(res.x, res.y)
\ No newline at end of file
+    return ODESolution(res.x.reshape(1, -1), res.y, interpolant=res.sol)
+
+def _interpolate(interpolant, x):
+    """
+    interpolant(x), evaluated one slice of x per solver step when x is
+    increasing (SciPy's OdeSolution masks all of x once per step).
+    """
+    steps = getattr(interpolant, 'interpolants', None)
+    if steps is None or len(steps) < 2 or x.size == 0:
+        return interpolant(x)
+    if not interpolant.ascending or np.any(np.diff(x) < 0):
+        return interpolant(x)
+
+    bounds = np.searchsorted(x, interpolant.ts_sorted[1:-1], side='right')
+    bounds = np.concatenate(([0], bounds, [x.size]))
+    y = None
+    for step, lo, hi in zip(steps, bounds[:-1], bounds[1:]):
+        if hi > lo:
+            values = step(x[lo:hi])
+            if y is None:
+                y = np.empty((values.shape[0], x.size), dtype=values.dtype)
+            y[:, lo:hi] = values
+    return y
+
+def deval(sol, xint, idx=None):
+    """
+    y = deval(sol, xint)        Solution at the points xint (Vars x numel(xint))
+    y = deval(sol, xint, idx)   Only the components idx (1-based)
+    Evaluates the dense output of an ode45/ode23/ode15s/bvp4c solution.
+    """
+    if isinstance(xint, ODESolution):
+        sol, xint = xint, sol     # deval(xint, sol)
+    if sol.interpolant is None:
+        raise ValueError("deval: The solution has no dense output.")
+    x = np.asarray(xint._data if isinstance(xint, MatlabArray) else xint, dtype=float).ravel()
+    t0, tf = sol.x._data[0, 0], sol.x._data[0, -1]
+    if np.any((x - t0) * (x - tf) > 0):
+        raise ValueError(f"deval: Attempting to interpolate a solution outside the interval [{t0:g}, {tf:g}].")
+
+    y = _interpolate(sol.interpolant, x).reshape(sol.y.shape[0], x.size)
+    if idx is not None:
+        y = y[np.asarray(idx._data if isinstance(idx, MatlabArray) else idx, dtype=int).ravel() - 1]
+    return _from_data(y)
+# ==========================================================
+# ENSEMBLES: one ODE, many initial conditions / parameter sets
+# ==========================================================
+_SOLVERS = {'ode45': 'RK45', 'ode23': 'RK23', 'ode15s': 'BDF'}
+
+def _columns(value):
+    """Float data of a matrix argument, one column per trajectory."""
+    data = np.asarray(value._data if isinstance(value, MatlabArray) else value, dtype=float)
+    return data.reshape(-1, 1) if data.ndim < 2 else data
+
+def _batch_function(fun):
+    """fun(t, Y[, P]) on raw arrays, returning the raw result."""
+    raw = getattr(fun, 'accepts_ndarray', False)
+
+    def evaluate(t, Y, P):
+        args = (Y,) if P is None else (Y, P)
+        if not raw:
+            args = tuple(_from_data(a) for a in args)
+        res = fun(t, *args)
+        return np.asarray(res._data if isinstance(res, MatlabArray) else res)
+    return evaluate
+
+def _stacked_options(options, mass, M):
+    """Options of the stacked system: block-diagonal matrices, repeated tolerances."""
+    fields = {} if options is None else options if isinstance(options, dict) else vars(options)
+    stacked = {}
+    for key, value in fields.items():
+        name = key.lower()
+        if value is None or np.size(value) == 0 or name in ('mass', 'vectorized'):
+            continue
+        if name in ('jacobian', 'jpattern'):
+            if callable(value) and not isinstance(value, MatlabArray):
+                raise ValueError(f"odeensemble: A function as {key} is not supported in 'stacked' mode.")
+            block = _matrix(value)
+            if mass is not None:
+                # M \ J: the blocks fill in unless M is diagonal
+                block = mass.solve(block) if name == 'jacobian' else np.ones(block.shape)
+            value = scipy.sparse.kron(scipy.sparse.identity(M), block, format='csr')
+        elif name == 'abstol' and np.size(value) > 1:
+            value = np.tile(_matrix(value).ravel(), M)
+        stacked[key] = value
+    return stacked
+
+def _ensemble_stacked(fun, ts, Y0, P, method, options):
+    """All trajectories as one system of n*M states (column j = trajectory j)."""
+    n, M = Y0.shape
+    evaluate = _batch_function(fun)
+    mass = _option(options, 'Mass')
+    mass = _MassMatrix(mass) if mass is not None else None
+
+    # fun must treat the columns independently: check the first and last one
+    columns = sorted({0, M - 1})
+    single = [evaluate(ts[0], Y0[:, [j]], None if P is None else P[:, [j]]).ravel() for j in columns]
+    try:
+        batch = evaluate(ts[0], Y0, P)
+        ok = batch.shape == (n, M) and all(np.allclose(batch[:, j], s) for j, s in zip(columns, single))
+    except Exception:
+        ok = False
+    if not ok:
+        raise ValueError("odeensemble: fun must accept an n x M batch of states and return one "
+                         "column per trajectory in 'stacked' mode (use 'Mode', 'pool' otherwise).")
+
+    def rhs(t, y):
+        F = evaluate(t, y.reshape(n, M, order='F'), P)
+        return (mass.solve(F) if mass else F).reshape(-1, 1, order='F')
+    rhs.accepts_ndarray = True
+
+    stacked = _stacked_options(options, mass, M)
+    if not any(key.lower() in ('jacobian', 'jpattern') for key in stacked):
+        stacked['JPattern'] = scipy.sparse.kron(scipy.sparse.identity(M), np.ones((n, n)), format='csr')
+    sol = _solve_ivp_generic(rhs, ts[[0, -1]], Y0.ravel(order='F'), method, stacked)
+    return deval(sol, ts)._data.reshape(n, M, ts.size, order='F').transpose(0, 2, 1)
+
+def _ensemble_chunk(fun, ts, Y0, P, method, options):
+    """Integrates the trajectories one by one: n x numel(ts) x M."""
+    raw = getattr(fun, 'accepts_ndarray', False)
+    out = np.empty((Y0.shape[0], ts.size, Y0.shape[1]))
+    for j in range(Y0.shape[1]):
+        f = fun
+        if P is not None:
+            p = P[:, j:j + 1]
+            p = p if raw else _from_data(p)
+            f = lambda t, y, p=p: fun(t, y, p)
+            f.accepts_ndarray = raw
+        sol = _solve_ivp_generic(f, ts[[0, -1]], Y0[:, j], method, options)
+        out[:, :, j] = deval(sol, ts)._data
+    return out
+
+def _run_ensemble_chunk(task, cwd, paths):
+    from ides.mathex.kernel import futures, parallel
+    parallel._sync_environment(cwd, paths)
+    fun, *args = parallel._pickler.loads(task)
+    if isinstance(fun, futures._RegistryRef):
+        fun = fun.resolve()
+    return _ensemble_chunk(fun, *args)
+
+def _ensemble_pool(fun, ts, Y0, P, method, options, workers):
+    """Chunks of trajectories on the parfor worker pool (serially without one)."""
+    from ides.mathex.kernel import futures, parallel
+    from ides.mathex.kernel.path_manager import path_manager
+
+    M = Y0.shape[1]
+    if workers is None:
+        workers = parallel.pool_size() or parallel.default_workers()
+    if workers <= 1 or parallel._IN_WORKER:
+        return _ensemble_chunk(fun, ts, Y0, P, method, options)
+
+    pool = parallel.get_pool(None if parallel.pool_size() else workers)
+    n_chunks = min(M, min(workers, parallel.pool_size()) * parallel.CHUNKS_PER_WORKER)
+    bounds = [M * k // n_chunks for k in range(n_chunks + 1)]
+    try:
+        tasks = [parallel._pickler.dumps((futures._shippable(fun), ts, Y0[:, a:b],
+                                          None if P is None else P[:, a:b], method, options))
+                 for a, b in zip(bounds, bounds[1:])]
+    except Exception:
+        return _ensemble_chunk(fun, ts, Y0, P, method, options)  # e.g. a lambda without cloudpickle
+    jobs = [pool.submit(_run_ensemble_chunk, task, os.getcwd(), list(path_manager.paths)) for task in tasks]
+    return np.concatenate([job.result() for job in jobs], axis=2)
+
+def odeensemble(fun, tspan, Y0s, params=None, options=None, *args):
+    """
+    Y = odeensemble(fun, tspan, Y0s)           fun(t, y)
+    Y = odeensemble(fun, tspan, Y0s, params)   fun(t, y, p)
+    Y = odeensemble(..., options, 'Name', value, ...)
+
+    Solves one ODE for each column of Y0s (n x M) and of params (P x M);
+    a single column of either is shared by every trajectory.
+    Y(k, :, j) is trajectory j at tspan(k) (numel(tspan) x n x M).
+
+    'Solver'  'ode45' (default), 'ode23' or 'ode15s'
+    'Mode'    'stacked' (default): one system of n*M states, solved at
+              once. fun gets an n x M batch of states (and P x M params)
+              and returns one column per trajectory. Error control is over
+              the whole ensemble; the ode15s Jacobian is block diagonal.
+              'pool': the trajectories are solved one by one on the
+              parfor worker pool, and fun gets single states.
+    'Workers' Workers used by 'pool' (0: serially, in this process)
+    """
+    if isinstance(options, str):
+        options, args = None, (options,) + args
+    if len(args) % 2 != 0:
+        raise ValueError("odeensemble: Arguments must occur in name-value pairs.")
+    settings = {'solver': 'ode45', 'mode': 'stacked', 'workers': None}
+    for name, value in zip(args[0::2], args[1::2]):
+        if str(name).lower() not in settings:
+            raise ValueError(f"odeensemble: Unrecognized parameter '{name}'.")
+        settings[str(name).lower()] = value
+    method = _SOLVERS.get(str(settings['solver']).lower())
+    if method is None:
+        raise ValueError(f"odeensemble: Unknown solver '{settings['solver']}'.")
+    if _option(options, 'Events') is not None:
+        raise ValueError("odeensemble: Events are not supported.")
+
+    ts = _columns(tspan).ravel()
+    Y0 = _columns(Y0s)
+    P = None if params is None or np.size(params) == 0 else _columns(params)
+    M = Y0.shape[1] if P is None else max(Y0.shape[1], P.shape[1])
+    if Y0.shape[1] == 1:
+        Y0 = np.repeat(Y0, M, axis=1)
+    if P is not None and P.shape[1] == 1:
+        P = np.repeat(P, M, axis=1)
+    if Y0.shape[1] != M or (P is not None and P.shape[1] != M):
+        raise ValueError("odeensemble: Y0s and params must have the same number of columns.")
+
+    mode = str(settings['mode']).lower()
+    if mode == 'stacked':
+        Y = _ensemble_stacked(fun, ts, Y0, P, method, options)
+    elif mode == 'pool':
+        workers = settings['workers']
+        Y = _ensemble_pool(fun, ts, Y0, P, method, options, None if workers is None else int(workers))
+    else:
+        raise ValueError(f"odeensemble: Unknown mode '{settings['mode']}'.")
+    # n x numel(tspan) x M -> numel(tspan) x n x M
+    return _from_data(np.ascontiguousarray(Y.transpose(1, 0, 2)))
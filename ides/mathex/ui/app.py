@@ -155,7 +155,9 @@ class MathexApp(QMainWindow):
         self.session = KernelSession()
 
         self.editor = ScriptEditor()
-        self.console = ConsoleWidget()
+        self.console = ConsoleWidget(
+            max_blocks=int(self.settings.value("console_max_blocks", ConsoleWidget.MAX_BLOCKS))
+        )
         self.workspace = WorkspaceWidget()
         self.plot_dock = PlotDock()
         self.file_browser = FileBrowser()
@@ -448,7 +450,7 @@ class MathexApp(QMainWindow):
             self._kernel_thread, self._kernel_worker = start_kernel_worker(
                 self.session, code,
                 breakpoints=breakpoints, 
-                on_output=self.console.write_output,
+                on_output=self.console.append_output,
                 on_error=self._on_kernel_error,
                 on_finished=self._on_execution_finished,
             )
@@ -478,7 +480,7 @@ class MathexApp(QMainWindow):
             except Exception:
                 pass
 
-        self.workspace.update_table(self.session.globals)
+        self.workspace.update_table(self.session.globals, self.session.drain_changes())
 
     def _on_execution_finished(self):
         if self._exec_start is not None:
@@ -487,7 +489,7 @@ class MathexApp(QMainWindow):
         else:
             self.time_label.setText("")
 
-        self.workspace.update_table(self.session.globals)
+        self.workspace.update_table(self.session.globals, self.session.drain_changes())
         self.console.execution_finished()
         self.console.busy = False
 
@@ -515,7 +517,7 @@ class MathexApp(QMainWindow):
 
     def _clear_workspace(self):
         self.session._clear_user()
-        self.workspace.update_table(self.session.globals)
+        self.workspace.update_table(self.session.globals, self.session.drain_changes())
         self.console.write_output("Workspace cleared.")
 
     def _save_workspace(self):
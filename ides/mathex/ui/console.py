@@ -37,16 +37,33 @@ class ConsoleWidget(QPlainTextEdit):
     PROMPT = ">> "
     CONTINUATION = "... "
 
+    # Default scrollback limit: oldest transcript lines are dropped beyond
+    # this. 0 disables the limit (unbounded document).
+    MAX_BLOCKS = 10000
+
     # ------------------------------------------------------------
     # INIT
     # ------------------------------------------------------------
-    def __init__(self):
+    def __init__(self, max_blocks=None):
         super().__init__()
 
+        self._formats = {}
         self._setup_ui()
+        self.set_max_blocks(self.MAX_BLOCKS if max_blocks is None else max_blocks)
         self._reset_state()
         self._init_console()
 
+        # Scrollback trimming removes text from the top of the document,
+        # which would otherwise leave locked_pos pointing past the prompt.
+        self.document().contentsChange.connect(self._on_contents_change)
+
+    def set_max_blocks(self, count):
+        """Sets the scrollback limit in lines (0 = unlimited)."""
+        self.setMaximumBlockCount(max(0, int(count)))
+
+    def max_blocks(self):
+        return self.maximumBlockCount()
+
     def initialize(self, text=""):
         """Public API used by app.py"""
         self.clear()
@@ -86,15 +103,25 @@ class ConsoleWidget(QPlainTextEdit):
         self.history_index = -1
         self.multi_line_buffer = []
         self.locked_pos = 0  # absolute transcript boundary
+        self._streaming = False  # True while kernel output chunks arrive
 
     # ------------------------------------------------------------
     # FORMATTING HELPERS
     # ------------------------------------------------------------
     def _fmt(self, color):
-        fmt = QTextCharFormat()
-        fmt.setForeground(QColor(color))
+        # Cached: output paths request the same few formats on every append
+        key = color.name() if isinstance(color, QColor) else color
+        fmt = self._formats.get(key)
+        if fmt is None:
+            fmt = QTextCharFormat()
+            fmt.setForeground(QColor(color))
+            self._formats[key] = fmt
         return fmt
 
+    def _on_contents_change(self, position, removed, added):
+        if position < self.locked_pos:
+            self.locked_pos = max(position, self.locked_pos + added - removed)
+
     # ------------------------------------------------------------
     # CONSOLE CORE
     # ------------------------------------------------------------
@@ -128,10 +155,14 @@ class ConsoleWidget(QPlainTextEdit):
         cursor = self.textCursor()
         cursor.movePosition(QTextCursor.End)
 
-        if self.document().characterCount() > 1 and not self.document().toPlainText().endswith("\n"):
-            cursor.insertText("\n")
+        # The document ends with a newline iff its last block is empty;
+        # checking the block avoids copying the whole transcript per call.
+        prefix = "\n" if cursor.block().length() > 1 else ""
 
-        cursor.insertText(text.rstrip("\n") + "\n", self._fmt(color))
+        # One edit block per append: a single layout/scrollback update
+        cursor.beginEditBlock()
+        cursor.insertText(prefix + text.rstrip("\n") + "\n", self._fmt(color))
+        cursor.endEditBlock()
         self.setTextCursor(cursor)
 
     # ------------------------------------------------------------
@@ -320,7 +351,35 @@ class ConsoleWidget(QPlainTextEdit):
             
         self._insert_prompt()
 
+    def append_output(self, chunk):
+        """
+        Streaming output path (one call per kernel stdout chunk).
+
+        Chunks are inserted verbatim at the end of the transcript, since a
+        chunk may end mid-line. No prompt is inserted here; the prompt
+        comes back in execution_finished().
+        """
+        if "\f" in chunk:
+            self.clear()
+            chunk = chunk[chunk.rindex("\f") + 1:]
+
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.End)
+
+        if not self._streaming:
+            # First chunk of a run: start on a fresh line
+            self._streaming = True
+            if cursor.block().length() > 1:
+                chunk = "\n" + chunk
+
+        if chunk:
+            cursor.beginEditBlock()
+            cursor.insertText(chunk, self._fmt(self.COLOR_TRANSCRIPT))
+            cursor.endEditBlock()
+        self.setTextCursor(cursor)
+
     def write_error(self, text):
+        self._streaming = False
         self._append_transcript(text, self.COLOR_ERROR)
         self._insert_prompt()
 
@@ -333,12 +392,16 @@ class ConsoleWidget(QPlainTextEdit):
     # EXECUTION LIFECYCLE HOOK
     # ------------------------------------------------------------
     def execution_finished(self):
+        self._streaming = False
         cursor = self.textCursor()
         cursor.movePosition(QTextCursor.End)
         self.setTextCursor(cursor)
 
         block_text = self.document().lastBlock().text()
         if not (block_text.startswith(self.PROMPT) or block_text.startswith(self.CONTINUATION)):
+            if block_text:
+                # Streamed output ended without a newline
+                cursor.insertText("\n")
             self._insert_prompt()
             
     # [FIX] Helper method required by is_at_prompt/move_cursor_to_prompt
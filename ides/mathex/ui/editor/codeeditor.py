@@ -1,7 +1,8 @@
-from PySide6.QtWidgets import QPlainTextEdit, QTextEdit
-from PySide6.QtGui import QFont, QColor, QTextFormat, QPainter
-from PySide6.QtCore import Qt, QRect
+from PySide6.QtWidgets import QPlainTextEdit, QTextEdit, QToolTip
+from PySide6.QtGui import QFont, QColor, QTextFormat, QTextCharFormat, QTextCursor, QPainter
+from PySide6.QtCore import Qt, QRect, QTimer, QEvent, Signal
 
+from .diagnostics import DiagnosticsWorker, diagnostics_thread
 from .gutter import LineNumberArea
 from .syntax import MatlabHighlighter
 
@@ -13,7 +14,14 @@ class CodeEditor(QPlainTextEdit):
     - Breakpoint gutter click
     - Current-line highlight
     - [NEW] Error Line Highlighting
+    - Live syntax diagnostics (squiggles, parsed in the background)
     """
+    # Text to parse, for the diagnostics worker (request id, text)
+    diagnostics_requested = Signal(int, str)
+
+    # Parse this long after the last keystroke (ms)
+    DIAGNOSTICS_DELAY = 300
+
     def __init__(self):
         super().__init__()
 
@@ -44,6 +52,24 @@ class CodeEditor(QPlainTextEdit):
         self.cursorPositionChanged.connect(self.highlight_lines) # Consolidated highlight trigger
 
         self.update_line_number_area_width()
+
+        # Live diagnostics: debounced, one request in flight at a time
+        self.diagnostics = []   # [Diagnostic] of the last parse
+        self._diag_request = 0
+        self._diag_busy = False
+        self._diag_pending = False
+        self._diag_timer = QTimer(self)
+        self._diag_timer.setSingleShot(True)
+        self._diag_timer.setInterval(self.DIAGNOSTICS_DELAY)
+        self._diag_timer.timeout.connect(self.request_diagnostics)
+        self.textChanged.connect(self._diag_timer.start)
+
+        self._diag_worker = DiagnosticsWorker()
+        self._diag_worker.moveToThread(diagnostics_thread())
+        self.diagnostics_requested.connect(self._diag_worker.parse)
+        self._diag_worker.finished.connect(self._show_diagnostics)
+        self.destroyed.connect(self._diag_worker.deleteLater)
+
         self.highlight_lines()
 
     # -------------------------------------------------------
@@ -68,6 +94,39 @@ class CodeEditor(QPlainTextEdit):
             self.error_lines.clear()
             self.highlight_lines()
 
+    # -------------------------------------------------------
+    # Live Diagnostics
+    # -------------------------------------------------------
+    def request_diagnostics(self):
+        """Parses the current text in the background (squiggles follow)."""
+        if self._diag_busy:
+            self._diag_pending = True   # re-parse once the running one is done
+            return
+        self._diag_busy = True
+        self._diag_request += 1
+        self.diagnostics_requested.emit(self._diag_request, self.toPlainText())
+
+    def _show_diagnostics(self, request, diagnostics):
+        self._diag_busy = False
+        if request == self._diag_request:
+            self.diagnostics = diagnostics
+            self.highlight_lines()
+        if self._diag_pending:
+            self._diag_pending = False
+            self.request_diagnostics()
+
+    def viewportEvent(self, event):
+        # Diagnostic messages as tooltips over their lines
+        if event.type() == QEvent.ToolTip:
+            line = self.cursorForPosition(event.pos()).blockNumber() + 1
+            messages = [d.message for d in self.diagnostics if d.line == line]
+            if messages:
+                QToolTip.showText(event.globalPos(), "\n".join(messages), self)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().viewportEvent(event)
+
     def get_breakpoints(self) -> list[int]:
         """Returns a sorted list of active breakpoints (1-based)."""
         return sorted(list(self.breakpoints))
@@ -166,6 +225,25 @@ class CodeEditor(QPlainTextEdit):
                 err_sel.cursor = cursor
                 selections.append(err_sel)
 
+        # 3. Syntax Diagnostics (Red Squiggle under the line's text)
+        for diagnostic in self.diagnostics:
+            block = self.document().findBlockByNumber(diagnostic.line - 1)
+            if not block.isValid():
+                continue
+            text = block.text()
+            if not text.strip():
+                continue
+            indent = len(text) - len(text.lstrip())
+            squiggle = QTextEdit.ExtraSelection()
+            squiggle.format.setUnderlineStyle(QTextCharFormat.SpellCheckUnderline)
+            squiggle.format.setUnderlineColor(QColor("#f14c4c"))
+
+            cursor = self.textCursor()
+            cursor.setPosition(block.position() + indent)
+            cursor.setPosition(block.position() + len(text), QTextCursor.KeepAnchor)
+            squiggle.cursor = cursor
+            selections.append(squiggle)
+
         self.setExtraSelections(selections)
 
     # -------------------------------------------------------
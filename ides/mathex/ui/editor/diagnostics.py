@@ -0,0 +1,61 @@
+# mathex/ui/editor/diagnostics.py
+"""
+Live syntax diagnostics for the editor.
+
+Each CodeEditor owns a DiagnosticsWorker, which keeps an IncrementalParser
+for its document. All workers live in one background QThread, so parsing
+never runs on the UI thread; results come back through `finished`.
+"""
+
+import sys
+import traceback
+
+from PySide6.QtCore import QCoreApplication, QObject, QThread, Signal, Slot
+
+from ides.mathex.language.incremental import IncrementalParser
+
+
+class DiagnosticsWorker(QObject):
+    """Parses successive versions of one document (WORKER THREAD)."""
+
+    finished = Signal(int, list)    # request id, [Diagnostic]
+
+    def __init__(self):
+        super().__init__()
+        self._parser = IncrementalParser()
+
+    @Slot(int, str)
+    def parse(self, request, text):
+        try:
+            _, diagnostics = self._parser.update(text)
+        except Exception:
+            # A parser bug must not take the worker down with it
+            print("\n[Mathex Diagnostics Traceback]", file=sys.stderr)
+            print(traceback.format_exc(), file=sys.stderr)
+            self._parser = IncrementalParser()
+            diagnostics = []
+        self.finished.emit(request, diagnostics)
+
+
+_thread = None
+
+
+def diagnostics_thread() -> QThread:
+    """The shared background thread of the workers (started on first use)."""
+    global _thread
+    if _thread is None:
+        _thread = QThread()
+        _thread.setObjectName("mathex-diagnostics")
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_stop_thread)
+        _thread.start()
+    return _thread
+
+
+def _stop_thread():
+    global _thread
+    if _thread is not None:
+        _thread.quit()
+        _thread.wait()
+        _thread = None
@@ -8,16 +8,17 @@ Executes KernelSession code in a background Qt thread.
 HARD GUARANTEES:
 - User code NEVER runs on UI thread
 - Full Python tracebacks ALWAYS go to terminal
-- Console gets clean MATLAB-style output
+- Console gets clean MATLAB-style output, streamed in bounded chunks
 - finished() is ALWAYS emitted
 """
 
 from PySide6.QtCore import QObject, QThread, Signal, Slot
 import traceback
 import sys
-import io
 from contextlib import redirect_stdout
 
+from ides.mathex.kernel.stdout import StdoutBuffer
+
 
 class KernelWorker(QObject):
     """
@@ -29,7 +30,12 @@ class KernelWorker(QObject):
     started = Signal()
     finished = Signal()
     failed = Signal(str)        # user-facing error
-    output = Signal(str)        # user-facing stdout
+    output = Signal(str)        # user-facing stdout (one chunk per emit)
+
+    # Streaming bounds: a chunk is emitted every OUTPUT_INTERVAL seconds
+    # or as soon as OUTPUT_CHUNK characters are pending, whichever is first.
+    OUTPUT_INTERVAL = 0.05
+    OUTPUT_CHUNK = 64 * 1024
 
     def __init__(self, session):
         super().__init__()
@@ -56,14 +62,21 @@ class KernelWorker(QObject):
     def run(self):
         self.started.emit()
 
-        stdout_buf = io.StringIO()
+        # Chunks are emitted from this thread (and the flusher thread);
+        # Qt queues them onto the UI thread in order.
+        stdout_stream = StdoutBuffer(
+            self.output.emit,
+            interval=self.OUTPUT_INTERVAL,
+            max_chars=self.OUTPUT_CHUNK,
+        )
+        error_msg = None
 
         try:
             if self._code.strip():
                 # -----------------------------------------
-                # Redirect ONLY stdout → buffer
+                # Redirect ONLY stdout → streaming buffer
                 # -----------------------------------------
-                with redirect_stdout(stdout_buf):
+                with stdout_stream, redirect_stdout(stdout_stream):
                     # [UPGRADE] Pass breakpoints to session if they exist
                     if self._breakpoints:
                         # This triggers the DebugContext in executor.py
@@ -81,23 +94,20 @@ class KernelWorker(QObject):
             print(tb, file=sys.stderr)
             print("[End Kernel Traceback]\n", file=sys.stderr)
 
+            error_msg = f"{type(e).__name__}: {e}"
+
+        finally:
             # -----------------------------------------
-            # SHORT MESSAGE → CONSOLE
+            # Flush the tail of stdout BEFORE the error,
+            # so the console keeps the original ordering.
             # -----------------------------------------
-            self.failed.emit(f"{type(e).__name__}: {e}")
+            stdout_stream.close()
 
-        finally:
             # -----------------------------------------
-            # Flush captured stdout to UI console
+            # SHORT MESSAGE → CONSOLE
             # -----------------------------------------
-            out = stdout_buf.getvalue()
-            
-            # [CRITICAL FIX] 
-            # Do NOT use out.strip() here. 
-            # 'clc' prints '\f' which is whitespace.
-            # strip() would make it empty, preventing the signal from firing.
-            if out:
-                self.output.emit(out)
+            if error_msg is not None:
+                self.failed.emit(error_msg)
 
             # -----------------------------------------
             # ALWAYS notify UI that execution is done
@@ -128,7 +138,7 @@ def start_kernel_worker(
         breakpoints: (Optional) List of line numbers to pause at.
     
     UI MUST connect:
-      - output   -> console.write_output
+      - output   -> console.append_output
       - failed   -> console.write_error
       - finished -> console.execution_finished
     """
@@ -2,52 +2,40 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QTableView, QHeaderView, QLabel
 )
 from PySide6.QtCore import Qt, Signal, QAbstractTableModel, QModelIndex
-import numpy as np
+from ides.mathex.kernel.tiles import ArraySource, LocalArraySource, TileCache
 
-# [NEW] Import MatlabArray to check types if needed, or rely on duck typing
-# from shared.symbolic_core.arrays import MatlabArray 
 
 class ArrayModel(QAbstractTableModel):
     """
     Virtual Model that allows displaying 1,000,000+ cells instantly.
+
+    Cells are read through an ArraySource one tile at a time and the
+    formatted tiles are kept in an LRU TileCache, so only what is on
+    screen is ever fetched or formatted.
     """
     def __init__(self, data):
         super().__init__()
-        self._data = data
+        if data is None:
+            self._source = None
+            self._tiles = None
+        else:
+            self._source = data if isinstance(data, ArraySource) else LocalArraySource(data)
+            self._tiles = TileCache(self._source)
 
     def rowCount(self, parent=QModelIndex()):
-        if self._data is None: return 0
-        if self._data.ndim == 0: return 1
-        return self._data.shape[0]
+        if self._source is None: return 0
+        return self._source.shape[0]
 
     def columnCount(self, parent=QModelIndex()):
-        if self._data is None: return 0
-        if self._data.ndim < 2: return 1
-        return self._data.shape[1]
+        if self._source is None: return 0
+        return self._source.shape[1]
 
     def data(self, index, role=Qt.DisplayRole):
         if not index.isValid(): return None
-        
-        row, col = index.row(), index.column()
 
         if role == Qt.DisplayRole or role == Qt.EditRole:
-            # Safe Access logic
-            if self._data.ndim == 0:
-                val = self._data[()]
-            elif self._data.ndim == 1:
-                val = self._data[row]
-            else:
-                val = self._data[row, col]
-                
-            # [UPDATED] Formatting
-            if isinstance(val, (float, np.floating)):
-                return f"{val:.4f}"
-            if isinstance(val, (complex, np.complexfloating)):
-                # MATLAB Style: 1.0000 + 2.0000i
-                op = "+" if val.imag >= 0 else "-"
-                return f"{val.real:.4f} {op} {abs(val.imag):.4f}i"
-            return str(val)
-            
+            return self._tiles.cell(index.row(), index.column())
+
         return None
 
     def setData(self, index, value, role=Qt.EditRole):
@@ -64,16 +52,12 @@ class ArrayModel(QAbstractTableModel):
             elif '.' in py_val: new_val = float(py_val)
             else: new_val = int(py_val)
             
-            if self._data.ndim == 0:
-                self._data[()] = new_val
-            elif self._data.ndim == 1:
-                self._data[row] = new_val
-            else:
-                self._data[row, col] = new_val
+            self._source.store(row, col, new_val)
+            self._tiles.invalidate(row, col)
             
             self.dataChanged.emit(index, index, [Qt.DisplayRole])
             return True
-        except ValueError:
+        except (ValueError, TypeError):
             return False
 
     def flags(self, index):
@@ -99,12 +83,13 @@ class VariableInspector(QDialog):
         
         self.var_name = name
         
-        # [UPDATED] Robust Unwrap: Handle MatlabArray, standard lists, or raw numpy
-        self.raw_data = self._unwrap_value(value)
-
-        # Ensure NumPy array for the model
-        if not isinstance(self.raw_data, np.ndarray):
-            self.raw_data = np.array(self.raw_data)
+        # An ArraySource (e.g. from an out-of-process kernel) is used as is;
+        # anything else is read in place, without converting or copying it
+        if isinstance(value, ArraySource):
+            self.source = value
+        else:
+            self.source = LocalArraySource(value)
+        self.raw_data = getattr(self.source, "data", None)
 
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(0,0,0,0)
@@ -135,32 +120,25 @@ class VariableInspector(QDialog):
         
         self.load_data()
 
-    def _unwrap_value(self, value):
-        """Extracts raw data from MatlabArray or wrappers."""
-        if hasattr(value, "_data"):
-            return value._data
-        return value
-
     def load_data(self):
-        arr = self.raw_data
-        
-        # Handle Slicing for ND Arrays (Show first 2D slice)
-        if arr.ndim > 2:
-            extra_dims = arr.ndim - 2
-            view_arr = arr
-            # Peel dimensions until 2D
-            for _ in range(extra_dims): view_arr = view_arr[..., 0]
-            
-            slice_desc = f"[:,:,{','.join(['1']*extra_dims)}]" # 1-based display
-            self.info_label.setText(f" Displaying {slice_desc} of {arr.shape} Array")
-            self.model = ArrayModel(view_arr)
+        src = self.source
+        full_shape = getattr(src, "full_shape", src.shape)
+        plane = getattr(src, "plane", ())
+
+        # ND Arrays show one 2D plane, indexed lazily by the source
+        if plane:
+            slice_desc = f"[:,:,{','.join(str(i + 1) for i in plane)}]" # 1-based display
+            self.info_label.setText(f" Displaying {slice_desc} of {full_shape} Array")
         else:
-            self.model = ArrayModel(arr)
-            shape_str = f"{arr.shape[0]}x{arr.shape[1]}" if arr.ndim == 2 else str(arr.shape)
-            self.info_label.setText(f" Size: {shape_str}   Class: {arr.dtype}")
+            shape_str = f"{full_shape[0]}x{full_shape[1]}" if len(full_shape) == 2 else str(full_shape)
+            kind = " (sparse)" if getattr(src, "is_sparse", False) else ""
+            self.info_label.setText(f" Size: {shape_str}   Class: {src.dtype}{kind}")
 
+        self.model = ArrayModel(src)
         self.table.setModel(self.model)
         self.model.dataChanged.connect(self._on_data_changed)
     
     def _on_data_changed(self):
-        self.value_changed.emit(self.raw_data)
\ No newline at end of file
+        # A MatlabArray edit may have replaced the buffer (copy-on-write)
+        self.raw_data = getattr(self.source, "data", None)
+        self.value_changed.emit(self.raw_data)
@@ -1,41 +1,50 @@
-from .arrays import (
-    MatlabArray, mat, zeros, ones, eye, linspace, arange,
-    sparse, full, colon
+# Names below are imported on first access (PEP 562), so importing one
+# submodule (e.g. shared.symbolic_core.arrays) no longer pulls in SciPy
+# stats, SymPy and the engineering toolbox.
+from .lazy import lazy_exports
+
+_EXPORTS = {}
+
+
+def _export(module, *names):
+    for name in names:
+        _EXPORTS[name] = (module, name)
+
+
+_export(".arrays",
+    "MatlabArray", "mat", "zeros", "ones", "eye", "linspace", "arange",
+    "sparse", "full", "colon",
 )
 
-from .linalg import (
-    inv, det, eig, rank, norm, lu, svd, qr, pinv, null, orth, eigs
+_export(".linalg",
+    "inv", "det", "eig", "rank", "norm", "lu", "svd", "qr", "pinv", "null", "orth", "eigs",
 )
 
-from .statistics import (
-    mean, std, min_func, max_func, sum_func,
-    corrcoef, cov, histcounts, nlinfit
+_export(".statistics",
+    "mean", "std", "min_func", "max_func", "sum_func",
+    "corrcoef", "cov", "histcounts", "nlinfit",
 )
 
-from .calculus import diff, int_func
+_export(".calculus", "diff", "int_func")
+
+# Optimization module
+_export(".optim", "fminsearch", "fzero", "lsqcurvefit", "fmincon", "linprog")
 
-# Import Optimization module
-try:
-    from .optim import fminsearch, fzero, lsqcurvefit, fmincon, linprog
-except ImportError:
-    pass
+# [FIX] Physics Module and Constants
+_export(".physics",
+    "physconst", "convtemp", "convlength", "convmass", "convforce", "convpres", "convenergy",
+    "PhysicalConstants", "c", "h", "hbar", "G", "k", "e", "g",
+)
 
-# [FIX] Import Physics Module and Constants
-from .physics import (
-    physconst, convtemp, convlength, convmass, convforce, convpres, convenergy,
-    PhysicalConstants, c, h, hbar, G, k, e, g
+# [FIX] Engineering Toolbox (ODES, Signal, Interp)
+_export("ides.mathex.toolbox",
+    "ode45", "ode23", "ode15s", "odeset", "bvp4c", "deval", "odeensemble", "pdepe",
+    "fft", "ifft", "fftshift", "ifftshift", "spectrogram", "pwelch", "findpeaks",
+    "interp1", "interp2", "griddata", "meshgrid",
+    "trapz", "cumtrapz", "integral",
+    "roots", "polyval", "gradient", "cross", "dot",
+    "sphere", "cylinder",
 )
 
-# [FIX] Import Engineering Toolbox (ODES, Signal, Interp)
-try:
-    # Use relative import from toolbox package
-    from ides.mathex.toolbox import (
-        ode45, ode23, ode15s, bvp4c, pdepe,
-        fft, ifft, fftshift, ifftshift, spectrogram, pwelch, findpeaks,
-        interp1, interp2, griddata, meshgrid,
-        trapz, cumtrapz, integral,
-        roots, polyval, gradient, cross, dot,
-        sphere, cylinder
-    )
-except ImportError:
-    pass
\ No newline at end of file
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,9 +1,7 @@
 from __future__ import annotations
 import sys
 import numpy as np
-import scipy.linalg
-import scipy.sparse
-import scipy.sparse.linalg
+import scipy.sparse  # scipy.linalg / scipy.sparse.linalg load on first use
 import warnings  # [CRITICAL] Required for error suppression
 from typing import Union
 
@@ -18,7 +16,9 @@ ArrayLike = Union[
 
 # Dummy colon marker for runtime (true MATLAB : )
 class ColonType:
-    pass
+    def __reduce__(self):
+        # Unpickles as the singleton (indexing compares with `is`), e.g. on pool workers
+        return "colon"
 colon = ColonType()
 
 
@@ -43,11 +43,38 @@ def _to_numpy(x):
     return np.asarray(d)
 
 
+# Buffers whose elements get_elem returns as plain Python numbers
+_ELEM_DTYPES = (np.dtype(float), np.dtype(complex), np.dtype(bool), np.dtype(np.int64))
+
+
+def _elem_index(i, n):
+    """0-based position of a scalar MATLAB index in 1..n, or -1 (not a plain in-bounds index)."""
+    if isinstance(i, int) and not isinstance(i, bool):
+        k = i
+    elif isinstance(i, float) and i.is_integer():
+        k = int(i)
+    else:
+        return -1
+    return k - 1 if 0 < k <= n else -1
+
+
+def _from_data(data):
+    """Wraps an existing buffer without copying or normalizing it."""
+    arr = MatlabArray.__new__(MatlabArray)
+    arr._data = data
+    return arr
+
+
 class MatlabArray:
     """
     MATLAB-like numerical array with Copy-on-Write (CoW) optimization.
     """
 
+    # Bumped on every in-place write so observers (e.g. the Workspace panel)
+    # can detect A(i) = v without comparing data. Class-level default keeps
+    # construction free; the instance attribute appears on first write.
+    _version = 0
+
     # -----------------------------------------------------
     # CONSTRUCTOR
     # -----------------------------------------------------
@@ -57,6 +84,16 @@ class MatlabArray:
         :param data: Input data (list, numpy array, sparse matrix, or MatlabArray)
         :param copy: If True, forces a deep copy. If False, allows shared memory (Copy-on-Write).
         """
+        # Fast paths: Python scalars and dense numeric results (every call of
+        # a user function wraps some), without the sparse / string checks
+        kind = type(data)
+        if kind is int or kind is float or kind is bool or kind is complex:
+            self._data = np.array([[data]])
+            return
+        if kind is np.ndarray and data.dtype.kind not in ('U', 'S', 'O') and 1 <= data.ndim:
+            self._data = np.array(data) if data.ndim > 1 else np.array(data).reshape(1, -1)
+            return
+
         if isinstance(data, MatlabArray):
             if copy:
                 self._data = data._data.copy()
@@ -102,6 +139,11 @@ class MatlabArray:
             elif self._data.ndim == 1:
                 self._data = self._data.reshape(1, -1)
 
+    def __reduce__(self):
+        # Pickle the raw buffer only (worker processes). Rebuilding through
+        # __init__ would copy it, and default unpickling trips __getattr__.
+        return (_from_data, (self._data,))
+
     # -----------------------------------------------------
     # COPY-ON-WRITE LOGIC
     # -----------------------------------------------------
@@ -112,7 +154,11 @@ class MatlabArray:
         """
         # Refcount is usually 2 for a unique object (1 for variable, 1 for getrefcount argument)
         # If > 2, someone else holds a reference to this data.
-        if hasattr(self._data, 'copy') and sys.getrefcount(self._data) > 2:
+        # Read-only buffers (shared with worker processes) are never written in place.
+        if hasattr(self._data, 'copy') and (
+            sys.getrefcount(self._data) > 2
+            or not getattr(getattr(self._data, 'flags', None), 'writeable', True)
+        ):
             self._data = self._data.copy()
 
     # -----------------------------------------------------
@@ -314,6 +360,7 @@ class MatlabArray:
         Supports 1-based indexed assignment: A(i) = v
         """
         self._ensure_unique()  # <--- CoW Trigger
+        self._version += 1
 
         py_indices = []
         required_shape = [] 
@@ -427,6 +474,55 @@ class MatlabArray:
             self._data = expanded
             self.set_val(value, *args)
 
+    # -----------------------------------------------------
+    # SCALAR ELEMENT ACCESS (emitted by the transpiler)
+    # -----------------------------------------------------
+    # The transpiler emits these for A(i) / A(i, j) when inference proved A
+    # is an array and every index a scalar. In-bounds integer indices into a
+    # dense numeric buffer are read / written directly; anything else goes
+    # through the generic __call__ / set_val paths.
+
+    def get_elem(self, *args):
+        """A(i) or A(i, j) with scalar indices; numeric elements come back as Python numbers."""
+        data = self._data
+        if type(data) is np.ndarray and data.ndim == 2 and data.dtype in _ELEM_DTYPES:
+            rows, cols = data.shape
+            if len(args) == 1:
+                k = _elem_index(args[0], rows * cols)
+                if k >= 0:
+                    return data.item(k % rows, k // rows)
+            elif len(args) == 2:
+                r = _elem_index(args[0], rows)
+                c = _elem_index(args[1], cols)
+                if r >= 0 and c >= 0:
+                    return data.item(r, c)
+        return self(*args)
+
+    def set_elem(self, value, *args):
+        """A(i) = v or A(i, j) = v with scalar indices and a scalar value."""
+        data = self._data
+        if type(data) is np.ndarray and data.ndim == 2 and (
+            (isinstance(value, (int, float)) and data.dtype.kind in "fc")
+            or (isinstance(value, complex) and data.dtype.kind == "c")
+        ):
+            rows, cols = data.shape
+            if len(args) == 1:
+                k = _elem_index(args[0], rows * cols)
+                pos = (k % rows, k // rows) if k >= 0 else None
+            elif len(args) == 2:
+                r = _elem_index(args[0], rows)
+                c = _elem_index(args[1], cols)
+                pos = (r, c) if r >= 0 and c >= 0 else None
+            else:
+                pos = None
+            if pos is not None:
+                del data  # CoW: _ensure_unique counts references to the buffer
+                self._ensure_unique()
+                self._version += 1
+                self._data[pos] = value
+                return
+        self.set_val(value, *args)
+
     # -----------------------------------------------------
     # PYTHON INTERFACE
     # -----------------------------------------------------
@@ -446,6 +542,7 @@ class MatlabArray:
 
     def __setitem__(self, key, value):
         self._ensure_unique()  # <--- CoW Trigger
+        self._version += 1
         val = _to_numpy(value)
         if isinstance(key, MatlabArray):
             key = key._data
@@ -533,9 +630,16 @@ class MatlabArray:
         with np.errstate(all='ignore'):
             if self.is_sparse:
                  return MatlabArray(self._data.power(_to_data(o)))
-            return MatlabArray(np.power(self._data, _to_data(o)))
+            base, p = self._data, _to_data(o)
+            # A negative real base with a fractional exponent is complex in MATLAB
+            if (base.dtype.kind in 'biuf' and np.isrealobj(p)
+                    and np.any(base < 0) and np.any(np.asarray(p) % 1 != 0)):
+                base = base.astype(complex)
+            return MatlabArray(np.power(base, p))
 
     def __pow__(self, p):
+        if self._data.size == 1 and not self.is_sparse:
+            return self.epow(p)     # scalar ^ p, fractional exponents included
         with np.errstate(all='ignore'):
             p = int(p)
             if self.is_sparse:
@@ -572,6 +676,347 @@ def arange(start, stop=None, step=1):
         else: return MatlabArray(np.arange(start_val, stop_val - 1, step_val))
     return MatlabArray(np.arange(start_val, stop_val + 1e-12, step_val))
 
+# -----------------------------------------------------
+# SCALAR RUNTIME (emitted by the transpiler for inferred scalars)
+# -----------------------------------------------------
+def _scalar(x):
+    """First element of a colon operand as a Python number (None if empty)."""
+    if isinstance(x, MatlabArray):
+        if x.size == 0:
+            return None
+        x = _to_numpy(x).flat[0]
+    if isinstance(x, np.generic):
+        x = x.item()
+    if isinstance(x, complex):
+        x = x.real
+    return x
+
+def for_range(start, stop, step=1):
+    """
+    Values of `for k = start:step:stop` as Python numbers, without building
+    the range as a MatlabArray of 1x1 columns.
+    """
+    start, stop, step = _scalar(start), _scalar(stop), _scalar(step)
+    if start is None or stop is None or step is None:
+        return ()
+    if all(float(v).is_integer() for v in (start, stop, step)):
+        start, stop, step = int(start), int(stop), int(step)
+        if step == 0:
+            return ()
+        return range(start, stop + 1 if step > 0 else stop - 1, step)
+    if step == 0 or np.isnan(start) or np.isnan(stop) or np.isnan(step):
+        return ()
+    count = int(np.floor((stop - start) / step + 1e-10)) + 1
+    return [start + i * step for i in range(max(count, 0))]
+
+def scalar_div(a, b):
+    """a / b for scalars with MATLAB's division by zero (Inf / NaN, no exception)."""
+    try:
+        return a / b
+    except ZeroDivisionError:
+        with np.errstate(all='ignore'):
+            return (np.complex128(a) / b if isinstance(a, complex) else np.float64(a) / b).item()
+
+def scalar_pow(a, b):
+    """a ^ b for scalars; 1x1 arrays use elementwise power, overflow gives Inf."""
+    if isinstance(a, MatlabArray) or isinstance(b, MatlabArray):
+        return MatlabArray(a, copy=False).epow(b)
+    try:
+        p = a ** b
+    except (ZeroDivisionError, OverflowError):
+        with np.errstate(all='ignore'):
+            return np.power(np.complex128(a) if isinstance(a, complex) else np.float64(a), b).item()
+    if type(p) is int and not -2**53 <= p <= 2**53:
+        # Doubles, as in MATLAB
+        try:
+            return float(p)
+        except OverflowError:
+            return np.inf if p > 0 else -np.inf
+    return p
+
+def box_scalar(x):
+    """A plain Python number (inferred scalar code) as the 1x1 MatlabArray the workspace holds."""
+    kind = type(x)
+    if kind is int and not -2**53 <= x <= 2**53:
+        # Doubles, as in MATLAB
+        try:
+            return MatlabArray(float(x))
+        except OverflowError:
+            return MatlabArray(np.inf if x > 0 else -np.inf)
+    if kind is int or kind is float or kind is bool or kind is complex:
+        return MatlabArray(x)
+    return x
+
+def box_scalars(ns, names):
+    """box_scalar on the variables `names` of namespace `ns` that are bound."""
+    for name in names:
+        if name in ns:
+            ns[name] = box_scalar(ns[name])
+
+# -----------------------------------------------------
+# VECTOR RUNTIME (emitted by the transpiler for vectorized for loops)
+# -----------------------------------------------------
+# A vectorized loop evaluates all iterations at once: the counter becomes a
+# 1-D array (int64 for an integer range) and every per-iteration scalar a
+# 1-D array of the same length (or stays a plain scalar when it does not
+# depend on the counter).
+# These helpers raise whenever an operand is not what the loop analysis
+# assumed; the transpiled code then runs the original loop instead.
+
+_ELEMENTWISE = None
+
+def _elementwise_functions():
+    global _ELEMENTWISE
+    if _ELEMENTWISE is None:
+        from . import functions as fn
+        _ELEMENTWISE = {
+            fn.sin, fn.cos, fn.tan, fn.asin, fn.acos, fn.atan, fn.atan2,
+            fn.sinh, fn.cosh, fn.tanh, fn.exp, fn.log, fn.log10, fn.sqrt,
+            fn.abs, fn.sign, fn.floor, fn.ceil, fn.fix, fn.mod, fn.rem,
+            fn.real, fn.imag, fn.conj,
+        }
+    return _ELEMENTWISE
+
+def vector_range(values):
+    """Counter values of a for loop (from for_range): integers for an integer range, else floats."""
+    k = np.asarray(values, dtype=np.int64 if isinstance(values, range) else float)
+    if k.size == 0:
+        raise ValueError("empty loop")
+    return k
+
+def vector_scalar(x):
+    """A loop-invariant operand; it must hold exactly one number."""
+    if isinstance(x, MatlabArray):
+        d = x._data
+        if not isinstance(d, np.ndarray) or d.size != 1 or d.dtype not in _ELEM_DTYPES:
+            raise TypeError("not a numeric scalar")
+        return d.item()
+    if isinstance(x, np.generic):
+        x = x.item()
+    if not isinstance(x, (int, float, complex)):
+        raise TypeError("not a numeric scalar")
+    return x
+
+def _vector_positions(idx, n):
+    """0-based positions of MATLAB indices (scalar or array), all in 1..n."""
+    pos = np.asarray(idx, dtype=float)
+    if np.any(pos != np.floor(pos)) or np.any(pos < 1) or np.any(pos > n):
+        raise IndexError("index is not an in-bounds integer")
+    return pos.astype(np.intp) - 1
+
+def vector_get(x, *idx):
+    """x(i) or x(i, j) for every iteration; indices are scalars or counter-length arrays."""
+    if type(x) is not MatlabArray:
+        raise TypeError("not an array")
+    data = x._data
+    if not isinstance(data, np.ndarray) or data.ndim != 2 or data.dtype not in _ELEM_DTYPES:
+        raise TypeError("not a dense numeric array")
+    rows = data.shape[0]
+    if len(idx) == 1:
+        pos = _vector_positions(idx[0], data.size)
+        return data[pos % rows, pos // rows]
+    if len(idx) == 2:
+        return data[_vector_positions(idx[0], rows), _vector_positions(idx[1], data.shape[1])]
+    raise IndexError("unsupported subscripts")
+
+def vector_target(x, idx):
+    """Checks that x(idx) = values can write every iteration in place (no growth)."""
+    if type(x) is not MatlabArray:
+        raise TypeError("not an array")
+    data = x._data
+    if not isinstance(data, np.ndarray) or data.ndim != 2 or data.dtype not in _ELEM_DTYPES:
+        raise TypeError("not a dense numeric array")
+    _vector_positions(idx, data.size)
+
+def vector_div(a, b):
+    """Elementwise a / b; division by zero gives Inf / NaN."""
+    with np.errstate(all='ignore'):
+        return np.true_divide(a, b)
+
+def vector_pow(a, b):
+    """Elementwise a ^ b; negative bases with fractional exponents give complex results."""
+    base = np.asarray(a)
+    if base.dtype.kind in "biu":
+        base = base.astype(float)
+    if base.dtype.kind == "f" and not np.iscomplexobj(b):
+        e = np.asarray(b, dtype=float)
+        if np.any((base < 0) & (e != np.floor(e))):
+            base = base.astype(complex)
+    with np.errstate(all='ignore'):
+        return np.power(base, b)
+
+def vector_call(f, *args):
+    """An elementwise builtin (sin, sqrt, mod...) applied to every iteration at once."""
+    if f not in _elementwise_functions():
+        raise TypeError("not an elementwise builtin")
+    n = max((a.size for a in args if isinstance(a, np.ndarray) and a.ndim == 1), default=None)
+    wrapped = [MatlabArray(a.reshape(1, -1)) if isinstance(a, np.ndarray) and a.ndim == 1 else a
+               for a in args]
+    result = _to_numpy(f(*wrapped))
+    if n is None:
+        if result.size != 1:
+            raise ValueError("not a scalar result")
+        return result.item()
+    if result.size != n:
+        raise ValueError("result does not match the loop length")
+    return result.reshape(-1)
+
+def vector_reduce(values, n, op):
+    """
+    Sum ('+') or product ('*') over all iterations of a per-iteration value,
+    as a 1x1 MatlabArray. Integer values keep an integer result, like the
+    scalar loop; beyond 2^53 it becomes a double.
+    """
+    values = np.broadcast_to(np.asarray(values), (n,))
+    if values.dtype.kind in "biu":
+        if op == '+' and n * int(np.abs(values).max(initial=0)) < 2**62:
+            total = int(np.sum(values, dtype=np.int64))
+        else:
+            # Exact Python integers: int64 arithmetic would wrap around
+            items = values.tolist()
+            total = sum(items) if op == '+' else int(np.prod(items, dtype=object))
+        if not -2**53 <= total <= 2**53:
+            total = float(total)
+        return MatlabArray(total)
+    with np.errstate(all='ignore'):
+        return MatlabArray((np.sum(values) if op == '+' else np.prod(values)).item())
+
+# -----------------------------------------------------
+# INDEXING RUNTIME (emitted by the transpiler)
+# -----------------------------------------------------
+def matlab_end(x, k, n):
+    """
+    Value of `end` in subscript k (0-based) of n subscripts into x. The
+    last subscript spans all trailing dimensions (numel for A(end)).
+    Anything that is not an array gets the 'end' marker, as before.
+    """
+    if isinstance(x, MatlabArray):
+        shape = x.shape
+    elif isinstance(x, (int, float, complex, bool, np.generic)):
+        shape = (1, 1)
+    else:
+        return 'end'
+    if k < n - 1:
+        return shape[k] if k < len(shape) else 1
+    return int(np.prod(shape[k:]))
+
+def _plan_key(a):
+    """Cache key of one subscript (None: not cacheable)."""
+    if a is colon:
+        return colon
+    if type(a) is MatlabArray:
+        # The plan holds a and its buffer, so these ids cannot be reused
+        return (id(a), id(a._data), a._version)
+    if type(a) is tuple:
+        key = ("span",) + tuple(v if type(v) in (int, float) else _scalar(v) for v in a)
+        return None if None in key else key
+    if isinstance(a, (int, float, np.integer, np.floating)):
+        return a
+    return None
+
+def _subscript(a):
+    """A subscript as A(...) takes it: a (start, stop, step) span becomes its range."""
+    return arange(*a) if type(a) is tuple else a
+
+def _linear_index(rows, size, a):
+    """(row, col) positions of A(a) in an array with `rows` rows, or None (use __call__)."""
+    if a is colon:
+        pos = np.arange(size).reshape(-1, 1)
+    elif type(a) is MatlabArray:
+        arr = _to_numpy(a)
+        if arr.dtype == bool:
+            if arr.size != size:
+                return None
+            pos = np.flatnonzero(arr.flatten(order='F')).reshape(-1, 1)
+        else:
+            pos = arr.astype(int) - 1
+            if pos.size and pos.min() < 0:
+                return None
+    else:
+        pos = int(a) - 1
+        if pos < 0:
+            return None
+    return pos % rows, pos // rows
+
+def _dim_index(dim_len, a):
+    """0-based positions of subscript a along a dimension of length dim_len, or None."""
+    if a is colon:
+        return np.arange(dim_len)
+    if type(a) is MatlabArray:
+        arr = _to_numpy(a)
+        if arr.dtype == bool:
+            return np.nonzero(arr)[0]
+        pos = (arr.astype(int) - 1).flatten()
+    else:
+        pos = np.array([int(a) - 1])
+    # Zero and negative subscripts would wrap around; A(...) reports them
+    return None if pos.size and pos.min() < 0 else pos
+
+class IndexPlan:
+    """
+    One indexing site A(...) inside a loop (emitted by the transpiler).
+
+    The 0-based positions of each subscript are kept and reused while the
+    next call passes the same subscript (the same number, ':', the same
+    unchanged array, or a range with the same bounds) for a target of the
+    same shape, so a loop only converts the subscripts that change, and
+    ranges are not built at all once converted. Ranges are passed as
+    (start, stop, step) tuples. Results are the same as A(...); anything
+    besides a dense 2-D array with one or two subscripts goes through
+    A(...) itself.
+    """
+    __slots__ = ("_keys", "_dims", "_index", "_refs")
+
+    def __init__(self):
+        self._keys = None
+        self._dims = None
+        self._index = None
+        self._refs = None
+
+    def get(self, A, *args):
+        data = A._data if type(A) is MatlabArray else None
+        if type(data) is not np.ndarray or data.ndim != 2 or data.size == 0 or not 1 <= len(args) <= 2:
+            return A(*[_subscript(a) for a in args])
+        keys = [_plan_key(a) for a in args]
+        if None in keys:
+            return A(*[_subscript(a) for a in args])
+        keys.append(data.shape)
+        if keys != self._keys and not self._convert(data, args, keys):
+            return A(*[_subscript(a) for a in args])
+        try:
+            result = data[self._index]
+        except IndexError:
+            if len(args) == 1:
+                raise
+            raise IndexError("Index out of bounds.")
+        if isinstance(result, np.ndarray):
+            return _from_data(result)
+        return MatlabArray(result)
+
+    def _convert(self, data, args, keys):
+        """Converts the subscripts that changed since the last call; False if unsupported."""
+        old = self._keys
+        self._keys = None   # invalid until the conversion succeeds
+        if old is None or old[-1] != keys[-1] or len(old) != len(keys):
+            old = [None] * len(keys)
+            self._dims = [None] * len(args)
+        if len(args) == 1:
+            index = _linear_index(data.shape[0], data.size, _subscript(args[0]))
+            if index is None:
+                return False
+            self._index = index
+        else:
+            for d, a in enumerate(args):
+                if old[d] != keys[d]:
+                    self._dims[d] = _dim_index(data.shape[d], _subscript(a))
+                    if self._dims[d] is None:
+                        return False
+            # Same selection as np.ix_ on the two position vectors
+            self._index = (self._dims[0].reshape(-1, 1), self._dims[1].reshape(1, -1))
+        self._keys = keys
+        self._refs = [(a, a._data) for a in args if type(a) is MatlabArray]
+        return True
+
 def cell(*args):
     if len(args) == 1 and isinstance(args[0], (list, tuple)):
         return MatlabArray(np.array(args[0], dtype=object))
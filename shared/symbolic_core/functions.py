@@ -1,8 +1,12 @@
 # mathex/math/functions.py
 import numpy as np
-import scipy.special
-import sympy 
+import scipy  # scipy.special is loaded on first use (SciPy lazy submodules)
 from .arrays import MatlabArray
+from . import lazy as _lazy
+
+# SymPy is only imported by the symbolic toolbox (syms); until then no
+# value can be symbolic and the numeric paths never touch it.
+sympy = _lazy.LazyModule("sympy")
 
 def _unwrap(x):
     """Extract data from MatlabArray or return as-is."""
@@ -10,6 +14,8 @@ def _unwrap(x):
 
 def _is_symbolic(x):
     """Check if x is a SymPy object (symbol, expression) or contains them."""
+    if not sympy.is_loaded:
+        return False
     if isinstance(x, (sympy.Basic, sympy.Symbol)):
         return True
     if isinstance(x, np.ndarray) and x.dtype == object:
@@ -199,7 +205,13 @@ def fix(x):
 def rem(x, y):
     val_x, val_y = _unwrap(x), _unwrap(y)
     if _is_symbolic(val_x) or _is_symbolic(val_y): return val_x % val_y
-    return MatlabArray(np.remainder(val_x, val_y))
+    # Sign of x (not of y, unlike mod); rem(x, 0) is NaN
+    with np.errstate(all='ignore'):
+        r = np.fmod(val_x, val_y)
+        zero = np.asarray(val_y) == 0
+        if np.any(zero):
+            r = np.where(zero, np.nan, r)
+    return MatlabArray(r)
 
 def mod(x, y):
     val_x, val_y = _unwrap(x), _unwrap(y)
@@ -0,0 +1,96 @@
+"""
+Deferred imports.
+
+SymPy, most of SciPy, pandas, numba, matplotlib, scikit-image and PySide6
+are only needed once a function that uses them is called. These helpers
+keep them out of the kernel's start-up path.
+"""
+import importlib
+import sys
+
+
+class LazyModule:
+    """Module stand-in that imports `name` on first attribute access."""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    @property
+    def is_loaded(self):
+        """True once the module has been imported (by anyone)."""
+        return self._name in sys.modules
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            module = importlib.import_module(self._name)
+            self.__dict__["_module"] = module
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
+
+
+class LazyBuiltin:
+    """
+    Callable placeholder for a builtin that lives in a heavy module.
+    The module is imported on the first call; after that the target is
+    called directly.
+    """
+    __slots__ = ("_module", "_attr", "_target")
+
+    def __init__(self, module, attr):
+        self._module = module
+        self._attr = attr
+        self._target = None
+
+    def resolve(self):
+        target = self._target
+        if target is None:
+            target = getattr(importlib.import_module(self._module), self._attr)
+            self._target = target
+        return target
+
+    def __reduce__(self):
+        # Sent to worker processes by name; the worker imports the module itself
+        return (LazyBuiltin, (self._module, self._attr))
+
+    def __call__(self, *args, **kwargs):
+        target = self._target
+        if target is None:
+            target = self.resolve()
+        return target(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        # Only reached for attributes of the real function (__name__, flags...)
+        if attr in LazyBuiltin.__slots__:
+            raise AttributeError(attr)
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._target is not None else "deferred"
+        return f"<builtin {self._attr} from {self._module} ({state})>"
+
+
+def lazy_exports(package, exports):
+    """
+    PEP 562 `__getattr__` / `__dir__` for a package that re-exports names.
+
+    `exports` maps each public name to (module, attribute); relative module
+    names are resolved against `package`. A name is imported on first access
+    and then cached on the package.
+    """
+    def __getattr__(name):
+        try:
+            module, attr = exports[name]
+        except KeyError:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}") from None
+        value = getattr(importlib.import_module(module, package), attr)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -17,12 +17,13 @@ def _to_numpy(a):
 # EIGENVALUES & DECOMPOSITIONS
 # -----------------------------------------------------------------------------
 
-def eigs(A, k=6, sigma=None, which='LM'):
+def eigs(A, k=6, sigma=None, which='LM', *, nargout=2):
     """
     d = eigs(A, k)
     [V, D] = eigs(A, k)
     
     Sparse eigenvalue solver with automatic dense fallback for robustness.
+    With nargout < 2 only the eigenvalues are returned (a column).
     """
     # 1. Prepare A
     if isinstance(A, MatlabArray):
@@ -79,20 +80,23 @@ def eigs(A, k=6, sigma=None, which='LM'):
         vecs = vecs_all[:, idx[:k]]
 
     # 5. Return
+    if nargout < 2:
+        return MatlabArray(vals.reshape(-1, 1))
     D = np.diag(vals)
     return MatlabArray(vecs), MatlabArray(D)
 
-def eig(a: MatlabArray, k=None, sigma=None):
+def eig(a: MatlabArray, k=None, sigma=None, *, nargout=2):
     """
     Eigenvalues and eigenvectors.
     
     Usage:
+        d = eig(A)           -> Column of eigenvalues (no eigenvectors computed)
         [V, D] = eig(A)      -> Returns ALL eigenvalues (Standard behavior)
         [V, D] = eig(A, k)   -> Returns k subset (Delegates to eigs)
     """
     # [FIX] Smart delegation: If k is provided, use eigs (subset).
     if k is not None:
-        return eigs(a, k=k, sigma=sigma)
+        return eigs(a, k=k, sigma=sigma, nargout=nargout)
     
     # Standard Behavior: Return ALL eigenvalues (Dense)
     data = _to_data(a)
@@ -100,6 +104,12 @@ def eig(a: MatlabArray, k=None, sigma=None):
     # Ensure dense
     if scipy.sparse.issparse(data):
         data = data.toarray()
+
+    if nargout < 2:
+        # Hermitian matrices: real eigenvalues in ascending order, as in MATLAB
+        if np.allclose(data, np.conj(data).T):
+            return MatlabArray(scipy.linalg.eigvalsh(data).reshape(-1, 1))
+        return MatlabArray(scipy.linalg.eigvals(data).reshape(-1, 1))
         
     vals, vecs = scipy.linalg.eig(data)
     # Standard LAPACK returns unsorted. We leave it as is or sort if preferred.
@@ -143,8 +153,22 @@ def cond(a: MatlabArray, p=None):
     data = _to_numpy(a)
     return np.linalg.cond(data, p)
 
-def svd(a: MatlabArray):
+def svd(a: MatlabArray, *, nargout=3):
+    """
+    s = svd(A)            -> Column of singular values (no U, V computed)
+    [U, S, V] = svd(A)
+    """
     data = _to_data(a)
+    if nargout < 2:
+        if scipy.sparse.issparse(data):
+            k = min(6, min(data.shape)-1)
+            if k < 1:
+                s = scipy.linalg.svd(data.toarray(), compute_uv=False)
+            else:
+                s = np.sort(scipy.sparse.linalg.svds(data, k=k, return_singular_vectors=False))[::-1]
+        else:
+            s = scipy.linalg.svd(data, compute_uv=False)
+        return MatlabArray(s.reshape(-1, 1))
     if scipy.sparse.issparse(data):
         k = min(6, min(data.shape)-1)
         if k < 1:
@@ -162,19 +186,35 @@ def svd(a: MatlabArray):
     S = scipy.linalg.diagsvd(s, *data.shape)
     return MatlabArray(u), MatlabArray(S), MatlabArray(vt.conj().T)
 
-def qr(a: MatlabArray):
+def qr(a: MatlabArray, *, nargout=2):
+    """
+    R = qr(A)             -> Upper-triangular factor only (Q not formed)
+    [Q, R] = qr(A)
+    """
     data = _to_data(a)
     if scipy.sparse.issparse(data):
          if data.shape[0] * data.shape[1] > 100_000_000:
              print("Warning: Performing dense QR on large sparse matrix.")
          data = data.toarray() 
+    if nargout < 2:
+        return MatlabArray(scipy.linalg.qr(data, mode='r')[0])
     q, r = scipy.linalg.qr(data)
     return MatlabArray(q), MatlabArray(r)
 
-def lu(a: MatlabArray):
+def lu(a: MatlabArray, *, nargout=3):
+    """
+    Y = lu(A)             -> L and U packed in one matrix (LAPACK getrf)
+    [L, U] = lu(A)        -> L permuted (A = L*U)
+    [L, U, P] = lu(A)
+    """
     data = _to_data(a)
     if scipy.sparse.issparse(data):
         data = data.toarray()
+    if nargout < 2:
+        return MatlabArray(scipy.linalg.lu_factor(data)[0])
+    if nargout == 2:
+        pl, u = scipy.linalg.lu(data, permute_l=True)
+        return MatlabArray(pl), MatlabArray(u)
     p, l, u = scipy.linalg.lu(data)
     return MatlabArray(l), MatlabArray(u), MatlabArray(p)
 
@@ -45,26 +45,45 @@ def std(x, w=0, dim=None):
     ddof = 1 if w==0 else 0
     return MatlabArray(np.std(d, axis=axis, ddof=ddof))
 
-def min_func(a):
+def _extremum(reduce, pick, elementwise, a, b, dim, nargout):
+    """Shared body of min / max."""
+    if b is not None and np.size(b._data if isinstance(b, MatlabArray) else b) > 0:
+        # min(A, B): elementwise
+        return MatlabArray(elementwise(a._data if isinstance(a, MatlabArray) else a,
+                                       b._data if isinstance(b, MatlabArray) else b))
+    d = a._data if isinstance(a, MatlabArray) else np.asarray(a)
+    if d.ndim == 0:
+        d = d.reshape(1, 1)
+    if dim is not None:
+        axis = int(dim) - 1
+    elif d.ndim == 2 and (d.shape[0] == 1 or d.shape[1] == 1):
+        axis = None     # vector: one value
+    else:
+        axis = 0
+    m = reduce(d, axis=axis, keepdims=axis is not None)
+    if nargout < 2:
+        return MatlabArray(m)
+    # [M, I] = min(...): the 1-based index, only computed when asked for
+    if axis is None:
+        return MatlabArray(m), MatlabArray(int(pick(d)) + 1)
+    return MatlabArray(m), MatlabArray(pick(d, axis=axis, keepdims=True) + 1)
+
+def min_func(a, b=None, dim=None, *, nargout=1):
     """
     Minimum elements.
-    min(x)
+    min(x), min(x, [], dim), min(x, y)
+    [m, i] = min(x)
     """
     # Note: MATLAB min(A) returns row vector of mins for matrices
-    d = a._data if isinstance(a, MatlabArray) else a
-    if d.ndim == 2 and (d.shape[0] == 1 or d.shape[1] == 1):
-        return MatlabArray(np.min(d))
-    return MatlabArray(np.min(d, axis=0))
+    return _extremum(np.min, np.argmin, np.minimum, a, b, dim, nargout)
 
-def max_func(a):
+def max_func(a, b=None, dim=None, *, nargout=1):
     """
     Maximum elements.
-    max(x)
+    max(x), max(x, [], dim), max(x, y)
+    [m, i] = max(x)
     """
-    d = a._data if isinstance(a, MatlabArray) else a
-    if d.ndim == 2 and (d.shape[0] == 1 or d.shape[1] == 1):
-        return MatlabArray(np.max(d))
-    return MatlabArray(np.max(d, axis=0))
+    return _extremum(np.max, np.argmax, np.maximum, a, b, dim, nargout)
 
 def sum_func(a):
     """
@@ -123,7 +142,7 @@ def cov(x, y=None):
     y_data = y._data if isinstance(y, MatlabArray) else np.asarray(y)
     return MatlabArray(np.cov(x_data.flatten(), y_data.flatten()))
 
-def histcounts(x, bins=10):
+def histcounts(x, bins=10, *, nargout=2):
     """
     Histogram bin counts.
     [N, edges] = histcounts(x, bins)
@@ -135,6 +154,8 @@ def histcounts(x, bins=10):
     b = int(bins) if isinstance(bins, (int, float)) else np.asarray(bins)
     
     count, edges = np.histogram(x_data, bins=b)
+    if nargout < 2:
+        return MatlabArray(count)
     return MatlabArray(count), MatlabArray(edges)
 
 def nlinfit(X, y, modelfun, beta0):
@@ -6,10 +6,20 @@ class MatlabStruct:
     MATLAB-compatible Structure.
     Behaves like a dictionary but allows dot-access (s.field).
     """
+    # Fields live in __dict__; the change counter is a slot, so vars(s)
+    # holds exactly the fields
+    __slots__ = ("__dict__", "_version")
+
     def __init__(self, **kwargs):
         # We store data in self.__dict__ so that s.x works natively
         for k, v in kwargs.items():
             self.__dict__[k] = v
+        object.__setattr__(self, "_version", 0)
+
+    def __setattr__(self, name, value):
+        # s.field = value: bumped like MatlabArray._version on in-place writes
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, "_version", getattr(self, "_version", 0) + 1)
 
     def __repr__(self):
         # MATLAB-style display
@@ -1,6 +1,7 @@
 import sympy
 import inspect
 from .arrays import MatlabArray
+from .lazy import LazyBuiltin
 import numpy as np
 
 # Use SymPy's printing for pretty output
@@ -13,6 +14,9 @@ def syms(*args):
     """
     # 1. Get the caller's frame (the KernelSession execution scope)
     frame = inspect.currentframe().f_back
+    # Step over the deferred-builtin trampoline (session builtins table)
+    if frame.f_code is LazyBuiltin.__call__.__code__:
+        frame = frame.f_back
     
     # 2. Identify the globals dictionary where variables live
     #    (In Mathex, exec() uses a specific dict, which is frame.f_globals)
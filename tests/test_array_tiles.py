@@ -0,0 +1,102 @@
+import numpy as np
+import scipy.sparse
+
+from ides.mathex.kernel.tiles import (
+    LocalArraySource, CallbackArraySource, TileCache, format_cell
+)
+from shared.symbolic_core.arrays import MatlabArray
+
+
+def test_cells_match_formatting():
+    data = np.arange(12, dtype=float).reshape(3, 4)
+    cache = TileCache(LocalArraySource(data), tile_size=2)
+    for r in range(3):
+        for c in range(4):
+            assert cache.cell(r, c) == format_cell(data[r, c])
+    assert format_cell(1 + 2j) == "1.0000 + 2.0000i"
+
+
+def test_only_visible_tiles_are_fetched():
+    data = np.zeros((10_000, 1_000))
+    cache = TileCache(LocalArraySource(data), tile_size=64)
+
+    for r in range(40):
+        for c in range(10):
+            cache.cell(5_000 + r, 500 + c)
+    # The window straddles at most 2x2 tiles
+    assert cache.fetches <= 4
+
+
+def test_lru_eviction_bounds_memory():
+    data = np.zeros((1_000, 1_000))
+    cache = TileCache(LocalArraySource(data), tile_size=10, max_tiles=8)
+    for r in range(0, 1_000, 10):
+        cache.cell(r, 0)
+    assert len(cache) == 8
+
+    # Recently used tiles survive, the oldest are refetched
+    before = cache.fetches
+    cache.cell(990, 0)
+    assert cache.fetches == before
+    cache.cell(0, 0)
+    assert cache.fetches == before + 1
+
+
+def test_sparse_is_never_densified():
+    # 200k x 200k dense would be 320 GB
+    rows = np.array([0, 150_000, 199_999])
+    cols = np.array([5, 80_000, 199_999])
+    data = scipy.sparse.coo_matrix(([1.0, 2.0, 3.0], (rows, cols)), shape=(200_000, 200_000))
+    src = LocalArraySource(data)
+    assert src.is_sparse and src.shape == (200_000, 200_000)
+
+    cache = TileCache(src)
+    assert cache.cell(150_000, 80_000) == "2.0000"
+    assert cache.cell(150_001, 80_000) == "0.0000"
+
+    src.store(1, 2, 7.5)
+    cache.invalidate(1, 2)
+    assert cache.cell(1, 2) == "7.5000"
+
+
+def test_nd_plane_is_a_view():
+    data = np.arange(2 * 3 * 4 * 5, dtype=float).reshape(2, 3, 4, 5)
+    src = LocalArraySource(data, plane=(2, 1))
+    assert src.shape == (2, 3)
+    np.testing.assert_array_equal(src.fetch(0, 2, 0, 3), data[:, :, 2, 1])
+
+    src.store(1, 1, -1.0)
+    assert data[1, 1, 2, 1] == -1.0
+
+
+def test_matlab_array_and_memmap_are_read_in_place(tmp_path):
+    m = MatlabArray(np.ones((3, 3)))
+    src = LocalArraySource(m)
+    src.store(0, 0, 5)
+    assert m._data[0, 0] == 5 and m._version == 1
+
+    # A buffer still shared with workers is copied, not written through
+    m._data.flags.writeable = False
+    src.store(1, 1, 2j)
+    assert src.data is m._data and m._data[1, 1] == 2j
+
+    mm = np.memmap(tmp_path / "big.dat", dtype="float64", mode="w+", shape=(100_000, 50))
+    mm[99_999, 49] = 3.0
+    src = LocalArraySource(mm)
+    assert src.data is mm
+    assert TileCache(src).cell(99_999, 49) == "3.0000"
+
+
+def test_vectors_scalars_and_remote_sources():
+    assert LocalArraySource(np.arange(5)).fetch(1, 3, 0, 1).tolist() == [[1], [2]]
+    assert TileCache(LocalArraySource(np.float64(2.5))).cell(0, 0) == "2.5000"
+
+    calls = []
+
+    def fetch(r0, r1, c0, c1):
+        calls.append((r0, r1, c0, c1))
+        return np.full((r1 - r0, c1 - c0), 1.0)
+
+    cache = TileCache(CallbackArraySource((100, 100), "float64", fetch), tile_size=50)
+    assert cache.cell(75, 10) == "1.0000"
+    assert calls == [(50, 100, 0, 50)]
@@ -0,0 +1,65 @@
+import sys
+import time
+from PySide6.QtWidgets import QApplication
+from ides.mathex.ui.console import ConsoleWidget
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def test_scrollback_is_bounded():
+    console = ConsoleWidget(max_blocks=500)
+    for n in range(2000):
+        console.append_output(f"line {n}\n")
+    console.execution_finished()
+
+    doc = console.document()
+    assert doc.blockCount() <= 500
+    assert doc.lastBlock().text() == ConsoleWidget.PROMPT
+    assert doc.lastBlock().previous().text() == "line 1999"
+
+
+def test_prompt_lock_survives_trimming():
+    """Dropping old lines must keep the input boundary right after '>> '."""
+    console = ConsoleWidget(max_blocks=50)
+    for n in range(200):
+        console.write_output(f"out {n}")
+
+    assert console.get_current_input() == ""
+    end = console.document().characterCount() - 1
+    assert console.locked_pos == end
+
+
+def test_streamed_chunks_join_mid_line():
+    console = ConsoleWidget()
+    console.initialize()
+    console.append_output("abc")
+    console.append_output("def\nxyz")
+    console.execution_finished()
+
+    lines = console.toPlainText().split("\n")
+    assert lines[-3:] == ["abcdef", "xyz", ConsoleWidget.PROMPT]
+
+
+def test_append_cost_is_constant_after_1e5_lines():
+    """
+    Benchmark: per-append cost must not grow with the transcript.
+    The first and the last 2000 appends out of 10^5 are timed.
+    """
+    console = ConsoleWidget(max_blocks=5000)
+    total, window = 100_000, 2000
+
+    def timed(start):
+        t0 = time.perf_counter()
+        for n in range(start, start + window):
+            console.append_output(f"{n:>8d}    {n * 0.5:12.4f}\n")
+        return time.perf_counter() - t0
+
+    early = timed(0)
+    for n in range(window, total - window):
+        console.append_output(f"{n:>8d}    {n * 0.5:12.4f}\n")
+    late = timed(total - window)
+
+    print(f"\n[Benchmark] early: {early / window * 1e6:.1f} us/append, "
+          f"late: {late / window * 1e6:.1f} us/append")
+    assert console.document().blockCount() <= 5000
+    assert late < 3 * early + 0.05
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from ides.mathex.kernel.executor import execute
+from ides.mathex.kernel.function_runtime import call_function
+from ides.mathex.kernel.session import KernelSession
+from ides.mathex.language.functions import registry
+from ides.mathex.language.transpiler import transpile
+
+FIB = """
+function r = fib(n)
+    if n < 2
+        r = n;
+    else
+        r = fib(n - 1) + fib(n - 2);
+    end
+end
+"""
+
+
+def test_functions_take_positional_parameters():
+    py, _ = transpile(FIB)
+    assert py.startswith("def fib(n=None):") and "nargin" not in py
+
+    py, _ = transpile("function r = f(a, varargin)\n  r = nargin;\nend")
+    assert py.startswith("def f(a=None, *varargin):")
+    assert "nargin = 1 + len(varargin) if varargin else 1 if a is not None else 0" in py
+
+
+def test_call_function_leaves_the_function_scope_alone():
+    s = KernelSession()
+    registry.register_from_source("twice", "def twice(x):\n    return 2 * k * x\n", {"k": 1})
+    try:
+        s.globals["k"] = 50     # a workspace variable is not a global of the function
+        assert call_function("twice", (3,), None, s) == 6
+        assert s.globals["ans"] == 6
+    finally:
+        registry.unregister("twice")
+
+
+def test_recursive_calls():
+    s = KernelSession()
+    execute(FIB + "\nr = fib(15);", s)
+    assert float(s.globals["r"]) == 610
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+@pytest.mark.benchmark
+def test_recursive_call_speed():
+    """
+    Target: fib(25) (242785 calls of a function defined in MATLAB) runs
+    in < 1.0s.
+    """
+    s = KernelSession()
+    execute(FIB + "\nwarm = fib(5);", s)
+    fib = s.globals["fib"]
+
+    start = time.perf_counter()
+    result = fib(25)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n[Benchmark] fib(25): {elapsed:.3f}s ({elapsed / 242785 * 1e6:.2f}us per call)")
+    assert float(result) == 75025
+    assert elapsed < 1.0, f"Recursive calls too slow: {elapsed:.3f}s (Limit: 1.0s)"
@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from ides.mathex.kernel.session import KernelSession, _PLOTTING_NAMES
+from ides.mathex.kernel.executor import execute
+from shared.symbolic_core.lazy import LazyBuiltin
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported before the first prompt
+HEAVY_MODULES = (
+    "sympy", "pandas", "numba", "skimage",
+    "matplotlib", "mpl_toolkits.mplot3d", "PySide6",
+    "scipy.stats", "scipy.optimize", "scipy.integrate",
+    "scipy.signal", "scipy.interpolate", "scipy.linalg",
+)
+
+
+def _importtime(module):
+    """Cumulative import time (us) per module from `python -X importtime`."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=ROOT, env=env, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+def test_session_import_skips_heavy_dependencies():
+    times = _importtime("ides.mathex.kernel.session")
+    loaded = [m for m in HEAVY_MODULES if m in times]
+    assert not loaded, f"Imported at start-up: {loaded}"
+
+
+@pytest.mark.benchmark
+def test_session_import_time():
+    """
+    Target: importing the kernel stays well under a second.
+    Eager imports (SymPy, SciPy, pandas, numba, matplotlib) took ~4s.
+    """
+    times = _importtime("ides.mathex.kernel.session")
+    total = times["ides.mathex.kernel.session"] / 1e6
+
+    print(f"\n[Benchmark] ides.mathex.kernel.session import: {total:.3f}s")
+    slowest = sorted(times.items(), key=lambda kv: kv[1], reverse=True)[:5]
+    for name, us in slowest:
+        print(f"  {us / 1e6:.3f}s  {name}")
+
+    assert total < 1.5, f"Kernel import too slow: {total:.2f}s (Limit: 1.5s)"
+
+
+def _run_cli():
+    """Starts terminal.cli, exits at the first prompt; returns (process, seconds)."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-m", "terminal.cli"],
+        input="exit\n", capture_output=True, text=True, cwd=ROOT, env=env, timeout=60,
+    )
+    return proc, time.perf_counter() - start
+
+
+def test_cli_reaches_prompt():
+    proc, _ = _run_cli()
+    assert ">> " in proc.stdout
+
+
+@pytest.mark.benchmark
+def test_cli_reaches_prompt_quickly():
+    proc, duration = _run_cli()
+
+    print(f"\n[Benchmark] terminal.cli start -> '>>' -> exit: {duration:.3f}s")
+    assert ">> " in proc.stdout
+    assert duration < 3.0, f"CLI start-up too slow: {duration:.2f}s (Limit: 3.0s)"
+
+
+# ==========================================================
+# DEFERRED BUILTINS
+# ==========================================================
+
+def test_deferred_builtins_resolve_on_call():
+    s = KernelSession()
+    assert isinstance(s.globals["eig"], LazyBuiltin)
+
+    execute("v = eig([2 0; 0 3]); m = max([1 5 2]);", s)
+    assert s.globals["m"] == 5
+    # Still the registered builtin, so it is not shown as a variable
+    assert not s.is_user_variable("eig", s.globals["eig"])
+
+
+def test_syms_injects_through_deferred_builtin():
+    s = KernelSession()
+    execute("syms x", s)
+    execute("d = diff(x^2);", s)
+    assert str(s.globals["d"]) == "2*x"
+
+
+def test_plotting_names_match_engine():
+    pytest.importorskip("matplotlib")
+    import shared.plotting_engine as plotting
+    assert set(_PLOTTING_NAMES) == set(plotting.__all__)
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+from ides.mathex.language.incremental import Diagnostic, IncrementalParser
+from ides.mathex.language.parser import Parser
+from ides.mathex.language.tokenizer import Tokenizer
+from tests.test_parser import _library
+
+BROKEN = """x = 1;
+y = (2 + ;
+function r = f(a)
+  r = a +* 2;
+  if = 4
+    q = 1;
+  end
+  z = [1 2
+       3 4];
+end
+w = 5 $ 3;
+end
+for k = 1:3
+  s = k;
+"""
+
+
+def _lines(diagnostics):
+    return [d.line for d in diagnostics]
+
+
+# ==========================================================
+# ERROR RECOVERY
+# ==========================================================
+
+def test_every_syntax_error_is_reported():
+    tree, diagnostics = IncrementalParser().update(BROKEN)
+    assert _lines(diagnostics) == [2, 4, 5, 11, 12, 13]
+    assert diagnostics[3] == Diagnostic(11, "Unexpected character '$'")
+    assert diagnostics[4].message == "'end' without a matching block"
+    assert diagnostics[5].message == "'for' without a matching 'end'"
+    # The statements around the errors are still parsed
+    assert [type(s).__name__ for s in tree.stmts][:3] == ["Assign", "FunctionDef", "Assign"]
+    assert [type(s).__name__ for s in tree.stmts[1].body] == ["Assign"]
+
+
+def test_recover_mode_is_opt_in():
+    with pytest.raises(SyntaxError):
+        Parser(Tokenizer("y = (2 + ;\nx = 1;").iter_tokens()).parse()
+    parser = Parser(Tokenizer("y = (2 + ;\nx = 1;").iter_tokens(), recover=True)
+    assert len(parser.parse().stmts) == 1 and [line for line, _ in parser.errors] == [1]
+    with pytest.raises(SyntaxError):
+        Tokenizer("a = $").tokenize()
+
+
+def test_valid_code_parses_as_with_the_parser():
+    src = _library(300) + "hold on\nx = [1 2\n3 4];\n\n% trailing comment"
+    tree, diagnostics = IncrementalParser().update(src)
+    assert diagnostics == []
+    assert tree == Parser(Tokenizer(src).iter_tokens()).parse()
+
+
+# ==========================================================
+# INCREMENTAL UPDATES
+# ==========================================================
+
+def test_edits_reparse_only_the_touched_chunk():
+    parser = IncrementalParser()
+    parser.update(BROKEN)
+    tree, diagnostics = parser.update(BROKEN.replace("r = a +* 2;", "r = a * 2;"))
+    assert parser.parsed == 1 and _lines(diagnostics) == [2, 5, 11, 12, 13]
+
+    # Lines inserted above shift the reused diagnostics
+    tree, diagnostics = parser.update("% header\n\n" + BROKEN)
+    assert parser.parsed == 2 and _lines(diagnostics) == [4, 6, 7, 13, 14, 15]
+    assert parser.update("")[1] == [] and parser.chunks == []
+
+
+def test_opening_a_block_reparses_what_it_swallows():
+    src = "a = 1;\nb = 2;\nc = 3;\n"
+    parser = IncrementalParser()
+    parser.update(src)
+    tree, diagnostics = parser.update("for k = 1:2\n" + src)
+    assert tree.stmts == [] and _lines(diagnostics) == [1]
+    tree, diagnostics = parser.update("for k = 1:2\n" + src + "end\n")
+    assert len(tree.stmts[0].body) == 3 and diagnostics == []
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+@pytest.mark.benchmark
+def test_incremental_edit_speedup():
+    """
+    Target: after an edit inside one function of a 20,000-line file, the
+    diagnostics update is >20x faster than the initial parse.
+    """
+    src = _library(20000)
+    parser = IncrementalParser()
+    start = time.perf_counter()
+    parser.update(src)
+    initial = time.perf_counter() - start
+
+    lines = src.splitlines(keepends=True)
+    lines[10005] = "    y(k) = w(1) * x(k-1) +* 2;\n"
+    start = time.perf_counter()
+    _, diagnostics = parser.update("".join(lines))
+    edit = time.perf_counter() - start
+
+    print(f"\n[Benchmark] 20000-line file: initial parse {initial:.3f}s, "
+          f"edit {edit * 1e3:.1f}ms ({initial / edit:.0f}x)")
+    assert _lines(diagnostics) == [10006] and parser.parsed == 1
+    assert edit * 20 < initial
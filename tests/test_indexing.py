@@ -0,0 +1,148 @@
+import time
+
+import numpy as np
+import pytest
+
+from ides.mathex.kernel.session import KernelSession
+from ides.mathex.language.transpiler import transpile
+from shared.symbolic_core.arrays import IndexPlan, MatlabArray, arange, colon, matlab_end
+
+
+def _run(code, index_plans=True):
+    s = KernelSession()
+    exec(transpile(code, index_plans=index_plans)[0], s.globals)
+    return s.globals
+
+
+# ==========================================================
+# END
+# ==========================================================
+
+def test_end_arithmetic():
+    g = _run(
+        "x = [10 20 30 40];\nA = [1 2 3; 4 5 6];\n"
+        "a = x(end - 1);\nb = A(end, 1);\nc = A(2, end - 1);\nd = A(end);\n"
+        "e = x(end/2 + 1);\nf = x(x(1)/10:end);\ng = A(1, 2:end);\n"
+        "x(end + 1) = 50;"
+    )
+    assert g["a"] == 30 and g["b"] == 4 and g["c"] == 5 and g["d"] == 6 and g["e"] == 30
+    assert np.array_equal(np.asarray(g["f"]), [[10, 20, 30, 40]])
+    assert np.array_equal(np.asarray(g["g"]), [[2, 3]])
+    assert np.array_equal(np.asarray(g["x"]), [[10, 20, 30, 40, 50]])
+
+
+def test_end_refers_to_the_innermost_subscript():
+    g = _run("x = [5 6 7 8 9];\ni = [1 3];\ny = x(i(end));\nz = x(end - i(end));")
+    assert g["y"] == 7 and g["z"] == 6
+
+
+def test_end_uses_the_shape_at_the_call_site():
+    py = transpile("A = zeros(3, 4);\nb = A(end, end);")[0]
+    assert "A.shape[0]" in py and "A.shape[1]" in py
+    # Unknown targets resolve at runtime
+    assert "_end(B, 0, 1)" in transpile("b = B(end);")[0]
+
+
+def test_matlab_end():
+    A = MatlabArray(np.zeros((3, 4, 2)))
+    assert matlab_end(A, 0, 2) == 3 and matlab_end(A, 1, 2) == 8
+    assert matlab_end(A, 0, 1) == 24 and matlab_end(A, 2, 3) == 2
+    assert matlab_end(5, 0, 1) == 1
+    assert matlab_end("not indexable", 0, 1) == "end"
+
+
+# ==========================================================
+# INDEX PLANS
+# ==========================================================
+
+A = MatlabArray(np.arange(1.0, 31.0).reshape(5, 6, order="F"))
+
+
+@pytest.mark.parametrize("args", [
+    (3,), (4, 2), (colon,), (colon, 2), (4, colon),
+    ((2, 4, 1),), ((1, 5, 2), (6, 1, -1)),
+    (MatlabArray(np.array([[3, 1, 3]])),),
+    (MatlabArray(np.array([[True, False, True, False, True]])), 2),
+])
+def test_plan_matches_direct_indexing(args):
+    plan = IndexPlan()
+    direct = A(*[arange(*a) if type(a) is tuple else a for a in args])
+    for _ in range(2):
+        result = plan.get(A, *args)
+        assert np.array_equal(np.asarray(result), np.asarray(direct))
+
+
+def test_plan_follows_changes_to_the_subscripts():
+    plan = IndexPlan()
+    idx = MatlabArray(np.array([[1, 2]]))
+    x = MatlabArray(np.array([[10.0, 20.0, 30.0]]))
+    assert np.array_equal(np.asarray(plan.get(x, idx)), [[10, 20]])
+    idx.set_val(3, 2)
+    assert np.array_equal(np.asarray(plan.get(x, idx)), [[10, 30]])
+    x.set_val(40.0, 4)    # the target grows
+    assert plan.get(x, 4) == 40
+    assert np.array_equal(np.asarray(plan.get(x, (2, 4, 1))), [[20, 30, 40]])
+
+
+def test_plan_errors():
+    plan = IndexPlan()
+    with pytest.raises(IndexError):
+        plan.get(A, 6, 1)
+    with pytest.raises(IndexError):
+        plan.get(A, 31)
+    # Subscripts the plan does not convert behave exactly as in A(...)
+    for args in ((0,), (1, -1), (MatlabArray(np.array([[True, False]])),)):
+        try:
+            direct = np.asarray(A(*args))
+        except Exception as e:
+            with pytest.raises(type(e)):
+                plan.get(A, *args)
+        else:
+            assert np.array_equal(np.asarray(plan.get(A, *args)), direct)
+
+
+def test_loops_use_plans():
+    code = "x = [1 2 3 4];\ns = 0;\nfor k = 1:3\n  t = x(2:end);\n  s = s + t(1);\nend"
+    py = transpile(code)[0]
+    assert "_ix0 = _IndexPlan()" in py and "_ix0.get(x, (2, x.size, 1))" in py
+    assert py.index("_ix0 = _IndexPlan()") < py.index("for k in")
+    assert "_IndexPlan" not in transpile(code, index_plans=False)[0]
+    assert _run(code)["s"] == _run(code, False)["s"] == 6
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+LOOP = """A = rand(200, 200);
+x = rand(1, 1000);
+idx = [3 7 11 19 23];
+s = 0;
+for k = 1:20000
+    r = A(7, :);
+    c = A(2:end-1, 5);
+    t = x(2:end);
+    u = x(idx);
+    s = s + r(1) + c(1) + t(1) + u(2);
+end
+"""
+
+
+@pytest.mark.benchmark
+def test_index_plan_speedup():
+    """
+    Target: a loop slicing rows, columns and index vectors runs >1.5x
+    faster with cached index plans than through MatlabArray.__call__.
+    """
+    timings = {}
+    results = {}
+    for plans in (False, True):
+        np.random.seed(0)
+        start = time.perf_counter()
+        results[plans] = _run(LOOP, plans)
+        timings[plans] = time.perf_counter() - start
+
+    print(f"\n[Benchmark] 20000-iteration indexing loop: direct {timings[False]:.3f}s, "
+          f"planned {timings[True]:.3f}s ({timings[False] / timings[True]:.1f}x)")
+    assert np.isclose(results[True]["s"], results[False]["s"])
+    assert timings[True] * 1.5 < timings[False]
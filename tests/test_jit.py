@@ -0,0 +1,207 @@
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+
+from ides.mathex.kernel.session import KernelSession
+from ides.mathex.language import jit
+from ides.mathex.language.jit import JitFunction, JitUnsupported, lower_function, ARRAY, SCALAR
+from ides.mathex.language.parser import Parser
+from ides.mathex.language.tokenizer import Tokenizer
+from ides.mathex.language.transpiler import transpile
+from shared.symbolic_core.arrays import MatlabArray
+
+SUMSQ = """function s = sumsq(n)
+%#jit
+s = 0;
+for k = 1:n
+    s = s + k^2;
+end
+end
+"""
+
+SMOOTH = """function y = smooth(x, w)
+n = numel(x);
+y = zeros(1, n);
+for i = 1:n
+    lo = max(1, i - w);
+    hi = min(n, i + w);
+    acc = 0;
+    for j = lo:hi
+        acc = acc + x(j);
+    end
+    y(i) = acc / (hi - lo + 1);
+end
+end
+"""
+
+
+def _function(code):
+    return jit.find_function(Parser(Tokenizer(code).tokenize()).parse(), None)
+
+
+def _interpreted(code, name):
+    """The transpiled (non-jit) function, run against the session builtins."""
+    s = KernelSession()
+    exec(transpile(code)[0], s.globals)
+    return s.globals[name]
+
+
+@pytest.fixture
+def mdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+# ==========================================================
+# LOWERING
+# ==========================================================
+
+def test_lowering_depends_on_argument_kinds():
+    f = _function("function c = mul(a, b)\n c = a * b;\nend")
+    assert "np.dot(a, b)" in lower_function(f, (ARRAY, ARRAY))
+    assert "(a * b)" in lower_function(f, (SCALAR, ARRAY))
+
+
+def test_lowering_uses_zero_based_indexing():
+    src = lower_function(_function("function v = at(A, i, j)\n v = A(i, j) + A(end);\nend"),
+                         (ARRAY, SCALAR, SCALAR))
+    assert "A[_idx(i, A.shape[0]), _idx(j, A.shape[1])]" in src
+    assert "_lin_get(A, float(A.size))" in src
+
+
+@pytest.mark.parametrize("body", [
+    "disp(x);",
+    "y = 'text';",
+    "y = x(1:2);",
+    "y = unknown_function(x);",
+])
+def test_unsupported_bodies(body):
+    f = _function(f"function y = f(x)\ny = x;\n{body}\nend")
+    with pytest.raises(JitUnsupported):
+        lower_function(f, (ARRAY,))
+
+
+def test_anonymous_functions_capture_workspace_values():
+    s = KernelSession()
+    exec(transpile("k = 3;\nA = [1 2; 3 4];\nf = @(t, y) -k * A * y + sin(t);\ng = @(x) helper(x);")[0], s.globals)
+    src, values, kind = jit.lower_anonymous(s.globals["f"], (SCALAR, ARRAY))
+    assert src.startswith("def _jit_anonymous(t, y, k, A):") and "np.sin(t)" in src
+    assert values[0] == 3.0 and np.array_equal(values[1], [[1, 2], [3, 4]]) and kind == ARRAY
+    with pytest.raises(JitUnsupported, match="Call to 'helper'"):
+        jit.lower_anonymous(s.globals["g"], (SCALAR,))
+    with pytest.raises(JitUnsupported, match="defined in MATLAB code"):
+        jit.lower_anonymous(lambda t, y: y, (SCALAR, ARRAY))
+
+
+# ==========================================================
+# EXECUTION
+# ==========================================================
+
+def test_pragma_compiles_on_load(mdir):
+    (mdir / "sumsq.m").write_text(SUMSQ)
+    s = KernelSession()
+    s.execute("a = sumsq(100);")
+    assert s.globals["a"] == sum(k * k for k in range(1, 101))
+    assert isinstance(s.globals["sumsq"], JitFunction)
+
+
+def test_specializations_are_cached_per_signature(mdir):
+    (mdir / "smooth.m").write_text(SMOOTH)
+    s = KernelSession()
+    s.execute("codegen smooth")
+    s.execute("x = rand(1, 50); y = smooth(x, 2); y = smooth(x, 3); z = smooth(x', 1);")
+    f = s.globals["smooth"]
+    assert len(f.specializations) == 1
+
+    x = s.globals["x"]._data[0]
+    ref = np.array([x[max(0, i - 3):i + 4].mean() for i in range(50)])
+    assert np.allclose(s.globals["y"]._data[0], ref)
+    assert s.globals["z"]._data.shape == (1, 50)
+
+    s.execute("q = smooth(x, [2 3]);")
+    assert len(f.specializations) == 2
+
+
+def test_arguments_keep_value_semantics():
+    f = JitFunction(_function("function y = bump(x)\n x(1) = 99;\n y = x;\nend"), None)
+    A = MatlabArray([[1.0, 2.0, 3.0]])
+    y = f(A)
+    assert y._data[0, 0] == 99
+    assert A._data[0, 0] == 1
+
+
+def test_runtime_failure_falls_back_to_interpreter():
+    f = JitFunction(_function("function v = at(x, k)\n v = x(k);\nend"), lambda *a: "interpreted")
+    A = MatlabArray([[1.0, 2.0, 3.0]])
+    assert f(A, 2) == 2.0
+    assert f(A, 10) == "interpreted"
+    # The specialization stays compiled
+    assert list(f.specializations.values())[0] is not None
+
+
+def test_complex_results_match_interpreter():
+    code = "function r = roots3(x)\n r = sqrt(x) + log(x) + x^0.5 + asin(x / 8);\nend"
+    f = JitFunction(_function(code), _interpreted(code, "roots3"))
+    reference = _interpreted(code, "roots3")
+    data = lambda v: np.asarray(getattr(v, "_data", v))
+    for x in (4.0, -4.0):
+        assert np.allclose(data(f(x)), data(reference(x)))
+    assert np.iscomplexobj(data(f(-4.0)))
+
+    code = code.replace("x^0.5", "x.^0.5")
+    f = JitFunction(_function(code), _interpreted(code, "roots3"))
+    x = MatlabArray([[1.0, -2.0]])
+    assert np.allclose(f(x)._data, _interpreted(code, "roots3")(x)._data)
+
+
+def test_scalar_results_and_rem_match_interpreter():
+    code = "function r = myrem(a, b)\n r = rem(a, b);\nend"
+    f = JitFunction(_function(code), _interpreted(code, "myrem"))
+    reference = _interpreted(code, "myrem")
+    assert type(f(7.0, 2.0)) is type(reference(7.0, 2.0)) is MatlabArray
+    assert float(f(7.0, 2.0)) == float(reference(7.0, 2.0)) == 1
+    assert float(f(-7.0, 3.0)) == float(reference(-7.0, 3.0)) == -1
+    assert np.isnan(float(f(5.0, 0.0))) and np.isnan(float(reference(5.0, 0.0)))
+    assert None not in f.specializations.values()
+
+
+def test_unsupported_signature_runs_interpreted(capsys):
+    f = JitFunction(_function("function v = at(x, k)\n v = x(k);\nend"), lambda *a: "interpreted")
+    assert f(3.0, 1) == "interpreted"
+    assert "runs interpreted" in capsys.readouterr().out
+    assert None in f.specializations.values()
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+@pytest.mark.benchmark
+def test_jit_speedup_on_loops():
+    """
+    Target: a compiled scalar loop is >20x faster than the interpreted
+    MatlabArray version once compiled.
+    """
+    interpreted = _interpreted(SUMSQ, "sumsq")
+    compiled = JitFunction(_function(SUMSQ), interpreted)
+    n = 50_000
+
+    start = time.perf_counter()
+    expected = interpreted(n)
+    t_interp = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled(n)
+    t_first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = compiled(n)
+    t_jit = time.perf_counter() - start
+
+    print(f"\n[Benchmark] sumsq({n}): interpreted {t_interp:.3f}s, "
+          f"jit first call {t_first:.3f}s, jit {t_jit * 1e3:.2f}ms ({t_interp / t_jit:.0f}x)")
+    assert np.isclose(float(result), float(expected))
+    assert t_jit * 20 < t_interp
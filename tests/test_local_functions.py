@@ -0,0 +1,187 @@
+import os
+import time
+
+import pytest
+
+from ides.mathex.kernel import executor, loader
+from ides.mathex.kernel.executor import execute
+from ides.mathex.kernel.path_manager import path_manager
+from ides.mathex.kernel.session import KernelSession
+from ides.mathex.language.ast_nodes import FunctionDef
+from ides.mathex.language.functions import registry
+from ides.mathex.language.parser import Parser
+from ides.mathex.language.tokenizer import Tokenizer
+from ides.mathex.language.transpiler import transpile
+
+
+def _write(directory, name, code):
+    with open(os.path.join(directory, f"{name}.m"), "w") as f:
+        f.write(code)
+
+
+def _value(session, name):
+    return float(session.globals[name])
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path_manager.clear_cache()
+    registry.clear()
+    yield str(tmp_path)
+    registry.clear()
+    path_manager.clear_cache()
+
+
+LIBRARY = """function y = lib(x)
+  y = twice(x) + plus_one(x);
+end
+
+function r = twice(x)
+  r = 2 * x;
+end
+
+function r = plus_one(x)
+  r = twice(x) / 2 + 1;
+end
+"""
+
+
+def test_local_functions_load_with_the_file(workdir, monkeypatch):
+    _write(workdir, "lib", LIBRARY)
+    transpiled = []
+    transpile = loader.transpile
+    monkeypatch.setattr(loader, "transpile", lambda *a, **k: transpiled.append(a) or transpile(*a, **k))
+    session = KernelSession()
+    execute("a = lib(3);", session)
+    assert _value(session, "a") == 10.0 and len(transpiled) == 1
+    # Local functions are private to their file
+    assert registry.list_functions() == ["lib"]
+    assert registry.get("lib").calls.isdisjoint({"twice", "plus_one", "x", "r"})
+    execute("b = twice(3);", session)
+    assert "b" not in session.globals
+
+
+def test_function_files_without_end(workdir):
+    _write(workdir, "old_style", "function y = old_style(x)\ny = sub(x) + 1;\n\n"
+                                 "function r = sub(x)\nr = x * 10;\n\nfunction unused()\ndisp(1)\n")
+    session = KernelSession()
+    execute("a = old_style(2);", session)
+    assert _value(session, "a") == 21.0
+
+    tree = Parser(Tokenizer(LIBRARY.replace("end\n", "")).iter_tokens()).parse()
+    assert [s.name for s in tree.stmts] == ["lib", "twice", "plus_one"]
+    assert all(isinstance(s, FunctionDef) and len(s.body) == 1 for s in tree.stmts)
+
+
+def test_nested_functions_share_variables(workdir):
+    _write(workdir, "counter", """function [total, calls] = counter(v)
+  total = 0;
+  add_all();
+  function add_all()
+    for k = 1:numel(v)
+      bump(v(k));
+    end
+  end
+  function bump(x)
+    total = total + x;
+    calls = k_calls();
+  end
+  function n = k_calls()
+    n = numel(v);
+  end
+end
+""")
+    session = KernelSession()
+    execute("[t, n] = counter([1 2 3 4]);", session)
+    assert _value(session, "t") == 10.0 and _value(session, "n") == 4.0
+
+    # The shared variables are declared nonlocal, and only they
+    py, _ = transpile(open(os.path.join(workdir, "counter.m")).read())
+    assert "nonlocal calls, total" in py and py.count("nonlocal") == 1
+
+
+def test_shared_variables_are_not_optimized(workdir):
+    # A loop reading a variable that a nested function writes keeps the read in the loop
+    _write(workdir, "grow", """function s = grow(n)
+  step = 1;
+  s = 0;
+  for k = 1:n
+    s = s + step * 2;
+    double_step();
+  end
+  function double_step()
+    step = step * 2;
+  end
+end
+""")
+    session = KernelSession()
+    execute("a = grow(3);", session)
+    assert _value(session, "a") == 14.0
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+def _helpers(n):
+    calls = " + ".join(f"h{k}(x)" for k in range(n))
+    main = f"function y = main_fn(x)\n  y = {calls};\nend\n"
+    return main, [f"function r = h{k}(x)\n  r = x + {k};\nend\n" for k in range(n)]
+
+
+def _first_calls(tmp_path, monkeypatch, repeat):
+    """
+    First call of a function using 30 helpers, written as local functions
+    of its file ("single") or one file each ("split"): best-of-`repeat`
+    times and the number of files loaded, by layout.
+    """
+    main, helpers = _helpers(30)
+    single, split = tmp_path / "single", tmp_path / "split"
+    single.mkdir()
+    split.mkdir()
+    _write(str(single), "main_fn", main + "\n".join(helpers))
+    _write(str(split), "main_fn", main)
+    for k, code in enumerate(helpers):
+        _write(str(split), f"h{k}", code)
+
+    loads = []
+    load = executor.load_and_register
+    monkeypatch.setattr(executor, "load_and_register", lambda *a: loads.append(a[0]) or load(*a))
+    times, counts = {}, {}
+    for directory in (single, split):
+        monkeypatch.chdir(directory)
+        best = float("inf")
+        for _ in range(repeat):
+            path_manager.clear_cache()
+            registry.clear()
+            session = KernelSession()
+            loads.clear()
+            start = time.perf_counter()
+            execute("a = main_fn(1);", session)
+            best = min(best, time.perf_counter() - start)
+            assert _value(session, "a") == 30 + sum(range(30))
+        times[directory.name], counts[directory.name] = best, len(loads)
+    registry.clear()
+    path_manager.clear_cache()
+    return times, counts
+
+
+def test_library_file_loads_once(tmp_path, monkeypatch):
+    # One NameError round-trip, path lookup and transpile per helper file
+    _, counts = _first_calls(tmp_path, monkeypatch, 1)
+    assert counts == {"single": 1, "split": 31}
+
+
+@pytest.mark.benchmark
+def test_library_file_load_speedup(tmp_path, monkeypatch):
+    """
+    Target: the first call of a function using 30 helpers is >1.5x faster
+    when they are local functions of its file (one file loaded) than as
+    31 files (best of 3).
+    """
+    times, _ = _first_calls(tmp_path, monkeypatch, 3)
+
+    print(f"\n[Benchmark] first call with 30 helpers: one file {times['single'] * 1e3:.1f}ms, "
+          f"31 files {times['split'] * 1e3:.1f}ms ({times['split'] / times['single']:.1f}x)")
+    assert times["single"] * 1.5 < times["split"]
@@ -0,0 +1,126 @@
+import time
+
+import numpy as np
+import pytest
+
+from ides.mathex.kernel.executor import execute
+from ides.mathex.kernel.session import KernelSession
+from ides.mathex.language.builtins import call_nargout, sort
+from ides.mathex.language.transpiler import transpile
+from shared.symbolic_core.arrays import MatlabArray
+from shared.symbolic_core.linalg import eig, lu, qr, svd
+
+
+def _run(code):
+    s = KernelSession()
+    execute(code, s)
+    return s.globals
+
+
+def _np(x):
+    return np.asarray(x._data if isinstance(x, MatlabArray) else x)
+
+
+def test_user_functions_return_what_is_asked_for():
+    g = _run("""
+function [a, b, c] = parts(x)
+    a = x;
+    if nargout < 2
+        return
+    end
+    b = 2 * x;
+    c = 3 * x;
+end
+
+one = parts(5);
+[p, q] = parts(5);
+[r, s, t] = parts(5);
+""")
+    assert float(g["one"]) == 5 and not isinstance(g["one"], tuple)
+    assert (float(g["p"]), float(g["q"])) == (5, 10)
+    assert float(g["t"]) == 15
+    py, _ = transpile("function [a, b] = f(x)\n  a = x; b = x;\nend\n[u, v] = f(1);")
+    assert "def f(x=None, *, nargout=1):" in py
+    assert "return a if nargout < 2 else (a, b)" in py
+    assert "u, v = _nargout(2, f, 1)" in py
+
+
+def test_builtins_skip_unused_outputs():
+    g = _run("""
+A = [2 1 0; 1 3 1; 0 1 4];
+d = eig(A);
+[V, D] = eig(A);
+sv = svd(A);
+R = qr(A);
+Y = lu(A);
+[L, U] = lu(A);
+[m, i] = max([4 9 1 9]);
+[lo, j] = min([4 9 1 9]);
+[srt, k] = sort([3 1 2 1], 'descend');
+n = histcounts([1 2 2 3], 3);
+[x1, x2] = deal(7);
+""")
+    A = np.array([[2, 1, 0], [1, 3, 1], [0, 1, 4.0]])
+    assert _np(g["d"]).shape == (3, 1)
+    assert np.allclose(_np(g["d"]).ravel(), np.linalg.eigvalsh(A))
+    assert np.allclose(A @ _np(g["V"]), _np(g["V"]) @ _np(g["D"]))
+    assert np.allclose(_np(g["sv"]).ravel(), np.linalg.svd(A, compute_uv=False))
+    assert np.allclose(np.abs(_np(g["R"])), np.abs(np.linalg.qr(A)[1]))
+    assert np.allclose(_np(g["L"]) @ _np(g["U"]), A)
+    assert (float(g["m"]), float(g["i"]), float(g["lo"]), float(g["j"])) == (9, 2, 1, 3)
+    assert _np(g["srt"]).tolist() == [[3, 2, 1, 1]] and _np(g["k"]).tolist() == [[1, 3, 2, 4]]
+    assert _np(g["n"]).tolist() == [[1, 2, 1]]
+    assert (float(g["x1"]), float(g["x2"])) == (7, 7)
+
+
+def test_sort_descend_matches_for_one_and_two_outputs():
+    nan = float("nan")
+    for data in (np.array([[3, nan, 1, 2, 3]]), np.array([[3, 0, 200, 3]], dtype=np.uint8)):
+        x = MatlabArray(data)
+        one = _np(call_nargout(1, sort, x, "descend"))
+        two, idx = call_nargout(2, sort, x, "descend")
+        assert np.array_equal(one, _np(two), equal_nan=True)
+        assert np.array_equal(_np(two), data[:, _np(idx).ravel() - 1], equal_nan=True)
+    assert _np(idx).tolist() == [[3, 1, 4, 2]]
+    one = _np(call_nargout(1, sort, MatlabArray(np.array([[3, nan, 1, 2, 3]])), "descend"))
+    assert np.isnan(one[0, 0]) and one[0, 1:].tolist() == [3, 3, 2, 1]
+    _, idx = call_nargout(2, sort, MatlabArray(np.array([[3, nan, 1, 2, 3]])), "descend")
+    assert _np(idx).tolist() == [[2, 1, 5, 4, 3]]
+
+
+def test_python_callers_keep_every_output():
+    A = MatlabArray(np.array([[4.0, 1], [2, 3]]))
+    assert len(eig(A)) == 2 and len(svd(A)) == 3 and len(qr(A)) == 2 and len(lu(A)) == 3
+    # Functions without a nargout keyword are called as they are
+    assert call_nargout(2, lambda x: (x, x + 1), 1) == (1, 2)
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+@pytest.mark.benchmark
+def test_eigenvalues_only_speedup():
+    """
+    Target: d = eig(A) on a symmetric 400x400 matrix is >3x faster than
+    computing [V, D] (the eigenvectors are no longer computed and thrown
+    away, and the symmetric solver is used).
+    """
+    rng = np.random.default_rng(0)
+    B = rng.standard_normal((400, 400))
+    A = MatlabArray(B + B.T)
+
+    start = time.perf_counter()
+    for _ in range(3):
+        call_nargout(2, eig, A)
+    both = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(3):
+        d = call_nargout(1, eig, A)
+    values = time.perf_counter() - start
+
+    print(f"\n[Benchmark] eig, symmetric 400x400: [V, D] {both / 3 * 1e3:.1f}ms, "
+          f"d {values / 3 * 1e3:.1f}ms ({both / values:.1f}x)")
+    assert _np(d).shape == (400, 1)
+    assert values * 3 < both
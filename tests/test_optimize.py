@@ -0,0 +1,213 @@
+import time
+
+import numpy as np
+
+from ides.mathex.kernel.session import KernelSession
+from ides.mathex.language.ast_nodes import Assign, Number, UnaryOp
+from ides.mathex.language.optimize import optimize
+from ides.mathex.language.parser import Parser
+from ides.mathex.language.tokenizer import Tokenizer
+from ides.mathex.language.transpiler import transpile
+
+
+def _parse(code):
+    return Parser(Tokenizer(code).tokenize()).parse()
+
+
+def _run(code, optimize):
+    s = KernelSession()
+    exec(transpile(code, optimize=optimize)[0], s.globals)
+    return s.globals
+
+
+def _hoisted(py):
+    return [line.strip() for line in py.splitlines() if line.strip().startswith("_hoisted_")]
+
+
+# ==========================================================
+# CONSTANT FOLDING
+# ==========================================================
+
+def test_arithmetic_on_literals_folds():
+    tree = optimize(_parse("a = 2^10 - 3 * 4;\nb = -pi / 2;\nc = sqrt(2) * 2;\nd = 1 / 4;"), hoist=False)
+    values = {s.target: s.value for s in tree.stmts}
+    assert values["a"] == Number("1012")
+    assert values["b"] == UnaryOp("-", Number(repr(np.pi / 2)))
+    assert values["c"] == Number(repr(float(np.sqrt(2)) * 2))
+    assert values["d"] == Number("0.25")
+
+
+def test_folding_leaves_unsafe_expressions():
+    code = "a = 1 / 0;\nb = (-8) ^ (1 / 3);\nc = sqrt(-1);\nd = 2 * 3i;\npi = 3;\ne = pi * 2;"
+    tree = optimize(_parse(code), hoist=False)
+    values = {s.target: s.value for s in tree.stmts if isinstance(s, Assign)}
+    for name in ("a", "c", "d", "e"):
+        assert not isinstance(values[name], Number), name
+    # The exponent folds, the complex power stays
+    assert values["b"].right == Number(repr(1 / 3))
+
+
+# ==========================================================
+# HOISTING
+# ==========================================================
+
+def test_invariant_builtins_move_out_of_loops():
+    code = (
+        "x = rand(1, 10);\nn = 10;\ns = 0;\n"
+        "for k = 1:n\n  s = s + x(k) * length(x) + sum([1 2 3]);\n"
+        "  for j = 1:n-1\n    s = s + size(x, 2);\n  end\nend"
+    )
+    py = transpile(code)[0]
+    # sum may raise: only its argument moves
+    assert _hoisted(py) == [
+        "_hoisted_1 = length(x)",
+        "_hoisted_2 = mat([[1, 2, 3]])",
+        "_hoisted_0 = size(x, 2)",
+        "_hoisted_3 = (n - 1)",
+    ]
+    # Temporaries are computed before the outer loop
+    assert py.index("_hoisted_0 =") < py.index("for k in")
+    assert "sum(_hoisted_2)" in py
+    assert "_for_range(1, _hoisted_3, 1)" in py
+
+
+def test_variant_and_impure_expressions_stay():
+    code = (
+        "x = zeros(1, 3);\nn = 3;\nfor k = 1:n\n"
+        "  a = numel(x);\n  x(k) = k;\n"          # x changes in the loop
+        "  b = rand(1);\n  c = f(n * 2);\n"         # impure, user function
+        "  d = x(2) + k * 2;\n"                     # indexing, loop variable
+        "end"
+    )
+    assert _hoisted(transpile(code)[0]) == []
+    assert _hoisted(transpile("for k = 1:3\n  a = numel(y);\nend")[0]) == []
+    assert _hoisted(transpile("x = 1;\nfor k = 1:3\n  eval('x = [1 2];');\n  a = numel(x);\nend")[0]) == []
+
+
+def test_names_not_yet_bound_are_not_hoisted():
+    # Hoisting length(z) would raise before the loop ever reads it
+    code = "for k = 1:3\n  if k > 5\n    a = length(z);\n  end\nend\nz = 1;"
+    assert _hoisted(transpile(code)[0]) == []
+    # Optional arguments (nargin checks) are not treated as bound
+    fn = "function y = f(x, w)\nif nargin < 2\n  y = 0; return;\nend\ny = 0;\nfor k = 1:3\n  y = y + numel(w);\nend\nend"
+    assert _hoisted(transpile(fn)[0]) == []
+    fn = fn.replace("if nargin < 2\n  y = 0; return;\nend\n", "")
+    assert _hoisted(transpile(fn)[0]) == ["_hoisted_0 = numel(w)"]
+
+
+def test_only_code_that_runs_is_hoisted():
+    # A loop that may not run, a branch, a try body, code after a break
+    for code in (
+        "n = 0;\nfor k = 1:n\n  a = length(x);\nend",
+        "for k = 1:3\n  if k > 5\n    a = length(x);\n  end\nend",
+        "for k = 1:3\n  try\n    a = length(x);\n  catch\n  end\nend",
+        "for k = 1:3\n  if k > 1\n    break;\n  end\n  a = length(x);\nend",
+        "while k < 3\n  k = k + 1;\n  a = length(x);\nend",
+    ):
+        assert _hoisted(transpile("x = [1 2 3];\nk = 0;\n" + code)[0]) == [], code
+    code = "x = [1 2 3];\nn = 2;\nfor k = 1:n+1\n  a = length(x);\n  if k > 5\n    break;\n  end\nend"
+    assert _hoisted(transpile(code)[0]) == ["_hoisted_0 = length(x)"]
+
+
+def _session(*commands):
+    s = KernelSession()
+    for code in commands:
+        s.execute(code)
+    return s.globals
+
+
+def test_skipped_code_does_not_raise(capsys):
+    _session("a = [1 2 3];\nb = [1 2];\nfor k = 1:0\n  y = mod(a, b);\nend")
+    _session("x = 'abc';\nfor k = 1:3\n  if k > 5\n    n = norm(x);\n  end\nend")
+    g = _session("a = [1 2 3];\nb = [1 2];\nfor k = 1:3\n  try\n    y = mod(a, b);\n"
+                 "  catch\n    y = -1;\n  end\nend")
+    assert "Error" not in capsys.readouterr().out
+    assert float(g["y"]) == -1
+
+
+def test_workspace_variables_shadow_builtins(capsys):
+    g = _session("numel = [5 6 7];", "s = 0;\nfor k = 1:3\n  s = s + numel(2);\nend",
+                 "pi = 3;", "t = pi * 2;")
+    assert "Error" not in capsys.readouterr().out
+    assert float(g["s"]) == 18
+    assert float(g["t"]) == 6
+
+
+def test_pass_toggle():
+    code = "x = [1 2 3];\nfor k = 1:3\n  y = length(x) * (2 + 3);\nend"
+    assert _hoisted(transpile(code)[0]) == ["_hoisted_0 = (length(x) * 5)"]
+    plain = transpile(code, optimize=False)[0]
+    assert not _hoisted(plain) and "(2 + 3)" in plain
+
+
+# ==========================================================
+# SEMANTICS (optimized and plain code agree)
+# ==========================================================
+
+SCRIPT = """x = linspace(0, 2, 50);
+w = [0.25 0.5 0.25];
+n = numel(x);
+y = zeros(1, n);
+m = 0;
+for k = 2:n-1
+    y(k) = sum(w .* x(k-1:k+1)) * cos(pi / 4) + length(x) / 2^3;
+    j = 0;
+    while j < size(w, 2)
+        j = j + 1;
+        m = m + y(k) * w(j);
+    end
+    if mod(k, 7) == 0
+        x(k) = -x(k);
+    end
+end
+z = y';
+"""
+
+
+def test_optimized_code_matches_plain_code():
+    fast, slow = _run(SCRIPT, True), _run(SCRIPT, False)
+    for name in ("x", "y", "z", "m", "j"):
+        assert np.allclose(np.asarray(fast[name]), np.asarray(slow[name])), name
+    assert not any(name.startswith("_hoisted_") for name in KernelSession().globals)
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+NUMERICAL = """n = 4000;
+t = linspace(0, 10, n);
+x = sin(t);
+y = zeros(1, n);
+w = [0.25 0.5 0.25];
+e = 0;
+for k = 2:n-1
+    deg = x(k) * 180 / pi;
+    y(k) = (x(k+1) - x(k-1)) / (2 * (t(2) - t(1))) * sum([0.25 0.5 0.25]) + deg * pi / 180;
+    e = e + abs(y(k)) / length(x) + numel(t) * 0;
+    for j = 1:numel(w)
+        e = e + x(j) * 2^-4;
+    end
+end
+"""
+
+
+def test_optimization_speedup_on_numerical_scripts():
+    """
+    Folding and hoisting on a typical loop-heavy script (literal matrices,
+    length/numel calls and constant factors inside the loop). The speedup
+    (about 1.4-1.8x here) is printed, not asserted: one run of each is too
+    noisy for a threshold in the full suite.
+    """
+    _run(NUMERICAL.replace("n = 4000", "n = 10"), False)  # resolve lazy builtins
+    timings = {}
+    results = {}
+    for enabled in (False, True):
+        start = time.perf_counter()
+        results[enabled] = _run(NUMERICAL, enabled)
+        timings[enabled] = time.perf_counter() - start
+
+    print(f"\n[Benchmark] numerical script: plain {timings[False]:.3f}s, "
+          f"optimized {timings[True]:.3f}s ({timings[False] / timings[True]:.1f}x)")
+    assert np.allclose(results[True]["y"]._data, results[False]["y"]._data)
+    assert np.isclose(float(results[True]["e"]), float(results[False]["e"]))
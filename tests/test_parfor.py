@@ -0,0 +1,219 @@
+import os
+import pickle
+import time
+
+import numpy as np
+import pytest
+
+from ides.mathex.kernel.session import KernelSession
+from ides.mathex.kernel.executor import execute
+from ides.mathex.kernel import parallel, futures
+from ides.mathex.language.parser import Parser
+from ides.mathex.language.tokenizer import Tokenizer
+from ides.mathex.language.parfor import classify_parfor
+from shared.symbolic_core.arrays import MatlabArray, colon, mat
+
+SWEEP = """
+s = 0; y = zeros(1, 12); c = [];
+parfor (i = 1:12, {workers})
+    t = a * i;
+    y(i) = t^2;
+    s = s + t;
+    c = [c, i];
+end
+"""
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _shutdown_pool():
+    yield
+    parallel.shutdown_pool()
+
+
+def _parse_parfor(code):
+    return Parser(Tokenizer(code).tokenize()).parse().stmts[0]
+
+
+def _run(code, **variables):
+    s = KernelSession()
+    s.globals.update(variables)
+    execute(code, s)
+    return s.globals
+
+
+# ==========================================================
+# CLASSIFICATION
+# ==========================================================
+
+def test_classify_variables():
+    node = _parse_parfor(
+        "parfor (i = 1:n, 4)\n t = a(i) * k;\n y(i) = t;\n s = s + t;\n m = max(m, t);\nend"
+    )
+    plan = classify_parfor(node)
+    assert plan.loop_var == "i"
+    assert plan.sliced == ["y"]
+    assert plan.reductions == {"s": "+", "m": "max"}
+    assert plan.temporaries == ["t"]
+    assert plan.broadcast == ["a", "k", "max"]
+
+
+@pytest.mark.parametrize("body", [
+    "if i > 2\n break\n end",
+    "i = 3;",
+    "s = s + i;\n disp(s)",
+    "y(1) = i;",
+])
+def test_invalid_bodies_are_rejected(body):
+    with pytest.raises(SyntaxError):
+        classify_parfor(_parse_parfor(f"parfor i = 1:4\n{body}\nend"))
+
+
+def test_matlab_array_pickles():
+    A = mat([[1, 2], [3, 4]])
+    B = pickle.loads(pickle.dumps(A))
+    assert isinstance(B, MatlabArray)
+    assert np.array_equal(B._data, A._data)
+    # `:` stays the singleton that indexing compares against
+    assert pickle.loads(pickle.dumps(colon)) is colon
+
+
+# ==========================================================
+# EXECUTION
+# ==========================================================
+
+def test_serial_parfor_matches_for_loop():
+    g = _run(SWEEP.format(workers=0), a=2)
+    assert float(g["s"]) == 156
+    assert np.array_equal(g["y"]._data, (2 * np.arange(1, 13)).reshape(1, -1) ** 2)
+    assert np.array_equal(g["c"]._data, np.arange(1, 13).reshape(1, -1))
+
+
+def test_parallel_parfor_matches_serial():
+    serial = _run(SWEEP.format(workers=0), a=3)
+    par = _run(SWEEP.format(workers=2), a=3)
+    assert parallel.pool_size() == 2
+    for name in ("s", "y", "c"):
+        assert np.array_equal(np.asarray(par[name]._data), np.asarray(serial[name]._data))
+
+
+def test_parallel_output_keeps_loop_order(capsys):
+    _run("parfor (k = 1:6, 2)\n disp(k)\nend")
+    lines = capsys.readouterr().out.split()
+    assert lines == ["1", "2", "3", "4", "5", "6"]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_sliced_output_reads_back_its_writes(workers):
+    code = (f"y = zeros(1, 4); z = zeros(1, 4);\nparfor (i = 1:4, {workers})\n"
+            " y(i) = i * 10;\n z(i) = y(i) + 1;\nend")
+    g = _run(code)
+    assert np.array_equal(g["y"]._data, np.array([[10, 20, 30, 40]]))
+    assert np.array_equal(g["z"]._data, np.array([[11, 21, 31, 41]]))
+
+
+def test_anonymous_function_is_broadcast():
+    g = _run("f = @(x) x.^2 + 1; z = zeros(1, 5);\nparfor (k = 1:5, 2)\n z(k) = f(k);\nend")
+    assert np.array_equal(g["z"]._data, np.array([[2, 5, 10, 17, 26]]))
+
+
+def test_workers_load_functions_from_current_folder(tmp_path, monkeypatch):
+    (tmp_path / "triple.m").write_text("function r = triple(x)\n r = 3 * x;\nend\n")
+    monkeypatch.chdir(tmp_path)
+    g = _run("s = 0;\nparfor (k = 1:4, 2)\n s = s + triple(k);\nend")
+    assert float(g["s"]) == 30
+
+
+def test_undefined_reduction_variable():
+    with pytest.raises(NameError):
+        parallel.parfor_run({}, None, mat([[1, 2]]), "", "i", (), (("s", "+"),), (), 0)
+
+
+# ==========================================================
+# PARFEVAL
+# ==========================================================
+
+def test_parfeval_returns_before_completion():
+    s = KernelSession()
+    s.execute("f = parfeval(@(n) pause(n), 0, 0.5);")
+    assert s.globals["f"].State in ("queued", "running")
+    s.execute("tf = wait(f, 'finished', 5);")
+    assert s.globals["tf"] is True and s.globals["f"].State == "finished"
+
+
+def test_fetch_outputs():
+    s = KernelSession()
+    s.execute("f = parfeval(@(x, y) x + y, 1, 2, 3);")
+    s.execute("r = fetchOutputs(f);")
+    assert float(s.globals["r"]) == 5
+
+    s.execute("g = parfeval(@det, 1, [2 0; 0 5]);")
+    s.execute("d = fetchOutputs(g);")
+    assert np.isclose(float(s.globals["d"]), 10)
+
+
+def test_fetch_outputs_from_m_function(tmp_path, monkeypatch):
+    (tmp_path / "twice.m").write_text("function [a, b] = twice(x)\n a = x + 0;\n b = 2 * x;\nend\n")
+    monkeypatch.chdir(tmp_path)
+    s = KernelSession()
+    s.execute("f = parfeval(@twice, 2, 21);")
+    s.execute("[a, b] = fetchOutputs(f);")
+    assert float(s.globals["a"]) == 21 and float(s.globals["b"]) == 42
+
+
+def test_fetch_outputs_raises_remote_error():
+    f = futures.parfeval(lambda x: x.no_such_attribute, 1, 1)
+    with pytest.raises(RuntimeError, match="futures resulted in an error"):
+        futures.fetchOutputs(f)
+
+
+def test_wait_timeout_and_cancel():
+    f = futures.parfeval(time.sleep, 0, 1.0)
+    assert futures.wait(f, "finished", 0.05) is False
+    futures.cancel(f)
+    assert f.State == "finished"
+    with pytest.raises(RuntimeError, match="cancelled"):
+        futures.fetchOutputs(f)
+
+
+def test_after_each_runs_on_client(capsys):
+    s = KernelSession()
+    s.execute("f = parfeval(@(x) [x, 2*x], 1, 4);")
+    s.execute("a = afterEach(f, @(v) sum(v), 1);")
+    s.execute("t = fetchOutputs(a);")
+    assert float(s.globals["t"]) == 12
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs at least 2 CPU cores")
+def test_parfor_speedup():
+    """
+    Target: a CPU-bound sweep runs faster with a warm pool than serially.
+    """
+    workers = min(4, os.cpu_count())
+    code = """
+r = zeros(1, 16);
+parfor (k = 1:16, {workers})
+    A = rand(120);
+    for j = 1:15
+        A = A * A';
+        A = A / norm(A);
+    end
+    r(k) = sum(diag(A));
+end
+"""
+    parallel.get_pool(workers)
+
+    start = time.perf_counter()
+    _run(code.format(workers=0))
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _run(code.format(workers=workers))
+    par = time.perf_counter() - start
+
+    print(f"\n[Benchmark] parfor sweep: serial {serial:.3f}s, {workers} workers {par:.3f}s "
+          f"({serial / par:.2f}x)")
+    assert par < serial, f"parfor slower than serial: {par:.2f}s vs {serial:.2f}s"
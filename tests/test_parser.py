@@ -0,0 +1,111 @@
+import time
+import tracemalloc
+
+import pytest
+
+from ides.mathex.language.ast_nodes import Assign, BinOp, Call, End, Number, Variable
+from ides.mathex.language.parser import Parser
+from ides.mathex.language.tokenizer import Token, Tokenizer
+
+BLOCK = """function y = f{n}(x, w)
+% smoothing kernel {n}
+y = zeros(1, numel(x));
+for k = 2:numel(x) - 1
+    y(k) = w(1) * x(k-1) + w(2) * x(k) + w(3) * x(k+1);
+    if y(k) > 1e3
+        y(k) = sqrt(abs(y(k))) / 2.5;
+    end
+end
+s = struct('a', [1 -2 3; 4 5 6]', 'b', 'text');
+end
+"""
+
+
+def _library(lines):
+    return "".join(BLOCK.replace("{n}", str(i)) for i in range(lines // 11 + 1))
+
+
+# ==========================================================
+# TOKEN STREAM
+# ==========================================================
+
+def test_token_stream_matches_token_list():
+    src = _library(100)
+    stream = Tokenizer(src).iter_tokens()
+    assert next(stream) == Token('KEYWORD', 'function', 1)
+    assert [next(stream) for _ in range(3)] == Tokenizer(src).tokenize()[1:4]
+    assert list(Tokenizer(src).iter_tokens())[-1].type == 'EOF'
+
+
+def test_transpose_and_strings_in_stream():
+    tokens = Tokenizer("a = [1 -2]'; b = 'text'; c = x.';").tokenize()
+    assert ('OP', "'") in [(t.type, t.value) for t in tokens]
+    assert ('OP', ".'") in [(t.type, t.value) for t in tokens]
+    assert [t.value for t in tokens if t.type == 'STRING'] == ['text']
+    assert [t.value for t in tokens if t.type == 'NUMBER'] == ['1', '-2']
+
+
+def test_tokens_and_nodes_have_no_instance_dict():
+    assert not hasattr(Token('ID', 'x'), '__dict__')
+    tree = Parser(Tokenizer("y(end) = a + 1;").iter_tokens()).parse()
+    assert tree.stmts == [Assign(Call(Variable('y'), [End()]), BinOp(Variable('a'), '+', Number('1')))]
+    assert not hasattr(tree, '__dict__') and not hasattr(tree.stmts[0].value, '__dict__')
+
+
+def test_parser_reads_lists_and_iterators_alike():
+    src = _library(200) + "hold on\nx = 3;"
+    assert Parser(Tokenizer(src).iter_tokens()).parse() == Parser(Tokenizer(src).tokenize()).parse()
+
+
+def test_lookahead_past_end():
+    p = Parser(iter(Tokenizer("x").tokenize()))
+    assert p.lookahead().type == 'EOF' and p.lookahead(5).type == 'EOF'
+    assert p.consume('ID').value == 'x' and p.curr().type == 'EOF'
+
+
+def test_parse_library():
+    src = _library(1100)
+    tree = Parser(Tokenizer(src).iter_tokens()).parse()
+    assert len(tree.stmts) == 1100 // 11 + 1
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+def _peak_memory(parse):
+    tracemalloc.start()
+    try:
+        tree = parse()
+        return tracemalloc.get_traced_memory()[1], tree
+    finally:
+        tracemalloc.stop()
+
+
+def test_streamed_parse_memory():
+    """
+    Target: parsing from the token stream peaks at under half the memory
+    of parsing a materialized token list.
+    """
+    src = _library(5000)
+    listed, _ = _peak_memory(lambda: Parser(Tokenizer(src).tokenize()).parse())
+    streamed, _ = _peak_memory(lambda: Parser(Tokenizer(src).iter_tokens()).parse())
+
+    print(f"\n[Benchmark] 5000-line parse peak: token list {listed / 1e6:.1f}MB, "
+          f"stream {streamed / 1e6:.1f}MB")
+    assert streamed * 2 < listed
+
+
+@pytest.mark.benchmark
+def test_parse_50k_line_library():
+    """
+    Target: a 50,000-line .m library tokenizes and parses in under 6 s.
+    """
+    src = _library(50000)
+    start = time.perf_counter()
+    tree = Parser(Tokenizer(src).iter_tokens()).parse()
+    duration = time.perf_counter() - start
+
+    print(f"\n[Benchmark] 50000-line parse: {duration:.3f}s ({len(tree.stmts)} functions)")
+    assert len(tree.stmts) == 50000 // 11 + 1
+    assert duration < 6.0, f"Parsing too slow: {duration:.2f}s (Limit: 6.0s)"
@@ -0,0 +1,139 @@
+import os
+import time
+
+import pytest
+
+from ides.mathex.kernel import path_manager as pm
+from ides.mathex.kernel.path_manager import PathManager
+
+
+def _touch(directory, *names):
+    for name in names:
+        with open(os.path.join(directory, name), "w") as f:
+            f.write("x = 1;\n")
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    cwd, a, b = (tmp_path / d for d in ("cwd", "a", "b"))
+    for d in (cwd, a, b):
+        d.mkdir()
+    monkeypatch.chdir(cwd)
+    manager = PathManager()
+    manager.add_path(str(a))
+    manager.add_path(str(b))
+    return manager, str(cwd), str(a), str(b)
+
+
+def test_resolution_order(tree):
+    manager, cwd, a, b = tree
+    _touch(cwd, "f.m")
+    _touch(a, "f.m", "g.m", "notes.txt")
+    _touch(b, "g.m", "h.m", "Mixed.m")
+    assert manager.resolve("f") == os.path.join(cwd, "f.m")
+    assert manager.resolve("g") == os.path.join(a, "g.m")
+    assert manager.resolve("h") == os.path.join(b, "h.m")
+    assert manager.resolve("notes") is None and manager.resolve("nothing") is None
+    # Case-insensitive fallback, after every exact match
+    assert manager.resolve("mixed") == os.path.join(b, "Mixed.m")
+    _touch(cwd, "H.m")
+    assert manager.resolve("h") == os.path.join(b, "h.m")
+
+
+def test_changes_are_seen_after_refresh(tree):
+    manager, cwd, a, b = tree
+    assert manager.resolve("late") is None
+    _touch(b, "late.m")
+    manager.refresh()
+    assert manager.resolve("late") == os.path.join(b, "late.m")
+    os.remove(os.path.join(b, "late.m"))
+    manager.refresh()
+    assert manager.resolve("late") is None
+    # The CWD is checked on every lookup
+    _touch(cwd, "here.m")
+    assert manager.resolve("here") == os.path.join(cwd, "here.m")
+
+
+def test_misses_are_cached(tree, monkeypatch):
+    manager, cwd, a, b = tree
+    _touch(a, "f.m")
+    manager.resolve("f")
+    time.sleep(pm._RACY_NS / 1e9)   # let the fresh directories settle
+    manager.refresh()
+    manager.resolve("f")
+
+    calls = []
+    scandir, stat = os.scandir, os.stat
+    monkeypatch.setattr(pm.os, "scandir", lambda d: calls.append(d) or scandir(d))
+    monkeypatch.setattr(pm.os, "stat", lambda d: calls.append(d) or stat(d))
+    for _ in range(3):
+        assert manager.resolve("undefined_name") is None
+    assert calls == [cwd] * 3       # one stat of the CWD per lookup, nothing else
+    manager.refresh()
+    manager.resolve("undefined_name")
+    assert calls[3:] == [cwd, a, b]
+
+
+def test_path_changes_and_clear_cache(tree):
+    manager, cwd, a, b = tree
+    _touch(b, "f.m")
+    assert manager.resolve("f") == os.path.join(b, "f.m")
+    manager.remove_path(b)
+    assert manager.resolve("f") is None and manager.paths == [a]
+    manager.add_path(b)
+    assert manager.resolve("f") == os.path.join(b, "f.m")
+    manager.clear_cache()
+    assert manager.resolve("f") == os.path.join(b, "f.m")
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+def _scan_resolve(paths, name):
+    """Lookup as done before the index: a stat per directory."""
+    filename = f"{name}.m"
+    cwd_file = os.path.join(os.getcwd(), filename)
+    if os.path.exists(cwd_file):
+        return cwd_file
+    for p in paths:
+        full_path = os.path.join(p, filename)
+        if os.path.exists(full_path):
+            return full_path
+    return None
+
+
+@pytest.mark.benchmark
+def test_resolve_speedup(tmp_path, monkeypatch):
+    """
+    Target: resolving 10^4 names (half of them undefined) over a path of
+    200 directories is >10x faster through the index than by probing each
+    directory, with the path re-checked every 100 lookups (one command).
+    """
+    monkeypatch.chdir(tmp_path)
+    manager = PathManager()
+    for d in range(200):
+        directory = tmp_path / f"dir{d:03d}"
+        directory.mkdir()
+        _touch(str(directory), *(f"fn_{d}_{k}.m" for k in range(25)))
+        manager.add_path(str(directory))
+    names = [f"fn_{k % 200}_{k % 25}" if k % 2 else f"var_{k}" for k in range(10000)]
+    time.sleep(pm._RACY_NS / 1e9)
+
+    # (probing is timed on the first 10^3 names only, and scaled)
+    start = time.perf_counter()
+    probed = [_scan_resolve(manager.paths, name) for name in names[:1000]]
+    scan = (time.perf_counter() - start) * 10
+
+    start = time.perf_counter()
+    indexed = []
+    for k, name in enumerate(names):
+        if k % 100 == 0:
+            manager.refresh()
+        indexed.append(manager.resolve(name))
+    index = time.perf_counter() - start
+
+    print(f"\n[Benchmark] 10^4 lookups over 200 directories: probing {scan:.3f}s, "
+          f"indexed {index * 1e3:.1f}ms ({scan / index:.0f}x)")
+    assert indexed[:1000] == probed
+    assert index * 10 < scan
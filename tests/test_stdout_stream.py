@@ -0,0 +1,63 @@
+import threading
+import time
+from contextlib import redirect_stdout
+
+from ides.mathex.kernel.stdout import StdoutBuffer
+
+
+def test_output_streams_before_close():
+    """Output must reach the sink while the script is still running."""
+    chunks = []
+    stream = StdoutBuffer(chunks.append, interval=0.02)
+
+    with stream, redirect_stdout(stream):
+        print("progress 1")
+        time.sleep(0.2)
+        seen_mid_run = list(chunks)
+        print("progress 2")
+
+    assert "".join(seen_mid_run) == "progress 1\n"
+    assert "".join(chunks) == "progress 1\nprogress 2\n"
+
+
+def test_chunks_are_size_bounded():
+    """Large prints are emitted in bounded chunks, not one giant string."""
+    chunks = []
+    line = "x" * 99 + "\n"
+
+    with StdoutBuffer(chunks.append, interval=None, max_chars=1000) as stream:
+        for _ in range(500):
+            stream.write(line)
+
+    assert "".join(chunks) == line * 500
+    assert len(chunks) == 50
+    assert max(len(c) for c in chunks) <= 1000 + len(line)
+
+
+def test_concurrent_writers_keep_every_write():
+    chunks = []
+    stream = StdoutBuffer(chunks.append, interval=0.001, max_chars=64)
+
+    def writer(tag):
+        for n in range(200):
+            stream.write(f"{tag}{n};")
+
+    with stream:
+        threads = [threading.Thread(target=writer, args=(t,)) for t in "abcd"]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    out = "".join(chunks)
+    for tag in "abcd":
+        # Writes from the same thread keep their relative order
+        marks = [out.index(f"{tag}{n};") for n in range(200)]
+        assert marks == sorted(marks)
+
+
+def test_clc_form_feed_is_not_dropped():
+    chunks = []
+    with StdoutBuffer(chunks.append) as stream:
+        stream.write("\f")
+    assert chunks == ["\f"]
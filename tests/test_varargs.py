@@ -29,4 +29,28 @@ def test_varargin_nargin():
     # 2. Verify nargin == 3 and varargin unpacking
     # 10 + 20 + 30 = 60
     # If this passes, your transpiler change is a success!
-    assert s.globals['res2'] == 60
\ No newline at end of file
+    assert s.globals['res2'] == 60
+
+def test_optional_arguments_and_nargin():
+    """Missing arguments are None; nargin counts up to the last one passed."""
+    s = KernelSession()
+    code = textwrap.dedent("""
+    function r = opt_args(a, b)
+        if nargin < 2
+            b = 100;
+        end
+        r = a + b;
+    end
+
+    function r = no_nargin(a, b)
+        r = numel(b);
+    end
+
+    r1 = opt_args(1);
+    r2 = opt_args(1, 2);
+    r3 = no_nargin(1, [4 5 6]);
+    """)
+    execute(code, s)
+    assert s.globals['r1'] == 101
+    assert s.globals['r2'] == 3
+    assert s.globals['r3'] == 3
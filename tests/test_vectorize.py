@@ -0,0 +1,174 @@
+import time
+
+import numpy as np
+import pytest
+
+from ides.mathex.kernel.session import KernelSession
+from ides.mathex.language.transpiler import transpile
+
+
+def _run(code, vectorize=True):
+    s = KernelSession()
+    exec(transpile(code, vectorize=vectorize)[0], s.globals)
+    return s.globals
+
+
+def _vectorized(code):
+    return "_vrange(" in transpile(code)[0]
+
+
+# ==========================================================
+# RECOGNITION
+# ==========================================================
+
+@pytest.mark.parametrize("body", [
+    "y(i) = a*x(i)^2 + b;",
+    "y(i) = sin(x(i)) + mod(i, 3);",
+    "s = s + x(i) / i;",
+    "y(i) = x(i) * 2;\ns = s + y(i);",
+    "y(i) = y(i) + x(n - i + 1);",
+])
+def test_elementwise_loops_are_vectorized(body):
+    code = f"n = 5; a = 2; b = 1; s = 0;\nx = rand(1, n);\ny = zeros(1, n);\nfor i = 1:n\n{body}\nend"
+    assert _vectorized(code)
+
+
+@pytest.mark.parametrize("body", [
+    "y(i) = y(i - 1) + x(i);",          # reads another iteration's result
+    "y(i + 1) = x(i);",                 # write not at the counter
+    "s = s * 2 + x(i);",                # not a reduction
+    "t = x(i);\ny(i) = t;",             # temporaries
+    "y(i) = x(i);\nz = numel(y);",      # written array read as a whole
+    "y(i) = sum(x(1:i));",              # ranges
+    "y(i) = x(i)';",                    # unsupported operator
+    "if x(i) > 0\ny(i) = 1;\nend",      # control flow
+])
+def test_dependent_or_unsupported_loops_stay_scalar(body):
+    code = f"n = 5; s = 0;\nx = rand(1, n);\ny = zeros(1, n);\nfor i = 1:n\n{body}\nend"
+    assert not _vectorized(code)
+
+
+def test_pass_toggle():
+    code = "x = zeros(1, 3);\nfor i = 1:3\n  x(i) = i;\nend"
+    assert _vectorized(code)
+    assert "_vrange(" not in transpile(code, vectorize=False)[0]
+
+
+# ==========================================================
+# SEMANTICS
+# ==========================================================
+
+SCRIPT = """n = 40;
+a = 2.5; b = -1;
+x = linspace(-2, 2, n);
+w = x';
+y = zeros(1, n);
+c = zeros(n, 1);
+s = 0; p = 1;
+for i = 1:n
+    y(i) = a*x(i)^2 + b;
+    c(i) = sqrt(w(i)) / (i - 1) + y(i);
+    s = s + abs(y(i)) * 0.5;
+    p = p * (1 + x(i) / 100);
+end
+for k = 2:2:n
+    y(k) = y(k) ^ (1/3);
+end
+"""
+
+
+def test_vectorized_code_matches_scalar_loop():
+    fast, slow = _run(SCRIPT), _run(SCRIPT, vectorize=False)
+    for name in ("y", "c"):
+        a, b = fast[name]._data, slow[name]._data
+        assert a.shape == b.shape and a.dtype == b.dtype, name
+        assert np.allclose(a, b, equal_nan=True), name
+    assert np.isclose(fast["s"], slow["s"]) and np.isclose(fast["p"], slow["p"])
+    assert fast["i"] == slow["i"] == 40 and fast["k"] == slow["k"] == 40
+    # sqrt of negative entries and 1/0 in the first iteration
+    assert np.iscomplexobj(fast["c"]._data) and not np.isfinite(fast["c"]._data[0, 0])
+
+
+@pytest.mark.parametrize("setup", [
+    "y = [];",              # the loop grows y
+    "y = zeros(1, 3);",     # ...beyond its preallocated size
+    "y = 0;",               # not an array yet
+    "a = [1 2];",           # an "invariant scalar" that is a vector
+    "x = @(t) t;",          # x(i) is a function call
+    "sin = [5 6 7 8 9 10];",  # a variable shadows the builtin
+])
+def test_shape_mismatches_fall_back_to_the_loop(setup):
+    code = f"a = 2;\nx = 1:6;\ny = zeros(1, 6);\n{setup}\nfor i = 1:6\n  y(i) = a * sin(x(i));\nend"
+    assert _vectorized(code)
+    try:
+        expected = np.asarray(_run(code, vectorize=False)["y"])
+    except Exception as e:
+        with pytest.raises(type(e)):
+            _run(code)
+        return
+    assert np.allclose(np.asarray(_run(code)["y"]), expected)
+
+
+def test_errors_come_from_the_scalar_loop():
+    code = "x = zeros(1, 3);\ny = zeros(1, 5);\nfor i = 1:5\n  y(i) = x(i);\nend"
+    with pytest.raises(IndexError):
+        _run(code)
+    # Iterations before the failing one ran, as in MATLAB
+    s = KernelSession()
+    with pytest.raises(IndexError):
+        exec(transpile(code)[0], s.globals)
+    assert s.globals["i"] == 4
+
+
+def test_reductions_keep_type_and_display(capsys):
+    s = KernelSession()
+    s.execute("s = 0;\nfor k = 1:3\n  s = s + k;\nend\ndisp(s)")
+    assert capsys.readouterr().out == "     6\n"
+    fast = _run("s = 0;\np = 1;\nh = 0;\nfor k = 1:30\n  s = s + k;\n  p = p * k;\n  h = h + k / 2;\nend")
+    slow = _run("s = 0;\np = 1;\nh = 0;\nfor k = 1:30\n  s = s + k;\n  p = p * k;\n  h = h + k / 2;\nend",
+                vectorize=False)
+    for name in ("s", "p", "h"):
+        assert fast[name]._data.dtype == np.asarray(slow[name]).dtype, name
+        assert np.isclose(float(fast[name]), float(slow[name])), name
+    assert fast["s"]._data.dtype.kind == "i" and fast["h"]._data.dtype.kind == "f"
+
+
+def test_empty_loop_leaves_counter_unset():
+    g = _run("s = 0;\nfor q = 1:0\n  s = s + q;\nend")
+    assert g["s"] == 0 and "q" not in g
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+LOOP = """n = 100000;
+a = 3; b = 0.5;
+x = linspace(0, 1, n);
+y = zeros(1, n);
+s = 0;
+for i = 1:n
+    y(i) = a*x(i)^2 + b;
+    s = s + y(i) * x(i);
+end
+"""
+
+
+@pytest.mark.benchmark
+def test_vectorization_speedup():
+    """
+    Target: the elementwise map/reduction loop runs >10x faster vectorized
+    than as a scalar loop.
+    """
+    timings = {}
+    results = {}
+    for vectorize in (False, True):
+        start = time.perf_counter()
+        results[vectorize] = _run(LOOP, vectorize)
+        timings[vectorize] = time.perf_counter() - start
+
+    print(f"\n[Benchmark] 100000-iteration loop: scalar {timings[False]:.3f}s, "
+          f"vectorized {timings[True] * 1e3:.1f}ms ({timings[False] / timings[True]:.0f}x)")
+    assert np.allclose(results[True]["y"]._data, results[False]["y"]._data)
+    assert np.isclose(results[True]["s"], results[False]["s"])
+    assert timings[True] * 10 < timings[False]
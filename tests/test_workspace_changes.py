@@ -0,0 +1,74 @@
+from ides.mathex.kernel.session import KernelSession
+from ides.mathex.kernel.executor import execute
+
+
+def test_builtins_are_not_user_variables():
+    s = KernelSession()
+    changes = s.drain_changes()
+    assert not changes
+    assert s.user_variables() == {}
+
+
+def test_added_changed_removed():
+    s = KernelSession()
+    execute("a = 1;", s)
+    execute("b = zeros(2,2);", s)
+    changes = s.drain_changes()
+    assert sorted(changes.added) == ["a", "b"]
+    assert changes.changed == [] and changes.removed == []
+
+    # Nothing ran: nothing to refresh
+    assert not s.drain_changes()
+
+    execute("a = 2;", s)
+    execute("clear b", s)
+    changes = s.drain_changes()
+    assert changes.added == []
+    assert changes.changed == ["a"]
+    assert changes.removed == ["b"]
+
+
+def test_in_place_indexed_assignment_is_a_change():
+    s = KernelSession()
+    execute("x = zeros(1,5);", s)
+    s.drain_changes()
+
+    execute("x(3) = 7;", s)
+    assert s.drain_changes().changed == ["x"]
+
+
+def test_untouched_variables_are_not_reported():
+    s = KernelSession()
+    for n in range(50):
+        execute(f"v{n} = {n};", s)
+    s.drain_changes()
+
+    execute("v7 = 100;", s)
+    changes = s.drain_changes()
+    assert changes.changed == ["v7"]
+    assert not changes.added and not changes.removed
+
+
+def test_shadowing_a_builtin_shows_as_variable():
+    s = KernelSession()
+    execute("sum = 3;", s)
+    assert "sum" in s.drain_changes().added
+    # 'ans' becomes a variable once something is computed
+    execute("1+1", s)
+    assert "ans" in s.drain_changes().added
+
+
+def test_structs_are_reported_only_when_written():
+    s = KernelSession()
+    execute("st = struct('a', 1, 'b', zeros(1, 3));", s)
+    execute("c = cell(1, 2);", s)
+    s.drain_changes()
+
+    execute("z = 1;", s)
+    assert s.drain_changes().changed == []
+    execute("st.a = 2;", s)
+    assert s.drain_changes().changed == ["st"]
+    s.globals["st"].b.set_val(5, 2)     # st.b(2) = 5
+    assert s.drain_changes().changed == ["st"]
+    execute("c(2) = 3;", s)
+    assert s.drain_changes().changed == ["c"]